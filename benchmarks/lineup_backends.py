@@ -0,0 +1,73 @@
+"""
+Time each backend of the lineup kernel on random rosters.
+
+Every backend of `LINEUP_BACKENDS` totals the same rosters, as many valuations of
+a search (`valuations`) or as many value draws (`draws`), and must agree with the
+python reference. Backends that are not installed are skipped. The numba kernel
+is compiled, or loaded from its on-disk cache, before it is timed.
+
+    uv run python benchmarks/lineup_backends.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import time
+
+import numpy as np
+
+from ff_manager.lineup import LINEUP_BACKENDS, make_lineup_kernel
+
+LINEUP = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 2, "SUPERFLEX": 1}
+# (rosters, valuations) of each case
+CASES = ((2_048, 1), (2_048, 2), (128, 200))
+
+
+def _time_ms(kernel, values: np.ndarray, positions: np.ndarray, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        kernel(values, positions)
+    return (time.perf_counter() - start) / runs * 1_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--roster-size", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = [
+        b
+        for b in LINEUP_BACKENDS
+        if b != "numba" or importlib.util.find_spec("numba") is not None
+    ]
+    rng = np.random.default_rng(0)
+    for n_rosters, n_values in CASES:
+        values = rng.integers(0, 10_000, (n_rosters, args.roster_size, n_values))
+        values = values.astype(float)
+        positions = rng.choice(
+            np.array(["QB", "RB", "WR", "TE"], dtype=object),
+            (n_rosters, args.roster_size),
+        )
+        for depth in (0, 1):
+            kernels = {
+                b: make_lineup_kernel(depth=depth, backend=b, **LINEUP)
+                for b in backends
+            }
+            expected = kernels["python"](values, positions)
+            timings = []
+            for backend, kernel in kernels.items():
+                if not np.array_equal(kernel(values, positions), expected):
+                    raise SystemExit(f"The {backend} backend disagrees with python.")
+                runs = 1 if backend == "python" else args.runs
+                ms = _time_ms(kernel, values, positions, runs)
+                timings.append(f"{backend} {ms:.1f}")
+            print(
+                f"{n_rosters} rosters x {n_values} valuations, depth {depth} (ms): "
+                + ", ".join(timings)
+            )
+
+
+if __name__ == "__main__":
+    main()
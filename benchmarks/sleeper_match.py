@@ -0,0 +1,227 @@
+"""
+Time the Sleeper roster to value match against the pipeline it replaced.
+
+The previous pipeline moved the payloads through dicts, eager Polars frames, a
+DuckDB relation and Arrow; the current one builds Arrow tables of the fields used
+and matches them in one DuckDB plan (see `_match_player_values`). Both run on the
+same synthetic payloads, shaped like the Sleeper and dynasty process ones, and
+must return the same rows.
+
+    uv run python benchmarks/sleeper_match.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+from ff_manager.const import KNOWN_PLAYER_MISMATCHES
+from ff_manager.league import _match_player_values, _read_player_values
+
+SYLLABLES = ("ka", "lo", "mar", "ty", "ren", "jo", "sha", "vin", "del", "quan", "ro")
+COLUMNS = ("id", "name", "pos", "team", "value", "value_1qb", "value_2qb")
+
+
+def _name(rng: random.Random) -> str:
+    def _part() -> str:
+        return "".join(rng.choices(SYLLABLES, k=rng.randint(2, 3))).title()
+
+    return f"{_part()} {_part()}"
+
+
+def make_payloads(
+    tmp: Path,
+    n_players: int = 11_000,
+    n_fields: int = 40,
+    n_teams: int = 12,
+    roster_size: int = 30,
+    n_values: int = 1_240,
+    seed: int = 0,
+) -> tuple[dict, list[dict], list[dict], Path]:
+    """The players, rosters and users payloads of Sleeper and a values CSV."""
+    rng = random.Random(seed)
+    names: set[str] = set()
+    while len(names) < n_players:
+        names.add(_name(rng))
+    all_player_data = {
+        str(i): {
+            "player_id": str(i),
+            "full_name": name,
+            "position": rng.choice(("QB", "RB", "WR", "TE")),
+            **{f"field_{k}": rng.random() for k in range(n_fields - 3)},
+        }
+        for i, name in enumerate(sorted(names))
+    }
+    ids = rng.sample(sorted(all_player_data), n_teams * roster_size)
+    roster_data = [
+        {"owner_id": f"user{t}", "players": ids[t::n_teams]} for t in range(n_teams)
+    ]
+    team_metadata = [
+        {"user_id": f"user{t}", "metadata": {"team_name": f"team {t}"}}
+        for t in range(n_teams)
+    ]
+
+    # Values of most rostered players, plus free agents
+    rostered = [all_player_data[i]["full_name"] for i in ids]
+    valued = rng.sample(rostered, int(len(rostered) * 0.9))
+    others = sorted(names - set(rostered))
+    valued += rng.sample(others, n_values - len(valued))
+    values_loc = tmp / "values-players.csv"
+    pl.DataFrame(
+        {
+            "player": valued,
+            "pos": [rng.choice(("QB", "RB", "WR", "TE")) for _ in valued],
+            "team": [rng.choice(("BUF", "KC", "SF")) for _ in valued],
+            "age": [rng.uniform(21, 36) for _ in valued],
+            "ecr_1qb": [rng.uniform(1, 300) for _ in valued],
+            "ecr_2qb": [rng.uniform(1, 300) for _ in valued],
+            "value_1qb": [rng.randint(0, 10_000) for _ in valued],
+            "value_2qb": [rng.randint(0, 10_000) for _ in valued],
+            "scrape_date": ["2024-09-01"] * len(valued),
+        }
+    ).write_csv(values_loc)
+    return all_player_data, roster_data, team_metadata, values_loc
+
+
+def previous_pipeline(
+    all_player_data: dict,
+    roster_data: list[dict],
+    team_metadata: list[dict],
+    values_loc: Path,
+) -> pa.Table:
+    """The match as it was before the single DuckDB plan."""
+    all_player_data_list = [
+        {"id": id_, **player_data} for id_, player_data in all_player_data.items()
+    ]
+    clean_player_data = pl.from_dicts(
+        all_player_data_list, infer_schema_length=10_000
+    ).select("player_id", "full_name", pos="position")
+    clean_roster_data = (
+        pl.from_dicts(roster_data)
+        .select("owner_id", player_id="players")
+        .explode("player_id")
+    )
+    joined_data = clean_roster_data.join(clean_player_data, how="inner", on="player_id")
+    user_team_lookup = (
+        pl.from_dicts(team_metadata)
+        .select("user_id", "metadata")
+        .unnest("metadata")
+        .select(pl.col("user_id").alias("owner_id"), pl.col("team_name").alias("team"))
+    )
+    with_team_name = (  # noqa: F841
+        joined_data.join(user_team_lookup, on="owner_id")
+        .drop("owner_id")
+        .rename({"full_name": "name", "player_id": "id"})
+    )
+    dynasty_values = (  # noqa: F841
+        pl.read_csv(values_loc, infer_schema_length=10_000)
+        .select(
+            pl.col("player").alias("name"),
+            pl.col("value_2qb").alias("value"),
+            "value_1qb",
+            "value_2qb",
+        )
+        .sort("name", "value")
+        .unique(subset=["name"], keep="first")
+        .with_columns(pl.col("name").replace(KNOWN_PLAYER_MISMATCHES))
+    )
+    matched_players = duckdb.sql("""--sql
+        SELECT with_team_name.*, value, value_1qb, value_2qb,
+            jaro_winkler_similarity(with_team_name.name, dynasty_values.name) as _sim,
+            ROW_NUMBER() OVER (
+                PARTITION BY with_team_name.name ORDER BY _sim DESC
+            ) AS _rank
+        FROM with_team_name
+        JOIN dynasty_values
+        ON jaro_winkler_similarity(with_team_name.name, dynasty_values.name) > .9
+    """).to_arrow_table()
+    return (
+        pl.from_arrow(matched_players)
+        .filter(pl.col("_rank") == 1)
+        .drop("_sim", "_rank")
+        .to_arrow()
+    )
+
+
+def current_pipeline(
+    all_player_data: dict,
+    roster_data: list[dict],
+    team_metadata: list[dict],
+    values_loc: Path,
+) -> pa.Table:
+    """The match of `SleeperLeague._download_data`, past the downloads."""
+    players = pa.table(
+        {
+            "player_id": [p.get("player_id") for p in all_player_data.values()],
+            "full_name": [p.get("full_name") for p in all_player_data.values()],
+            "pos": [p.get("position") for p in all_player_data.values()],
+        }
+    )
+    rosters = pa.table(
+        {
+            "owner_id": [r["owner_id"] for r in roster_data],
+            "players": [r["players"] for r in roster_data],
+        },
+        schema=pa.schema(
+            [("owner_id", pa.string()), ("players", pa.list_(pa.string()))]
+        ),
+    )
+    users = pa.table(
+        {
+            "user_id": [u["user_id"] for u in team_metadata],
+            "team": [(u.get("metadata") or {}).get("team_name") for u in team_metadata],
+        }
+    )
+    return _match_player_values(
+        players, rosters, users, _read_player_values(str(values_loc))
+    )
+
+
+def _rows(table: pa.Table) -> list[tuple]:
+    return sorted(
+        tuple(row[c] for c in COLUMNS) for row in table.select(COLUMNS).to_pylist()
+    )
+
+
+def _median_ms(fn, payloads: tuple, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # the unmatched warning
+            fn(*payloads)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        payloads = make_payloads(Path(tmp))
+        with contextlib.redirect_stdout(io.StringIO()):
+            previous = _rows(previous_pipeline(*payloads))
+            current = _rows(current_pipeline(*payloads))
+        if previous != current:
+            raise SystemExit("The pipelines return different rows.")
+        print(f"{len(current):,} matched players, identical rows")
+        for name, fn in (
+            ("previous pipeline", previous_pipeline),
+            ("current pipeline", current_pipeline),
+        ):
+            print(f"{name}: {_median_ms(fn, payloads, args.runs):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
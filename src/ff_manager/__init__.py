@@ -1,3 +1,17 @@
-from ff_manager.api import eval_trades
+from __future__ import annotations
 
-__all__ = ["eval_trades"]
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ff_manager.api import eval_trades, eval_trades_many
+
+__all__ = ["eval_trades", "eval_trades_many"]
+
+
+def __getattr__(name: str):
+    # The engine pulls in numpy, polars and friends; only import it when used.
+    if name in __all__:
+        from ff_manager import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,7 +2,6 @@ import inspect
 
 import click
 
-from ff_manager import main
 from ff_manager.filter import PackageFilter, ReceiveFilter, SendFilter
 
 
@@ -22,6 +21,10 @@ def print_prof_opts():
     TE: 1
     FLEX: 2
     SUPERFLEX: 1
+    valuations:  # optional, also report gains under each
+    - value_2qb
+    - value_1qb
+    lineup_backend: numba  # optional, python, numpy or numba (default if installed)
     id: ...
     year: 2024
     """
@@ -39,6 +42,8 @@ def print_prof_opts():
     swid: ...
     id: ...
     year: 2024
+    cache_dir: ...  # optional, records ESPN responses and the NFL schedule
+    replay: false  # optional, rebuild the league from the recorded responses
     """
     click.secho(SLEEPER_PROF_EX, fg="green")
     click.secho(ESPN_PROF_EX, fg="green")
@@ -60,7 +65,9 @@ def print_trade_opts():
             click.secho(f"\n{param!s}: {desc!s}\n", fg="green", nl=False)
 
 
-@cli.command(help=main.__doc__)
+@cli.command(
+    help="Find the best trades for the team in REQS, using the league in PROFILE."
+)
 @click.argument("reqs")
 @click.argument(
     "profile",
@@ -68,8 +75,194 @@ def print_trade_opts():
 @click.option(
     "--outdate_loc",
 )
-def find_trades(reqs, profile, outdate_loc=None):
-    main(reqs, profile, outdate_loc)
+@click.option("--stats", "show_stats", is_flag=True, help="Print search stats.")
+@click.option(
+    "--memory-report", is_flag=True, help="Trace memory per stage of the search."
+)
+@click.option(
+    "--memory-ceiling",
+    type=float,
+    help="Warn before running a search projected to use more MB than this.",
+)
+@click.option(
+    "--store",
+    help="Directory of stored gains; only team pairs with roster changes are re-run.",
+)
+@click.option(
+    "--sink_to",
+    help="Stream trades to this file; .ndjson, .csv and .parquet are structured.",
+)
+@click.option("--top", default=0, help="Render the depth charts of the top N trades.")
+@click.option(
+    "--shard", help="Only search the i-th of N slices of the trades, given as i/N."
+)
+@click.option("--limit", type=int, help="Keep only the best N trades.")
+@click.option(
+    "--memory-budget",
+    type=float,
+    help="Evaluate in chunks, spilling gains to disk past this many MB.",
+)
+@click.option("--spill-dir", help="Directory for spilled gains; temporary by default.")
+@click.option(
+    "--beam",
+    "beam_width",
+    type=int,
+    help="Grow packages one asset at a time, keeping the best N trades per team.",
+)
+@click.option(
+    "--time-budget",
+    type=float,
+    help="Seconds to search, most promising trades first, before returning.",
+)
+@click.option(
+    "--interruptible/--no-interruptible",
+    default=True,
+    show_default=True,
+    help="Search most promising trades first, returning those found on Ctrl-C.",
+)
+def find_trades(
+    reqs,
+    profile,
+    outdate_loc=None,
+    memory_ceiling=None,
+    store=None,
+    sink_to=None,
+    top=0,
+    shard=None,
+    limit=None,
+    memory_budget=None,
+    spill_dir=None,
+    beam_width=None,
+    time_budget=None,
+    *,
+    show_stats=False,
+    memory_report=False,
+    interruptible=True,
+):
+    from ff_manager.api import main
+
+    main(
+        reqs,
+        profile,
+        outdate_loc,
+        sink_to,
+        show_stats=show_stats,
+        memory_report=memory_report,
+        memory_ceiling_mb=memory_ceiling,
+        store=store,
+        top=top,
+        shard=shard,
+        limit=limit,
+        memory_budget_mb=memory_budget,
+        spill_dir=spill_dir,
+        beam_width=beam_width,
+        time_budget=time_budget,
+        interruptible=interruptible,
+    )
+
+
+@cli.command()
+@click.argument("reqs")
+@click.argument("profile")
+@click.option("--outdate_loc")
+@click.option("--beam", "beam_width", default=20, show_default=True)
+@click.option("--top", default=10, show_default=True)
+def compare_beam(reqs, profile, outdate_loc=None, beam_width=20, top=10):
+    """Compare a beam search for REQS against the exhaustive search."""
+    from ff_manager.api import compare_beam, load_league
+
+    league = load_league(profile, outdate_loc)
+    report = compare_beam(league, reqs, beam_width=beam_width, top=top)
+    for key, value in report.items():
+        click.secho(f"{key}: {value}", fg="green")
+
+
+@cli.command()
+@click.argument("reqs")
+@click.argument("profile")
+@click.option("--outdate_loc")
+@click.option(
+    "--calibrate/--no-calibrate",
+    default=True,
+    help="Time a sample of trades to project the search, or only count pairs.",
+)
+def explain_trades(reqs, profile, outdate_loc=None, *, calibrate=True):
+    """Estimate the size, runtime and memory of the search for REQS."""
+    from ff_manager.api import explain_trades, load_league
+
+    league = load_league(profile, outdate_loc)
+    explain_trades(league, reqs, calibrate=calibrate).pprint()
+
+
+@cli.command()
+@click.argument("sink_to")
+@click.argument("shards", nargs=-1, required=True)
+@click.option("--limit", type=int, help="Keep only the best N trades.")
+@click.option("--rank_by", help="Valuation the shards were ranked by, see rank_by.")
+@click.option("--profile", help="League profile holding the valuations of rank_by.")
+def merge_trades(sink_to, shards, limit=None, rank_by=None, profile=None):
+    """Merge the .ndjson or .parquet results of SHARDS into SINK_TO, best first."""
+    from ff_manager.api import merge_trades
+
+    valuations = None
+    if profile is not None:
+        from pathlib import Path
+
+        import yaml
+
+        with Path(profile).open() as f:
+            valuations = yaml.safe_load(f).get("valuations")
+    n_written = merge_trades(
+        list(shards), sink_to, limit=limit, rank_by=rank_by, valuations=valuations
+    )
+    click.secho(f"Merged {n_written} trades into {sink_to}", fg="green")
+
+
+@cli.command()
+@click.argument("profile")
+@click.argument("reqs", nargs=-1, required=True)
+@click.option("--outdate_loc")
+@click.option("--sink_dir", help="Directory to write one result file per REQS.")
+@click.option("--stats", "show_stats", is_flag=True, help="Print search stats.")
+def find_trades_many(
+    profile, reqs, outdate_loc=None, sink_dir=None, *, show_stats=False
+):
+    """Find trades for several REQS files against the league in PROFILE, loaded once."""
+    from ff_manager.api import main_many
+
+    main_many(reqs, profile, outdate_loc, sink_dir, show_stats=show_stats)
+
+
+@cli.command()
+@click.option(
+    "--league",
+    "leagues",
+    nargs=3,
+    multiple=True,
+    required=True,
+    metavar="NAME PROFILE DATA",
+    help="League to keep loaded; may be repeated.",
+)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8765, show_default=True)
+@click.option("--socket", "socket_path", help="Serve on a Unix socket instead.")
+@click.option(
+    "--poll", default=5.0, show_default=True, help="Seconds between snapshot checks."
+)
+def serve(leagues, host, port, socket_path=None, poll=5.0):
+    """Serve trade queries over HTTP, keeping leagues loaded between queries."""
+    from ff_manager.server import LeagueHandle, TradeServer
+
+    handles = {
+        name: LeagueHandle(profile_loc=profile, data_loc=data)
+        for name, profile, data in leagues
+    }
+    server = TradeServer(handles, poll_interval=poll)
+    server.make_httpd(host=host, port=port, socket_path=socket_path)
+    click.secho(
+        f"Serving {sorted(handles)} on {socket_path or f'{host}:{port}'}", fg="green"
+    )
+    server.serve_forever()
 
 
 if __name__ == "__main__":
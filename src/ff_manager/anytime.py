@@ -0,0 +1,151 @@
+"""Trade search against a deadline, most promising trades first."""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import TYPE_CHECKING
+
+from ff_manager.functions import get_opposing_teams, receive_packages, send_packages
+from ff_manager.prune import package_promise
+from ff_manager.stats import SearchStats
+from ff_manager.trade import Trade
+
+if TYPE_CHECKING:
+    from ff_manager.filter import PackageFilter, ReceiveFilter, SendFilter
+    from ff_manager.league import BaseLeague as League
+    from ff_manager.model import Team
+
+# Trades executed between two checks of the deadline
+ANYTIME_CHUNK_SIZE = 256
+
+
+class _DeadlinePassed(Exception):
+    """The deadline of a search passed."""
+
+
+def _check_deadline(deadline: float | None) -> None:
+    if deadline is not None and time.perf_counter() > deadline:
+        raise _DeadlinePassed
+
+
+def anytime_trades(
+    team: Team,
+    send_filter: SendFilter,
+    receive_filter: ReceiveFilter,
+    package_filter: PackageFilter,
+    league: League,
+    deadline: float | None = None,
+    stats: SearchStats | None = None,
+    opp_teams: list[Team] | None = None,
+    max_fleece: float | None = None,
+    chunk_size: int = ANYTIME_CHUNK_SIZE,
+) -> list[Trade]:
+    """
+    Executed trades, most promising first, until `deadline` or a Ctrl-C.
+
+    The promise of a trade is the sum of the `package_promise` of its packages,
+    for `team` alone, or with a `max_fleece` for both teams: a trade can only gain
+    `team` much while staying within `max_fleece` if it gains both teams much.
+    Package pairs of every opposing team are visited in decreasing promise by a
+    heap over the two sorted package lists. The trades executed when the deadline
+    (a `time.perf_counter` value) passes or the search is interrupted are
+    returned, in the order `assemble_trades` would give them; a search that runs
+    to the end returns the same trades as `assemble_trades`.
+
+    The deadline is checked while packages are built and ranked too, once per
+    opposing team. Coverage is counted in `stats` (see `SearchStats.coverage`),
+    with `search.deadline` or `search.interrupted` set when the search stopped
+    early.
+    """
+    stats = stats if stats is not None else SearchStats()
+    if opp_teams is None:
+        opp_teams = get_opposing_teams(team, package_filter, league)
+    setter = league.lineup_setter
+
+    trades: list[tuple[tuple[int, int, int], Trade]] = []
+    try:  # a Ctrl-C while packages are built or ranked is a stop too
+        cur_packages = send_packages(team, send_filter, package_filter, league, stats)
+        opp_packages = []
+        for opp in opp_teams:
+            _check_deadline(deadline)
+            opp_packages.append(
+                receive_packages(opp, receive_filter, package_filter, league, stats)
+            )
+        stats.incr(
+            "package_pairs.total", len(cur_packages) * sum(map(len, opp_packages))
+        )
+
+        # Packages of each pair of teams, best first, with the promise of each:
+        send_promise: list[list[float]] = []
+        receive_promise: list[list[float]] = []
+        with stats.stage("prioritize"):
+            team_send = package_promise(team, cur_packages, setter)
+            for opp, packages in zip(opp_teams, opp_packages, strict=True):
+                _check_deadline(deadline)
+                team_receive = package_promise(team, packages, setter)
+                if max_fleece is None:
+                    send_promise.append(team_send)
+                    receive_promise.append(team_receive)
+                    continue
+                opp_send = package_promise(opp, packages, setter)
+                opp_receive = package_promise(opp, cur_packages, setter)
+                send_promise.append(
+                    [a + b for a, b in zip(team_send, opp_receive, strict=True)]
+                )
+                receive_promise.append(
+                    [a + b for a, b in zip(team_receive, opp_send, strict=True)]
+                )
+            send_order = [
+                sorted(range(len(promise)), key=lambda i: -promise[i])
+                for promise in send_promise
+            ]
+            receive_order = [
+                sorted(range(len(promise)), key=lambda j: -promise[j])
+                for promise in receive_promise
+            ]
+
+        def _entry(k: int, i: int, j: int) -> tuple[float, int, int, int]:
+            promise = (
+                send_promise[k][send_order[k][i]]
+                + receive_promise[k][receive_order[k][j]]
+            )
+            return (-promise, k, i, j)
+
+        # Every (i, j) pair is pushed once: (i + 1, 0) from (i, 0) and (i, j + 1)
+        heap = [_entry(k, 0, 0) for k, order in enumerate(receive_order) if order]
+        heapq.heapify(heap)
+
+        while heap:
+            _check_deadline(deadline)
+            with stats.stage("assemble"):
+                chunk = []
+                while heap and len(chunk) < chunk_size:
+                    _, k, i, j = heapq.heappop(heap)
+                    if j == 0 and i + 1 < len(send_order[k]):
+                        heapq.heappush(heap, _entry(k, i + 1, 0))
+                    if j + 1 < len(receive_order[k]):
+                        heapq.heappush(heap, _entry(k, i, j + 1))
+                    key = (k, send_order[k][i], receive_order[k][j])
+                    trade = Trade(
+                        team1=team,
+                        team2=opp_teams[k],
+                        package1=cur_packages[key[1]],
+                        package2=opp_packages[k][key[2]],
+                        lineup_setter=setter,
+                    )
+                    chunk.append((key, trade))
+            with stats.stage("evaluate"):
+                for key, trade in chunk:
+                    trade.execute_trade()
+                    trades.append((key, trade))
+    except _DeadlinePassed:
+        stats.incr("search.deadline")
+    except KeyboardInterrupt:
+        stats.incr("search.interrupted")
+
+    stats.incr("package_pairs.evaluated", len(trades))
+    stats.incr("trades.assembled", len(trades))
+    stats.incr("trades.evaluated", len(trades))
+    trades.sort(key=lambda item: item[0])
+    return [trade for _, trade in trades]
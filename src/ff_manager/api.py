@@ -2,55 +2,578 @@
 
 from __future__ import annotations
 
-import sys
+import contextlib
+import itertools
+import time
 from collections import defaultdict
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+import click
 import yaml
 from tqdm import tqdm
 
+from ff_manager.anytime import anytime_trades
+from ff_manager.beam import beam_search_trades
+from ff_manager.draws import ValueDraws
+from ff_manager.explain import SearchEstimate
 from ff_manager.filter import PackageFilter, ReceiveFilter, SendFilter
 from ff_manager.functions import (
+    SearchCache,
     assemble_trades,
-    loc_best_trades,
+    get_opposing_teams,
+    iter_best_trades,
+    iter_gain_draws,
+    iter_trade_chunks,
+    iter_valuation_gains,
+    valuation_column,
 )
+from ff_manager.memory import MemoryReport
+from ff_manager.sink import merge_rows, open_sink
+from ff_manager.spill import GainSpill
+from ff_manager.stats import SearchStats
+from ff_manager.store import ResultStore
 from ff_manager.utils import ingest_reqs
 
 if TYPE_CHECKING:
-    from ff_manager.model import Trade
+    from collections.abc import Iterable, Iterator
 
+    import pyarrow as pa
 
-def eval_trades(league, reqs: str | Path | dict) -> list[Trade] | None:
-    """Evaluate trades, given filter constaints and a value function."""
+    from ff_manager.lineup import LineupCache
+    from ff_manager.model import Team
+    from ff_manager.sink import TradeSink
+    from ff_manager.trade import Trade
+
+
+def load_reqs(reqs: str | Path | dict) -> dict:
+    """Load reqs from a yaml file or a dictionary, normalizing keys."""
     if isinstance(reqs, str | Path):
         with Path(reqs).open() as f:
             reqs_loaded = defaultdict(lambda: None) | yaml.safe_load(f)
     else:
         reqs_loaded = reqs
-    reqs_loaded = ingest_reqs(reqs_loaded)
+    return ingest_reqs(reqs_loaded)
+
+
+def parse_shard(shard: str | tuple[int, int]) -> tuple[int, int]:
+    """
+    Parse a shard given as `"i/N"`, the i-th of N shards counting from 1.
+
+    Returns the `(k, n)` shard of `assemble_trades`, counting from 0.
+    """
+    if isinstance(shard, str):
+        try:
+            i, n = (int(part) for part in shard.split("/"))
+        except ValueError as e:
+            raise ValueError(f"Shards are given as i/N, not {shard!r}.") from e
+    else:
+        i, n = shard
+    if not 1 <= i <= n:
+        raise ValueError(f"Shard {i}/{n} must be between 1/{n} and {n}/{n}.")
+    return i - 1, n
+
+
+# Search modes of `eval_trades` and the modes each can not be combined with
+EXCLUSIVE_MODES = {
+    "store": ("shard", "memory_budget_mb"),
+    "beam_width": ("store", "shard", "memory_budget_mb"),
+    "time_budget": ("store", "shard", "memory_budget_mb", "beam_width"),
+    "cache": ("memory_budget_mb", "beam_width", "time_budget"),
+}
+_MODE_NAMES = {
+    "store": "a result store",
+    "shard": "shards",
+    "memory_budget_mb": "a memory budget",
+    "beam_width": "a beam",
+    "time_budget": "a time budget",
+    "cache": "a cache",
+}
+
+
+def _check_modes(modes: dict) -> None:
+    """Raise a ValueError if the search modes set in `modes` can not be combined."""
+    for mode, excluded in EXCLUSIVE_MODES.items():
+        if modes.get(mode) is None:
+            continue
+        for other in excluded:
+            if modes.get(other) is not None:
+                raise ValueError(
+                    f"A search can not use both {_MODE_NAMES[mode]} and "
+                    f"{_MODE_NAMES[other]}."
+                )
+
+
+def eval_trades(
+    league,
+    reqs: str | Path | dict,
+    *,
+    return_stats: bool = False,
+    memory_report: bool = False,
+    memory_ceiling_mb: float | None = None,
+    store: str | Path | ResultStore | None = None,
+    cache: SearchCache | None = None,
+    sink: TradeSink | None = None,
+    shard: str | tuple[int, int] | None = None,
+    limit: int | None = None,
+    memory_budget_mb: float | None = None,
+    spill_dir: str | Path | None = None,
+    beam_width: int | None = None,
+    time_budget: float | None = None,
+    interruptible: bool = False,
+) -> list[Trade] | tuple[list[Trade], SearchStats] | None:
+    """
+    Evaluate trades, given filter constaints and a value function.
+
+    When `return_stats` is set, a `SearchStats` is returned alongside the trades.
+    `memory_report` traces allocations per stage into `SearchStats.memory`, and
+    `memory_ceiling_mb` warns up front when the projected memory of the search is
+    above the ceiling.
+
+    With a `store` (a `ResultStore` or a directory for one), gains of team pairs
+    whose rosters did not change since a previous search are reused, and only the
+    changed pairs are evaluated. Changing only `max_fleece` or `min_gain` between
+    runs re-queries the stored gains without evaluating anything.
+
+    A `SearchCache` shares filtered packages and executed trades with other
+    searches over the same league, see `eval_trades_many`.
+
+    With `valuations` in the league profile, every evaluated trade also carries
+    its gains under each valuation, and a trade is selected if it passes
+    `min_gain` and `max_fleece` under any of them. Trades are ranked by the
+    primary value, or by the valuation named by `rank_by` in the reqs.
+
+    With `draws` in the reqs, player values are sampled that many times (see
+    `ValueDraws`) and each selected trade carries the mean, 5th percentile and
+    probability of a positive gain over the draws.
+
+    With a `sink`, selected trades are written to it one at a time, best first,
+    and None is returned in place of the trade list.
+
+    `limit` keeps only the best `limit` trades. A `shard` (`"i/N"`, see
+    `parse_shard`) evaluates only the i-th of N deterministic slices of the
+    package pairs, so a large search can be split over independent processes;
+    the best `limit` trades of each shard, written to a sink, are combined with
+    `merge_trades`.
+
+    With a `memory_budget_mb`, package pairs are evaluated in chunks and only the
+    gains of the trades passing the selection are kept, spilled to `spill_dir` (a
+    temporary directory by default) as sorted runs once past the budget, then
+    merged back best first (see `GainSpill`).
+
+    With a `beam_width`, packages are grown one asset at a time instead of
+    enumerated, keeping the `beam_width` most promising trades per opposing team
+    at each step (see `beam_search_trades`). This makes a large `max_assets`
+    tractable, at the cost of missing some trades; `compare_beam` measures how
+    many on a search small enough to run exhaustively.
+
+    With a `time_budget` in seconds, the most promising package pairs are
+    evaluated first and the best trades found when the budget runs out are
+    returned (see `anytime_trades`); `SearchStats.coverage` is the share of the
+    search covered. An `interruptible` search does the same on Ctrl-C, when no
+    other mode is asked for; a Ctrl-C while the trades found are valued or
+    selected keeps those done so far.
+
+    Modes that can not be combined (see `EXCLUSIVE_MODES`), such as a `cache`
+    with a memory budget, beam or time budget, raise a ValueError.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    reqs_loaded = load_reqs(reqs)
 
     send_filter = SendFilter(**reqs_loaded)
     receive_filter = ReceiveFilter(**reqs_loaded)
     package_filter = PackageFilter(**reqs_loaded)
+    unknown_names = [
+        name
+        for trade_filter in (send_filter, receive_filter, package_filter)
+        for name in trade_filter.bind(league.name_index)
+    ]
+    if unknown_names:
+        click.secho(
+            f"WARNING: No assets in the league match {sorted(set(unknown_names))!r}",
+            fg="red",
+        )
+    team = league[reqs_loaded["team"]]
+    draws = ValueDraws.from_reqs(reqs_loaded)
+    rank_by = valuation_column(
+        reqs_loaded.get("rank_by"), league.profile.get("valuations")
+    )
+
+    memory = None
+    if memory_report or memory_ceiling_mb is not None:
+        memory = MemoryReport(ceiling_mb=memory_ceiling_mb)
+        memory.estimate(
+            team=team,
+            opp_teams=get_opposing_teams(team, package_filter, league),
+            package_filter=package_filter,
+            league=league,
+        )
+        memory.check_ceiling()
+    stats = SearchStats(memory=memory if memory_report else None)
 
-    # Assemble and Execute Trades:
-    trades = assemble_trades(
-        team=league[reqs_loaded["team"]],
-        send_filter=send_filter,
-        receive_filter=receive_filter,
-        package_filter=package_filter,
-        league=league,
+    if shard is not None:
+        shard = parse_shard(shard)
+    modes = {
+        "store": store,
+        "shard": shard,
+        "memory_budget_mb": memory_budget_mb,
+        "beam_width": beam_width,
+        "time_budget": time_budget,
+        "cache": cache,
+    }
+    _check_modes(modes)
+    anytime = time_budget is not None or (
+        interruptible and all(mode is None for mode in modes.values())
     )
-    for trade in tqdm(trades, "Executing Trades: "):
-        trade.execute_trade()
-
-    # Loc Best Trades:
-    return loc_best_trades(
-        trades=trades,
-        max_fleece=reqs_loaded["max_fleece"],
-        min_gain=0,
+
+    if isinstance(store, str | Path):
+        store = ResultStore(store, profile=league.profile, reqs=reqs_loaded)
+    if store is not None:
+        stats.incr("teams.changed", len(store.diff_snapshot(league.teams)))
+
+    lineup_cache = league.lineup_setter
+    valuations = getattr(lineup_cache, "kernel", None) is not None
+    start_hits = getattr(lineup_cache, "hits", 0)
+    start_misses = getattr(lineup_cache, "misses", 0)
+
+    opp_teams = get_opposing_teams(team, package_filter, league)
+    stats.incr("teams.opposing", len(opp_teams))
+
+    # Pairs with unchanged rosters only need their stored gains:
+    stored: list[tuple[Team, pa.Table]] = []
+    if store is not None:
+        for opp in opp_teams:
+            gains = store.load_gains(team, opp)
+            if gains is not None:
+                stored.append((opp, gains))
+        reused = {opp.name for opp, _ in stored}
+        opp_teams = [opp for opp in opp_teams if opp.name not in reused]
+        stats.incr("pairs.reused", len(stored))
+        stats.incr("pairs.computed", len(opp_teams))
+        stats.incr("trades.reused", sum(len(gains) for _, gains in stored))
+
+    spill = None
+    if memory_budget_mb is not None:
+        spill = GainSpill(
+            team=team,
+            opp_teams=opp_teams,
+            lineup_setter=league.lineup_setter,
+            budget_mb=memory_budget_mb,
+            path=spill_dir,
+            max_fleece=reqs_loaded.get("max_fleece"),
+            min_gain=reqs_loaded.get("min_gain", 0),
+            valuations=valuations,
+            rank_by=rank_by,
+        )
+
+    if memory_report:
+        memory.start()
+    try:
+        # Assemble and Execute Trades:
+        trades: list[Trade] = []
+        if spill is not None:
+            _evaluate_spilled(
+                spill,
+                iter_trade_chunks(
+                    team=team,
+                    send_filter=send_filter,
+                    receive_filter=receive_filter,
+                    package_filter=package_filter,
+                    league=league,
+                    stats=stats,
+                    opp_teams=opp_teams,
+                    shard=shard,
+                    chunk_size=spill.chunk_size,
+                ),
+                stats,
+                lineup_cache if valuations else None,
+            )
+            if not spill.n_added:
+                raise ValueError("No trades passed the package or receive filters.")
+        else:
+            if opp_teams and anytime:
+                trades = anytime_trades(
+                    team=team,
+                    send_filter=send_filter,
+                    receive_filter=receive_filter,
+                    package_filter=package_filter,
+                    league=league,
+                    deadline=deadline,
+                    stats=stats,
+                    opp_teams=opp_teams,
+                    max_fleece=reqs_loaded.get("max_fleece"),
+                )
+            elif opp_teams and beam_width is not None:
+                trades = beam_search_trades(
+                    team=team,
+                    send_filter=send_filter,
+                    receive_filter=receive_filter,
+                    package_filter=package_filter,
+                    league=league,
+                    beam_width=beam_width,
+                    stats=stats,
+                    opp_teams=opp_teams,
+                    max_fleece=reqs_loaded.get("max_fleece"),
+                )
+            elif opp_teams:
+                trades = assemble_trades(
+                    team=team,
+                    send_filter=send_filter,
+                    receive_filter=receive_filter,
+                    package_filter=package_filter,
+                    league=league,
+                    stats=stats,
+                    opp_teams=opp_teams,
+                    cache=cache,
+                    shard=shard,
+                )
+            stopped = stats.counters.get("search.deadline") or stats.counters.get(
+                "search.interrupted"
+            )
+            if not (trades or stopped) and not any(len(g) for _, g in stored):
+                raise ValueError("No trades passed the package or receive filters.")
+            if memory_report:
+                memory.snapshot("assemble")
+
+            new_trades = [trade for trade in trades if not trade.executed]
+            with stats.stage("evaluate"):
+                for trade in tqdm(new_trades, "Executing Trades: "):
+                    trade.execute_trade()
+            stats.incr("trades.evaluated", len(new_trades))
+            if valuations:  # selected under any valuation
+                valued: list[Trade] = []
+                with stats.stage("valuations"), _stop_on_interrupt(stats, anytime):
+                    for trade in iter_valuation_gains(trades, lineup_cache):
+                        valued.append(trade)
+                trades = valued
+            if beam_width is None and not anytime:  # counted by the search
+                stats.incr("trades.shared", len(trades) - len(new_trades))
+            if store is not None:
+                _save_to_store(store, team, opp_teams, trades)
+        if memory_report:
+            memory.snapshot("evaluate")
+
+        # Loc Best Trades:
+        with stats.stage("select"):
+            if spill is not None:
+                selected = spill.iter_trades()
+            else:
+                selected = iter_best_trades(
+                    trades=trades,
+                    stored=stored,
+                    team=team,
+                    lineup_setter=league.lineup_setter,
+                    max_fleece=reqs_loaded.get("max_fleece"),
+                    min_gain=reqs_loaded.get("min_gain", 0),
+                    rank_by=rank_by,
+                )
+            if limit is not None:
+                selected = itertools.islice(selected, limit)
+            if draws is not None:
+                selected = iter_gain_draws(
+                    selected, draws.make_cache(league), batch_size=draws.batch_size
+                )
+            best_trades = [] if sink is None else None
+            with _stop_on_interrupt(stats, anytime):
+                if sink is None:
+                    for trade in selected:
+                        best_trades.append(trade)
+                else:
+                    sink.write_many(selected)
+            n_selected = len(best_trades) if sink is None else sink.n_written
+        stats.incr("trades.selected", n_selected)
+    finally:
+        if memory_report:
+            memory.stop()
+        if spill is not None:
+            spill.close()
+
+    stats.incr("lineup_cache.hits", getattr(lineup_cache, "hits", 0) - start_hits)
+    stats.incr("lineup_cache.misses", getattr(lineup_cache, "misses", 0) - start_misses)
+
+    if return_stats:
+        return best_trades, stats
+    return best_trades
+
+
+@contextlib.contextmanager
+def _stop_on_interrupt(stats: SearchStats, enabled: bool) -> Iterator[None]:
+    """Count a Ctrl-C as a stop of the search when `enabled`, else raise it."""
+    try:
+        yield
+    except KeyboardInterrupt:
+        if not enabled:
+            raise
+        stats.incr("search.interrupted")
+
+
+def _evaluate_spilled(
+    spill: GainSpill,
+    chunks: Iterable[list[Trade]],
+    stats: SearchStats,
+    lineup_cache: LineupCache | None = None,
+) -> None:
+    for chunk in chunks:
+        with stats.stage("evaluate"):
+            for trade in chunk:
+                trade.execute_trade()
+        stats.incr("trades.evaluated", len(chunk))
+        if lineup_cache is not None:
+            with stats.stage("valuations"):
+                chunk = list(iter_valuation_gains(chunk, lineup_cache))
+        with stats.stage("spill"):
+            spill.add(chunk)
+    stats.incr("spill.runs", len(spill.runs))
+    stats.incr("spill.rows", spill.n_spilled)
+
+
+def _save_to_store(
+    store: ResultStore, team: Team, opp_teams: list[Team], trades: list[Trade]
+) -> None:
+    by_opp: dict[str, list[Trade]] = defaultdict(list)
+    for trade in trades:
+        by_opp[trade.team2.name].append(trade)
+    for opp in opp_teams:  # empty pairs are stored too
+        store.save(team, opp, by_opp[opp.name])
+
+
+def eval_trades_many(
+    league,
+    reqs: list[str | Path | dict],
+    *,
+    return_stats: bool = False,
+) -> list[list[Trade]] | list[tuple[list[Trade], SearchStats]]:
+    """
+    Evaluate several reqs scenarios against one league.
+
+    The scenarios share the league's team lookup, package tables and lineup cache,
+    plus one `SearchCache`, so packages filtered the same way and package pairs
+    already executed by an earlier scenario are not redone. Results come back in
+    the order of `reqs`; a scenario with no valid trades gets an empty list.
+    """
+    cache = SearchCache()
+    results = []
+    for scenario in reqs:
+        try:
+            trades, stats = eval_trades(
+                league=league, reqs=scenario, return_stats=True, cache=cache
+            )
+        except ValueError as e:
+            click.secho(f"WARNING: Scenario {scenario!s} failed. --> {e}", fg="red")
+            trades, stats = [], SearchStats()
+        results.append((trades, stats) if return_stats else trades)
+    return results
+
+
+def compare_beam(
+    league, reqs: str | Path | dict, beam_width: int, top: int = 10
+) -> dict:
+    """
+    How close a beam search gets to the exhaustive search of the same reqs.
+
+    Both searches are run, so `reqs` should be small enough to enumerate. Reports
+    the best gain of each and the gap between them, the share of the exhaustive
+    top `top` trades found by the beam, the ratio of the summed top `top` gains,
+    and the trades evaluated and time taken by each.
+    """
+    reqs_loaded = load_reqs(reqs)
+    exhaustive, exhaustive_stats = eval_trades(
+        league, reqs_loaded, return_stats=True, limit=top
     )
+    beam, beam_stats = eval_trades(
+        league, reqs_loaded, return_stats=True, limit=top, beam_width=beam_width
+    )
+
+    def _key(trade: Trade) -> tuple:
+        return (
+            trade.team2.name,
+            frozenset(a.idx for a in trade.sent_assets),
+            frozenset(a.idx for a in trade.rec_assets),
+        )
+
+    beam_keys = {_key(trade) for trade in beam}
+    exhaustive_top = sum(trade.team1_gain for trade in exhaustive)
+    return {
+        "beam_width": beam_width,
+        "top": top,
+        "exhaustive_best_gain": exhaustive[0].team1_gain if exhaustive else None,
+        "beam_best_gain": beam[0].team1_gain if beam else None,
+        "best_gain_gap": (
+            exhaustive[0].team1_gain - (beam[0].team1_gain if beam else 0)
+            if exhaustive
+            else None
+        ),
+        "top_recall": (
+            sum(_key(trade) in beam_keys for trade in exhaustive) / len(exhaustive)
+            if exhaustive
+            else None
+        ),
+        "top_gain_ratio": (
+            sum(trade.team1_gain for trade in beam) / exhaustive_top
+            if exhaustive_top
+            else None
+        ),
+        "exhaustive_trades": exhaustive_stats.counters["trades.evaluated"],
+        "beam_trades": beam_stats.counters["trades.evaluated"],
+        "exhaustive_time": exhaustive_stats.total_time,
+        "beam_time": beam_stats.total_time,
+    }
+
+
+def explain_trades(
+    league, reqs: str | Path | dict, *, calibrate: bool = True
+) -> SearchEstimate:
+    """
+    How large the search of `reqs` is, before running it.
+
+    Counts the packages of every team before and after each filter and the
+    package pairs they make, without evaluating a lineup. With `calibrate`, a
+    small sample of the pairs is executed to project the runtime and memory of
+    the search, and the reqs changes cutting the pairs the most are suggested.
+    """
+    estimate = SearchEstimate(load_reqs(reqs), league)
+    if calibrate:
+        estimate.calibrate()
+        estimate.suggest()
+    return estimate
+
+
+def merge_trades(
+    locs: list[str | Path],
+    sink_to: str | Path,
+    limit: int | None = None,
+    *,
+    rank_by: str | None = None,
+    valuations: list[str] | None = None,
+) -> int:
+    """
+    Combine the results of the shards of a search into its final ranking.
+
+    `locs` are the .ndjson or .parquet results of each shard, best first, and the
+    best `limit` trades over all of them are written to `sink_to`. Shards searched
+    with a `rank_by` req are merged on that valuation, one of the league's
+    `valuations`. Returns the number of trades written.
+    """
+    column = valuation_column(rank_by, valuations)
+    with open_sink(sink_to) as sink:
+        for row in merge_rows(locs, limit=limit, rank_by=column):
+            sink.write_row(row)
+    return sink.n_written
+
+
+def load_league(profile: str | Path, data: str | Path | None, *, refresh_data=False):
+    """Build the league described by a profile file."""
+    from ff_manager.league import PLATFORM_SWITCH
+
+    with Path(profile).open() as f:
+        prof_loaded: dict = yaml.safe_load(f)
+
+    try:
+        league_cls = PLATFORM_SWITCH[prof_loaded["platform"]]
+    except KeyError as e:
+        raise ValueError("Platform must be sleeper or ESPN.") from e
+
+    return league_cls(profile=prof_loaded, data_loc=data, refresh_data=refresh_data)
 
 
 def main(
@@ -58,39 +581,96 @@ def main(
     profile: str | Path,
     data: str | Path | None = None,
     sink_to: str | Path | None = None,
+    *,
+    show_stats: bool = False,
+    memory_report: bool = False,
+    memory_ceiling_mb: float | None = None,
+    store: str | Path | None = None,
+    top: int = 0,
+    shard: str | None = None,
+    limit: int | None = None,
+    memory_budget_mb: float | None = None,
+    spill_dir: str | Path | None = None,
+    beam_width: int | None = None,
+    time_budget: float | None = None,
+    interruptible: bool = True,
 ) -> None:
-    with Path(reqs).open() as f:
-        reqs_loaded = defaultdict(lambda: None) | yaml.safe_load(f)
-
-    reqs_loaded = ingest_reqs(reqs_loaded)
+    """
+    Find the best trades for the team in REQS, using the league in PROFILE.
 
-    with Path(profile).open() as f:
-        prof_loaded: dict = yaml.safe_load(f)
-
-    if reqs_loaded["refresh_data"]:
-        from ff_manager.data import get_espn_data, get_sleeper_data
-
-        platform = prof_loaded["platform"]
-        if platform == "sleeper":
-            get_sleeper_data(league_id=prof_loaded["id"], parquet_outfile=data)
-        elif platform == "espn":
-            get_espn_data(
-                league_id=prof_loaded["id"],
-                espn_s2=prof_loaded["s2"],
-                swid=prof_loaded["swid"],
-                outfile=data,
-            )
+    An `interruptible` run returns the best trades found so far on Ctrl-C (see
+    `eval_trades`), and a Ctrl-C before the search has any, such as while the
+    league loads or in a search mode that can not be interrupted, ends the run
+    with a warning rather than a traceback.
+    """
+    reqs_loaded = load_reqs(reqs)
+    search_kwargs = {
+        "return_stats": True,
+        "memory_report": memory_report,
+        "memory_ceiling_mb": memory_ceiling_mb,
+        "store": store,
+        "shard": shard,
+        "limit": limit,
+        "memory_budget_mb": memory_budget_mb,
+        "spill_dir": spill_dir,
+        "beam_width": beam_width,
+        "time_budget": time_budget,
+        "interruptible": interruptible,
+    }
+    try:
+        league = load_league(
+            profile, data, refresh_data=bool(reqs_loaded.get("refresh_data"))
+        )
+        if sink_to:
+            with open_sink(sink_to, top=top) as sink:
+                _, stats = eval_trades(league, reqs_loaded, sink=sink, **search_kwargs)
+            top_trades = sink.top_trades
         else:
-            raise ValueError("Platform must be sleepr or ESPN.")
+            trades, stats = eval_trades(league, reqs_loaded, **search_kwargs)
+            top_trades = trades[:top]
+    except KeyboardInterrupt:
+        if not interruptible:
+            raise
+        click.secho(
+            "WARNING: Stopped by Ctrl-C before any trades were found.", fg="red"
+        )
+        return
 
-    loaded_data: list[dict] = get_data(data)  # noqa: F821
+    if stats.counters.get("search.deadline") or stats.counters.get(
+        "search.interrupted"
+    ):
+        reason = (
+            "the time budget" if stats.counters.get("search.deadline") else "Ctrl-C"
+        )
+        covered = (
+            f"{stats.coverage:.1%} of {stats.counters['package_pairs.total']:,} trades"
+            if stats.coverage is not None
+            else "building the packages"
+        )
+        click.secho(f"WARNING: Stopped by {reason} after {covered}.", fg="red")
+    click.secho(f"Located {stats.counters['trades.selected']} trades!", fg="green")
+    for trade in top_trades:
+        trade.pprint()
+    if show_stats or memory_report:
+        stats.pprint()
 
-    trades = _main(  # noqa: F821
-        reqs=reqs_loaded, prof=prof_loaded, data=loaded_data, sink_to=sink_to
-    )
-    if sink_to:
-        with Path(sink_to).open("w") as f:
-            original_stdout = sys.stdout
-            sys.stdout = f
-            print(trades)  # print to the subprocess
-            sys.stdout = original_stdout
+
+def main_many(
+    reqs: list[str | Path],
+    profile: str | Path,
+    data: str | Path | None = None,
+    sink_dir: str | Path | None = None,
+    *,
+    show_stats: bool = False,
+) -> None:
+    """Find the best trades for each reqs file, loading the league once."""
+    league = load_league(profile, data)
+    results = eval_trades_many(league, list(reqs), return_stats=True)
+    for reqs_loc, (trades, stats) in zip(reqs, results, strict=True):
+        click.secho(f"{reqs_loc!s}: {len(trades)} trades", fg="green")
+        if show_stats:
+            stats.pprint()
+        if sink_dir:
+            Path(sink_dir).mkdir(parents=True, exist_ok=True)
+            with open_sink(Path(sink_dir) / f"{Path(reqs_loc).stem}.ndjson") as sink:
+                sink.write_many(trades)
@@ -0,0 +1,165 @@
+"""Heuristic trade search, growing packages one asset at a time."""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING
+
+from tqdm import tqdm
+
+from ff_manager.functions import get_opposing_teams
+from ff_manager.stats import SearchStats
+from ff_manager.trade import Package, Trade
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from ff_manager.filter import Filter, PackageFilter, ReceiveFilter, SendFilter
+    from ff_manager.league import BaseLeague as League
+    from ff_manager.model import Asset, Team
+
+
+def _passes(package_filter: Filter, package: Package) -> bool:
+    try:
+        return package_filter(package)
+    except TypeError:  # skipped, as when assembling trades
+        return True
+
+
+def _anchors(
+    trade_filter: Filter, assets: Sequence[Asset], pool: list[int], max_assets: int
+) -> list[tuple[int, ...]]:
+    """Packages the beam starts from: the filter's anchors, or every allowed asset."""
+    anchors = trade_filter.anchors(assets)
+    if anchors is None:
+        return [(i,) for i in pool]
+    allowed = set(pool)
+    return [a for a in anchors if len(a) <= max_assets and allowed.issuperset(a)]
+
+
+def beam_score(trade: Trade, max_fleece: float | None = None) -> float:
+    """
+    Optimistic gain for `team1` of an executed trade, once grown.
+
+    Assets added later may move the trade's surplus (the gains of both teams
+    summed) from one team to the other, so a trade past `max_fleece` is not
+    dropped: it is scored by the best gain it could reach within `max_fleece`
+    if all of its surplus were kept.
+    """
+    if max_fleece is None:
+        return trade.team1_gain
+    surplus = trade.team1_gain + trade.team2_gain
+    return min(trade.team1_gain, (surplus + max_fleece) / 2)
+
+
+def beam_search_trades(
+    team: Team,
+    send_filter: SendFilter,
+    receive_filter: ReceiveFilter,
+    package_filter: PackageFilter,
+    league: League,
+    beam_width: int,
+    stats: SearchStats | None = None,
+    opp_teams: list[Team] | None = None,
+    max_fleece: float | None = None,
+) -> list[Trade]:
+    """
+    Executed trades of up to `max_assets` assets a side, found by beam search.
+
+    Per opposing team, every 1-for-1 trade is evaluated first. Each step then
+    extends `beam_width` trades with one more asset on either side, until both
+    sides are full, so a step evaluates at most `beam_width` times the size of
+    both rosters. The beam takes the best trades by `beam_score` and by surplus
+    in turn: a trade with a large surplus may grow into a balanced one that a
+    single ranking would drop early. Every trade evaluated along the
+    way that passes the filters is returned, for the usual selection.
+
+    The filters shape the search rather than only its result, so the beam is not
+    spent on trades they would throw away. Assets a filter does not allow (see
+    `Filter.allows`) are never added, and packages start from the assets a
+    filter requires (see `Filter.anchors`), such as `return_contains`, rather
+    than from every single asset.
+    """
+    if beam_width < 1:
+        raise ValueError("The beam width must be at least 1.")
+    stats = stats if stats is not None else SearchStats()
+    if opp_teams is None:
+        opp_teams = get_opposing_teams(team, package_filter, league)
+    max_assets = package_filter.max_assets
+    send_pool = [i for i, a in enumerate(team.assets) if send_filter.allows(a)]
+    send_anchors = _anchors(send_filter, team.assets, send_pool, max_assets)
+
+    trades: list[Trade] = []
+    for opp in tqdm(opp_teams, "Searching Trades: "):
+        receive_pool = [
+            j
+            for j, a in enumerate(opp.assets)
+            if package_filter.allows(a) and receive_filter.allows(a)
+        ]
+        receive_anchors = _anchors(package_filter, opp.assets, receive_pool, max_assets)
+        seen: dict[tuple[tuple[int, ...], tuple[int, ...]], Trade] = {}
+        frontier = [
+            (send_idx, receive_idx)
+            for send_idx in send_anchors
+            for receive_idx in receive_anchors
+        ]
+        while frontier:
+            stats.incr("beam.steps")
+            with stats.stage("evaluate"):
+                for send_idx, receive_idx in frontier:
+                    trade = Trade(
+                        team1=team,
+                        team2=opp,
+                        package1=Package(
+                            tuple(team.assets[i] for i in send_idx), send_idx
+                        ),
+                        package2=Package(
+                            tuple(opp.assets[i] for i in receive_idx), receive_idx
+                        ),
+                        lineup_setter=league.lineup_setter,
+                    )
+                    trade.execute_trade()
+                    seen[send_idx, receive_idx] = trade
+            stats.incr("trades.evaluated", len(frontier))
+
+            # Grow the best trades by one asset, on either side:
+            by_gain = sorted(
+                frontier, key=lambda state: -beam_score(seen[state], max_fleece)
+            )
+            by_surplus = sorted(
+                frontier,
+                key=lambda state: -(seen[state].team1_gain + seen[state].team2_gain),
+            )
+            beam = list(
+                itertools.islice(
+                    dict.fromkeys(
+                        itertools.chain.from_iterable(
+                            zip(by_gain, by_surplus, strict=True)
+                        )
+                    ),
+                    beam_width,
+                )
+            )
+            grown: dict[tuple[tuple[int, ...], tuple[int, ...]], None] = {}
+            for send_idx, receive_idx in beam:
+                if len(send_idx) < max_assets:
+                    for i in send_pool:
+                        if i not in send_idx:
+                            grown[tuple(sorted((*send_idx, i))), receive_idx] = None
+                if len(receive_idx) < max_assets:
+                    for j in receive_pool:
+                        if j not in receive_idx:
+                            grown[send_idx, tuple(sorted((*receive_idx, j)))] = None
+            frontier = [state for state in grown if state not in seen]
+
+        with stats.stage("filter"):
+            kept = [
+                trade
+                for trade in seen.values()
+                if _passes(send_filter, trade.package1)
+                and _passes(package_filter, trade.package2)
+                and _passes(receive_filter, trade.package2)
+            ]
+        stats.incr("trades.assembled", len(kept))
+        trades.extend(kept)
+    return trades
@@ -3,9 +3,32 @@ SUPER_POS = ("QB", "RB", "WR", "TE")
 
 REQUIRED_REQ_FIELDS = ("team",)
 
+# Reqs left out of the key of stored gains. All but `team` only pick from or
+# summarize evaluated trades; `team` does pick what is evaluated, but the stored
+# pairs are already keyed by the roster of the searching team.
+SELECTION_REQ_FIELDS = (
+    "team",
+    "max_fleece",
+    "min_gain",
+    "rank_by",
+    "refresh_data",
+    "draws",
+    "draw_spread",
+    "draw_dist",
+    "draw_seed",
+)
+
+# Trade gains (trades x draws) computed per batch when summarizing gain draws
+DRAW_BATCH_VALUES = 2**15
+
+# Days after which a game still without a result is taken as postponed or
+# cancelled, and no longer triggers a download of the schedule
+SCHEDULE_RESULT_DAYS = 7
+
 KNOWN_PLAYER_MISMATCHES = {"Marquise Brown": "Hollywood Brown"}
 
 TEAM_NAME_MATCH_CAP = 0.9
+PLAYER_NAME_MATCH_CAP = 0.95
 SPECIALS_SLOTS = ("SUPER", "FLEX", "SUPERFLEX")
 
 LINEUP_KEY_SORTER = ("QB", "RB", "WR", "TE", "FLEX", "SUPERFLEX", "SUPER")
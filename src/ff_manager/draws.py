@@ -0,0 +1,87 @@
+"""Trade gains under sampled player values."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ff_manager.const import DRAW_BATCH_VALUES
+from ff_manager.lineup import LineupCache, make_lineup_kernel
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy as np
+
+    from ff_manager.league import BaseLeague as League
+    from ff_manager.model import Asset
+
+DRAW_DISTS = ("lognormal", "normal")
+
+
+class ValueDraws:
+    """
+    `n` draws of every player's value, around their `value`.
+
+    `spread` is the standard deviation of a draw relative to the value. Lognormal
+    draws keep the value as their mean and stay positive; normal draws are clipped
+    at 0. Draws are generated once per league from `seed`, so a search is
+    repeatable, and every roster is valued under the same draws.
+    """
+
+    def __init__(
+        self,
+        n: int = 200,
+        spread: float = 0.15,
+        dist: str = "lognormal",
+        seed: int | None = None,
+    ):
+        if n < 1:
+            raise ValueError("The number of draws must be at least 1.")
+        if spread < 0:
+            raise ValueError("The draw spread must not be negative.")
+        if dist not in DRAW_DISTS:
+            raise ValueError(f"The draw distribution must be one of {DRAW_DISTS}.")
+        self.n = n
+        self.spread = spread
+        self.dist = dist
+        self.seed = seed
+
+    @classmethod
+    def from_reqs(cls, reqs: dict) -> ValueDraws | None:
+        """The draws asked for by `draws` and the `draw_*` reqs, if any."""
+        if not reqs.get("draws"):
+            return None
+        opts = {
+            "spread": reqs.get("draw_spread"),
+            "dist": reqs.get("draw_dist"),
+            "seed": reqs.get("draw_seed"),
+        }
+        return cls(n=reqs["draws"], **{k: v for k, v in opts.items() if v is not None})
+
+    @property
+    def batch_size(self) -> int:
+        """Trades per batch, so a batch holds about `DRAW_BATCH_VALUES` gains."""
+        return max(1, DRAW_BATCH_VALUES // self.n)
+
+    def sample(self, players: Sequence[Asset]) -> np.ndarray:
+        """A `(players, n)` array of drawn values, by league index."""
+        import numpy as np
+
+        rng = np.random.default_rng(self.seed)
+        values = np.array([player.value or 0 for player in players], dtype=float)
+        z = rng.standard_normal((len(values), self.n))
+        if self.dist == "lognormal":
+            sigma = np.sqrt(np.log1p(self.spread**2))
+            return values[:, None] * np.exp(sigma * z - sigma**2 / 2)
+        return np.clip(values[:, None] * (1 + self.spread * z), 0, None)
+
+    def make_cache(self, league: League) -> LineupCache:
+        """A lineup cache of the league, valuing rosters under the draws."""
+        return LineupCache(
+            league.lineup_setter.setter,
+            players=league.players,
+            kernel=make_lineup_kernel(
+                backend=league.profile.get("lineup_backend"), **league.profile["lineup"]
+            ),
+            league_values=self.sample(league.players),
+        )
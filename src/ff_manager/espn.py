@@ -0,0 +1,120 @@
+"""Caches for the ESPN ingestion path."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+from ff_manager.const import SCHEDULE_RESULT_DAYS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    import polars as pl
+
+
+class ResponseCache:
+    """
+    Record the responses of an `espn_api` request object to disk, or replay them.
+
+    Wraps the `espn_request` of an `espn_api` league: every method called on it is
+    keyed by its name and arguments, and its JSON response is written under
+    `path`. In `replay` mode calls are answered from the recordings alone, so a
+    league can be rebuilt offline; a call that was never recorded raises.
+    """
+
+    def __init__(self, requests: object, path: Path, *, replay: bool = False):
+        self._requests = requests
+        self.path = path
+        self.replay = replay
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _loc(self, name: str, args: tuple, kwargs: dict) -> Path:
+        payload = json.dumps([name, args, kwargs], sort_keys=True, default=str)
+        key = hashlib.sha256(payload.encode()).hexdigest()[:16]
+        return self.path / f"{name}-{key}.json"
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._requests, name)
+        if not callable(attr):
+            return attr
+
+        def _cached(*args, **kwargs):
+            loc = self._loc(name, args, kwargs)
+            if self.replay:
+                try:
+                    return json.loads(loc.read_text())
+                except FileNotFoundError as e:
+                    raise FileNotFoundError(
+                        f"No recorded ESPN response for {name}{args!r} in "
+                        f"{self.path}. Refresh once without `replay` to record it."
+                    ) from e
+            response = attr(*args, **kwargs)
+            loc.write_text(json.dumps(response))
+            return response
+
+        return _cached
+
+
+def _games_finished_since(schedule: pl.DataFrame, today: datetime.date) -> bool:
+    """
+    Whether a game without a result was played before `today`.
+
+    Games still without a result `SCHEDULE_RESULT_DAYS` after their day were
+    postponed or cancelled, and are not waited on.
+    """
+    import polars as pl
+
+    cutoff = today - datetime.timedelta(days=SCHEDULE_RESULT_DAYS)
+    pending = schedule.filter(
+        pl.col("result").is_null() & (pl.col("gameday") >= cutoff.isoformat())
+    )
+    if pending.is_empty():  # the season is over
+        return False
+    return pending["gameday"].min() < today.isoformat()
+
+
+def load_schedule(
+    year: int,
+    cache_dir: Path | None = None,
+    today: datetime.date | None = None,
+    download: Callable[[int], pl.DataFrame] | None = None,
+) -> pl.DataFrame:
+    """
+    The NFL schedule of a season, cached per season in `cache_dir`.
+
+    The cached schedule is kept until a game still missing its result was played
+    before `today`, so it is downloaded again only once new games have finished.
+    A game missing its result for over `SCHEDULE_RESULT_DAYS` is not waited on.
+    """
+    import polars as pl
+
+    today = today if today is not None else datetime.datetime.now(datetime.UTC).date()
+    loc = cache_dir / f"schedule-{year}.parquet" if cache_dir is not None else None
+    if loc is not None and loc.exists():
+        schedule = pl.read_parquet(loc)
+        if not _games_finished_since(schedule, today):
+            return schedule
+
+    if download is None:
+        import nfl_data_py as nfl
+
+        schedule = pl.DataFrame(nfl.import_schedules([year]))
+    else:
+        schedule = download(year)
+    if loc is not None:
+        loc.parent.mkdir(parents=True, exist_ok=True)
+        schedule.write_parquet(loc)
+    return schedule
+
+
+def current_week(schedule: pl.DataFrame) -> int | None:
+    """First week of the schedule with a game still missing its result."""
+    import polars as pl
+
+    return (
+        schedule.filter(pl.col("result").is_null()).select(pl.col("week").min()).item()
+    )
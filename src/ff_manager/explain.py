@@ -0,0 +1,269 @@
+"""Size of a trade search, estimated before running it."""
+
+from __future__ import annotations
+
+import contextlib
+import random
+import statistics
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from ff_manager.filter import PackageFilter, ReceiveFilter, SendFilter
+from ff_manager.functions import get_opposing_teams
+from ff_manager.lineup import LineupCache
+from ff_manager.memory import MB
+from ff_manager.trade import Trade
+from ff_manager.utils import containerize_str
+
+if TYPE_CHECKING:
+    from ff_manager.league import BaseLeague as League
+    from ff_manager.trade import Package
+
+# Trades executed to time and weigh a search
+CALIBRATION_TRADES = 1_024
+CALIBRATION_CHUNKS = 4
+# Reqs changes reported, best first
+N_SUGGESTIONS = 3
+
+
+def _filters(
+    reqs: dict, league: League
+) -> tuple[SendFilter, ReceiveFilter, PackageFilter]:
+    """The filters of a search, bound to the league. Pruning is left out."""
+    reqs = {**reqs, "prune": None}
+    filters = (SendFilter(**reqs), ReceiveFilter(**reqs), PackageFilter(**reqs))
+    for trade_filter in filters:
+        trade_filter.bind(league.name_index)
+    return filters
+
+
+class SearchEstimate:
+    """
+    Packages and package pairs of a search, counted without evaluating a lineup.
+
+    The packages of the team and of every opposing team are counted once
+    enumerated and after each filter, in the order the search applies them. A
+    `prune` req is not applied, as it values lineups; the pairs are then an upper
+    bound. `calibrate` executes a sample of the pairs to project the runtime and
+    the memory of the search.
+    """
+
+    def __init__(self, reqs: dict, league: League):
+        self.reqs = reqs
+        self.league = league
+        self.team = league[reqs["team"]]
+        send_filter, receive_filter, package_filter = _filters(reqs, league)
+        self.max_assets = package_filter.max_assets
+
+        packages = league.get_packages(self.team, self.max_assets)
+        self.send_counts = {"enumerated": len(packages)}
+        self.send_packages = [p for p in packages if send_filter(p)]
+        self.send_counts["send_filter"] = len(self.send_packages)
+
+        self.receive_counts: dict[str, dict[str, int]] = {}
+        self.receive_packages: dict[str, list[Package]] = {}
+        try:
+            self.opp_teams = get_opposing_teams(self.team, package_filter, league)
+        except ValueError:  # no opposing team
+            self.opp_teams = []
+        for opp in self.opp_teams:
+            packages = league.get_packages(opp, self.max_assets)
+            counts = {"enumerated": len(packages)}
+            with contextlib.suppress(TypeError):
+                packages = [p for p in packages if package_filter(p)]
+            counts["package_filter"] = len(packages)
+            with contextlib.suppress(TypeError):
+                packages = [p for p in packages if receive_filter(p)]
+            counts["receive_filter"] = len(packages)
+            self.receive_counts[opp.name] = counts
+            self.receive_packages[opp.name] = packages
+
+        self.seconds_per_trade: float | None = None
+        self.bytes_per_trade: float | None = None
+        self.suggestions: list[dict] = []
+
+    @property
+    def n_pairs(self) -> int:
+        n_receive = sum(map(len, self.receive_packages.values()))
+        return len(self.send_packages) * n_receive
+
+    def _sample_trades(self, n: int, seed: int, cache: LineupCache) -> list[Trade]:
+        """`n` trades over random pairs."""
+        rng = random.Random(seed)
+        opps = [opp for opp in self.opp_teams if self.receive_packages[opp.name]]
+        weights = [len(self.receive_packages[opp.name]) for opp in opps]
+        trades = []
+        for opp in rng.choices(opps, weights, k=n):
+            trades.append(
+                Trade(
+                    team1=self.team,
+                    team2=opp,
+                    package1=rng.choice(self.send_packages),
+                    package2=rng.choice(self.receive_packages[opp.name]),
+                    lineup_setter=cache,
+                )
+            )
+        return trades
+
+    def calibrate(self, n: int = CALIBRATION_TRADES, seed: int = 0) -> None:
+        """
+        Time and weigh `n` trades over random pairs of the search.
+
+        Lineups go through a fresh cache, leaving the league's untouched. Trades
+        are built and executed in `CALIBRATION_CHUNKS` chunks, timed apart, and
+        the median chunk is kept. They are then executed again, with their lineups
+        cached as a long search only holds those of its latest rosters, to measure
+        the memory each trade holds once executed.
+        """
+        if not self.n_pairs:
+            return
+        cache = LineupCache(
+            getattr(self.league.lineup_setter, "setter", self.league.lineup_setter),
+            players=self.league.players,
+        )
+        chunk_size = max(1, n // CALIBRATION_CHUNKS)
+        seconds = []
+        for chunk in range(CALIBRATION_CHUNKS):
+            start = time.perf_counter()
+            for trade in self._sample_trades(chunk_size, seed + chunk, cache):
+                trade.execute_trade()
+            seconds.append((time.perf_counter() - start) / chunk_size)
+        self.seconds_per_trade = statistics.median(seconds)
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            trades = []
+            for chunk in range(CALIBRATION_CHUNKS):
+                trades += self._sample_trades(chunk_size, seed + chunk, cache)
+            for trade in trades:
+                trade.execute_trade()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+        self.bytes_per_trade = (after - before) / len(trades)
+
+    @property
+    def projected_seconds(self) -> float | None:
+        if self.seconds_per_trade is None:
+            return None
+        return self.n_pairs * self.seconds_per_trade
+
+    @property
+    def projected_bytes(self) -> float | None:
+        if self.bytes_per_trade is None:
+            return None
+        return self.n_pairs * self.bytes_per_trade
+
+    def suggest(self, n: int = N_SUGGESTIONS) -> list[dict]:
+        """
+        The reqs changes cutting the pairs the most, best first.
+
+        Each candidate change (one asset fewer, a minimum asset value at the
+        league median, a single wanted position or one more position not
+        received) is counted as a search of its own. Changes leaving no pairs
+        are skipped.
+        """
+        if not self.n_pairs:
+            return []
+        positions = sorted({str(p.pos) for p in self.league.players if p.pos})
+        not_pos = list(containerize_str(self.reqs.get("return_not_pos") or ()))
+        candidates: list[dict] = []
+        if self.max_assets > 1:
+            candidates.append({"max_assets": self.max_assets - 1})
+        if self.reqs.get("min_asset_value") is None:
+            median = statistics.median(p.value for p in self.league.players)
+            candidates.append({"min_asset_value": median})
+        if not (self.reqs.get("target_pos") or self.reqs.get("return_contains")):
+            candidates += [{"target_pos": pos} for pos in positions]
+        candidates += [
+            {"return_not_pos": [*not_pos, pos]}
+            for pos in positions
+            if pos not in not_pos
+        ]
+
+        suggestions = []
+        for change in candidates:
+            try:
+                n_pairs = SearchEstimate(self.reqs | change, self.league).n_pairs
+            except ValueError:  # conflicting reqs
+                continue
+            if n_pairs:
+                suggestions.append(
+                    {
+                        "change": change,
+                        "pairs": n_pairs,
+                        "cut": 1 - n_pairs / self.n_pairs,
+                    }
+                )
+        suggestions.sort(key=lambda suggestion: suggestion["pairs"])
+        self.suggestions = suggestions[:n]
+        return self.suggestions
+
+    def to_dict(self) -> dict:
+        return {
+            "team": self.team.name,
+            "max_assets": self.max_assets,
+            "send": dict(self.send_counts),
+            "receive": {name: dict(c) for name, c in self.receive_counts.items()},
+            "pairs": self.n_pairs,
+            "seconds_per_trade": self.seconds_per_trade,
+            "projected_seconds": self.projected_seconds,
+            "bytes_per_trade": self.bytes_per_trade,
+            "projected_bytes": self.projected_bytes,
+            "suggestions": list(self.suggestions),
+        }
+
+    def pprint(self) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=f"Packages of {self.team.name} and opposing teams")
+        for column in ("Team", "Enumerated", "Package Filter", "Send/Receive Filter"):
+            table.add_column(column, style="cyan" if column == "Team" else "magenta")
+        table.add_row(
+            f"{self.team.name} (send)",
+            f"{self.send_counts['enumerated']:,}",
+            "",
+            f"{self.send_counts['send_filter']:,}",
+        )
+        for name, counts in self.receive_counts.items():
+            table.add_row(
+                name,
+                f"{counts['enumerated']:,}",
+                f"{counts['package_filter']:,}",
+                f"{counts['receive_filter']:,}",
+            )
+
+        summary = Table(title="Search Estimate")
+        summary.add_column("Metric", style="cyan", no_wrap=True)
+        summary.add_column("Value", style="magenta", no_wrap=True)
+        summary.add_row("pairs", f"{self.n_pairs:,}")
+        if self.projected_seconds is not None:
+            summary.add_row("trades_per_second", f"{1 / self.seconds_per_trade:,.0f}")
+            summary.add_row("projected_time", f"{self.projected_seconds:,.1f}s")
+            summary.add_row("projected_memory", f"{self.projected_bytes / MB:,.1f}MB")
+        if self.reqs.get("prune"):
+            summary.add_row("prune", "not applied, the estimate is an upper bound")
+
+        console = Console()
+        console.print(table)
+        console.print(summary)
+
+        if not self.suggestions:
+            return
+        changes = Table(title="Filters Cutting the Search the Most")
+        changes.add_column("Change", style="green")
+        changes.add_column("Pairs", style="magenta", no_wrap=True)
+        changes.add_column("Cut", style="magenta", no_wrap=True)
+        for suggestion in self.suggestions:
+            changes.add_row(
+                ", ".join(f"{k}: {v}" for k, v in suggestion["change"].items()),
+                f"{suggestion['pairs']:,}",
+                f"{suggestion['cut']:.1%}",
+            )
+        console.print(changes)
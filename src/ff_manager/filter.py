@@ -1,23 +1,99 @@
 from __future__ import annotations
 
 import contextlib
+import functools
+import operator
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
+from ff_manager.model import mask_assets
+from ff_manager.prune import PRUNE_MODES
+from ff_manager.trade import Package
 from ff_manager.utils import containerize_str
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Container, Generator
+    from collections.abc import Callable, Generator, Sequence
 
     from ff_manager.model import Asset
-    from ff_manager.trade import Package
+    from ff_manager.names import NameIndex
 
 
 class Filter(ABC):
+    # Options naming assets, checked against packages by `_contains`
+    _asset_fields: tuple[str, ...] = ()
+
     @abstractmethod
     def __call__(self, package: Package) -> bool:
         pass
 
+    def allows(self, asset: Asset) -> bool:
+        """
+        Whether the asset may be in a package passing the filter.
+
+        Only the checks an asset fails on its own are made: a package of allowed
+        assets may still fail the filter, but a package holding an asset that is
+        not allowed never passes it.
+        """
+        return True
+
+    def anchors(self, assets: Sequence[Asset]) -> list[tuple[int, ...]] | None:
+        """
+        Smallest packages of a roster meeting the filter's requirements.
+
+        Packages are given as positions in `assets`, and every package passing the
+        filter holds one of them. None when the filter requires no asset.
+        """
+        return None
+
+    def _anchor_assets(
+        self, field: str, assets: Sequence[Asset], *, exclusive: bool
+    ) -> list[tuple[int, ...]]:
+        """Anchors of the assets named by `field`, all of them if `exclusive`."""
+        named = tuple(
+            i
+            for i, asset in enumerate(assets)
+            if self._contains(field, Package((asset,)))
+        )
+        if not exclusive:
+            return [(i,) for i in named]
+        package = Package(tuple(assets[i] for i in named))
+        return [named] if named and self._contains(field, package, all) else []
+
+    @property
+    def cache_key(self) -> str:
+        """Equal for filters of the same type and options."""
+        options = sorted((k, v) for k, v in vars(self).items() if k[0] != "_")
+        return f"{type(self).__name__}{options!r}"
+
+    def bind(self, name_index: NameIndex) -> list[str]:
+        """
+        Resolve the named assets to league indices, once per search.
+
+        Each name becomes a bitmask over the league index, so membership checks
+        against packages are bitwise ANDs instead of name comparisons. Unbound
+        filters keep comparing names. Returns the names matching no asset.
+        """
+        self._masks: dict[str, tuple[int, ...]] = {}
+        unknown: list[str] = []
+        for field in self._asset_fields:
+            names = getattr(self, field)
+            if names is None:
+                continue
+            resolved, missing = name_index.resolve_many(names)
+            self._masks[field] = tuple(sum(1 << i for i in ids) for ids in resolved)
+            unknown.extend(missing)
+        return unknown
+
+    def _contains(
+        self, field: str, package: Package, how: Callable[[Generator], bool] = any
+    ) -> bool:
+        """Whether the package holds `how` many of the assets named by `field`."""
+        masks = getattr(self, "_masks", {}).get(field)
+        mask = package.mask
+        if masks is None or mask is None:
+            return how(name in package for name in getattr(self, field))
+        return how(mask & name_mask for name_mask in masks)
+
 
 class SendFilter(Filter):
     """
@@ -31,6 +107,8 @@ class SendFilter(Filter):
     assets_exclusive (bool): Whether to only send those particular assets.
     """
 
+    _asset_fields = ("assets", "not_assets")
+
     def __init__(
         self,
         assets: tuple[str] | None = None,
@@ -49,6 +127,26 @@ class SendFilter(Filter):
         self.not_pos = containerize_str(not_pos)
         self.min_asset_value = min_asset_value
 
+    def allows(self, asset: Asset) -> bool:
+        if self.not_assets is not None and self._contains(
+            "not_assets", Package((asset,))
+        ):
+            return False
+        return self.min_asset_value is None or asset.value >= self.min_asset_value
+
+    def anchors(self, assets: Sequence[Asset]) -> list[tuple[int, ...]] | None:
+        if self.assets is not None:
+            return self._anchor_assets(
+                "assets", assets, exclusive=self.assets_exclusive
+            )
+        if self.pos is not None:
+            return [
+                (i,)
+                for i, asset in enumerate(assets)
+                if asset.slots and any(pos in asset.slots for pos in self.pos)
+            ]
+        return None
+
     def __call__(self, package: Package) -> bool:
         """Filter package."""
         # Pos:
@@ -62,7 +160,7 @@ class SendFilter(Filter):
 
         # Not Assets:
         with contextlib.suppress(TypeError):
-            if any(asset for asset in self.not_assets if asset in package):
+            if self._contains("not_assets", package):
                 return False
 
         # Assets:
@@ -71,8 +169,8 @@ class SendFilter(Filter):
             exclusive_send_assets: Callable[[Generator], bool] = (
                 all if self.assets_exclusive else any
             )
-            necessary_assets_in_package = exclusive_send_assets(
-                player in package for player in self.assets
+            necessary_assets_in_package = self._contains(
+                "assets", package, exclusive_send_assets
             )
             if not necessary_assets_in_package:
                 return False
@@ -94,8 +192,11 @@ class PackageFilter(Filter):
     assets_from_team (str | None, optional): Team to draw potential recieve assets from.
     target_pos (tuple[Pos] | None, optional): Positions to be included.
     return_contains_exclusive (bool, optional): _description_. Defaults to False.
+    prune (str | None, optional): Drop dominated packages, `exact` or `dominance`.
     """
 
+    _asset_fields = ("return_contains",)
+
     def __init__(
         self,
         max_assets: int = 2,
@@ -106,10 +207,14 @@ class PackageFilter(Filter):
         not_receive_pos: tuple | None = None,
         *,
         return_contains_exclusive: bool = False,
+        prune: str | None = None,
         **kwargs,
     ):
+        if prune is not None and prune not in PRUNE_MODES:
+            raise ValueError(f"The prune mode must be one of {PRUNE_MODES}.")
         self.max_assets = max_assets
-        self.return_contains = return_contains
+        self.prune = prune
+        self.return_contains = containerize_str(return_contains)
         self.assets_from_team = containerize_str(assets_from_team)  # ? make set
         self.assets_not_from_team = containerize_str(assets_not_from_team)
         self.not_receive_pos = containerize_str(not_receive_pos)
@@ -122,12 +227,18 @@ class PackageFilter(Filter):
 
         self.return_contains_exclusive = return_contains_exclusive
 
-    def get_matching_teams(self, league_assets: Container[Asset]) -> set[str]:
+    def get_matching_teams(self, league_assets: Sequence[Asset]) -> set[str]:
         """Find all (including own) teams matching the criteria."""
         if self.assets_from_team:
             return set(self.assets_from_team)
 
         # Teams owning a desired asset
+        masks = getattr(self, "_masks", {}).get("return_contains")
+        if masks is not None:
+            wanted = mask_assets(
+                functools.reduce(operator.or_, masks, 0), league_assets
+            )
+            return {asset.team_name for asset in wanted}
         with contextlib.suppress(TypeError):
             return {
                 asset.team_name
@@ -143,6 +254,22 @@ class PackageFilter(Filter):
 
         return all_teams
 
+    def allows(self, asset: Asset) -> bool:
+        return self.not_receive_pos is None or asset.pos not in self.not_receive_pos
+
+    def anchors(self, assets: Sequence[Asset]) -> list[tuple[int, ...]] | None:
+        if self.return_contains is not None:
+            return self._anchor_assets(
+                "return_contains", assets, exclusive=self.return_contains_exclusive
+            )
+        if self.target_pos is not None:
+            return [
+                (i,)
+                for i, asset in enumerate(assets)
+                if asset.pos is None or asset.pos in self.target_pos
+            ]
+        return None
+
     def __call__(self, package: Package) -> bool:
         # Return contains:
         with contextlib.suppress(TypeError):  # if no return contains
@@ -150,8 +277,8 @@ class PackageFilter(Filter):
             exclusive_return_contains: Callable[[Generator], bool] = (
                 all if self.return_contains_exclusive else any
             )
-            necessary_assets_in_package = exclusive_return_contains(
-                player in package for player in self.return_contains
+            necessary_assets_in_package = self._contains(
+                "return_contains", package, exclusive_return_contains
             )
             if not necessary_assets_in_package:
                 return False
@@ -174,6 +301,8 @@ class PackageFilter(Filter):
 class ReceiveFilter(Filter):
     """operates on the recieve package."""
 
+    _asset_fields = ("return_does_not_contain",)
+
     def __init__(
         self,
         min_asset_value: int | None = None,
@@ -181,10 +310,19 @@ class ReceiveFilter(Filter):
         return_not_pos: tuple | None = None,
         **kwargs,
     ):
-        self.return_does_not_contain = return_does_not_contain
+        self.return_does_not_contain = containerize_str(return_does_not_contain)
         self.return_not_pos = containerize_str(return_not_pos)
         self.min_asset_value = min_asset_value
 
+    def allows(self, asset: Asset) -> bool:
+        if self.return_not_pos is not None and asset.pos in self.return_not_pos:
+            return False
+        if self.return_does_not_contain is not None and self._contains(
+            "return_does_not_contain", Package((asset,))
+        ):
+            return False
+        return self.min_asset_value is None or asset.value >= self.min_asset_value
+
     def __call__(self, package: Package) -> bool:
         # Invalid Positions:
         with contextlib.suppress(TypeError):
@@ -196,9 +334,7 @@ class ReceiveFilter(Filter):
 
         # Return Does Not Contain:
         with contextlib.suppress(TypeError):
-            any_invalid_players = any(
-                player in package for player in self.return_does_not_contain
-            )
+            any_invalid_players = self._contains("return_does_not_contain", package)
             if any_invalid_players:
                 return False
 
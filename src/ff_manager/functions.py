@@ -3,132 +3,480 @@
 from __future__ import annotations
 
 import contextlib
+import copy
 import itertools
 from typing import TYPE_CHECKING
 
-import numpy as np
 from tqdm import tqdm
 
+from ff_manager.prune import prune_packages
+from ff_manager.stats import SearchStats
+from ff_manager.store import ResultStore
 from ff_manager.trade import Package, Trade
 
 if TYPE_CHECKING:
-    from ff_manager.filter import PackageFilter, ReceiveFilter, SendFilter
-    from ff_manager.model import League, Team
+    from collections.abc import Callable, Iterable, Iterator, Sequence
 
+    import numpy as np
+    import pyarrow as pa
 
-def assemble_trades(
-    team: Team,
-    send_filter: SendFilter,
-    receive_filter: ReceiveFilter,
-    package_filter: PackageFilter,
-    league: League,
-) -> list[Trade]:
-    cur_packages = [
-        Package(package)
-        for length in range(package_filter.max_assets)
-        for package in itertools.combinations(team.assets, length + 1)
-    ]
-    cur_packages: list[Package] = [
-        package for package in cur_packages if send_filter(package)
+    from ff_manager.filter import Filter, PackageFilter, ReceiveFilter, SendFilter
+    from ff_manager.league import BaseLeague as League
+    from ff_manager.lineup import LineupCache
+    from ff_manager.model import Asset, Team
+
+
+def enumerate_packages(assets: Sequence[Asset], max_assets: int) -> list[Package]:
+    """Every combination of up to `max_assets` assets."""
+    return [
+        Package(tuple(assets[i] for i in idx), idx)
+        for length in range(max_assets)
+        for idx in itertools.combinations(range(len(assets)), length + 1)
     ]
-    if not cur_packages:
-        raise ValueError("No packages passed the send filter.")
 
+
+def get_opposing_teams(
+    team: Team, package_filter: PackageFilter, league: League
+) -> list[Team]:
+    """
+    Teams, other than `team`, that may hold assets passing the package filter.
+
+    Teams come sorted by name, so the order of a search is the same on every run.
+    """
     opp_team_names: set[str] = package_filter.get_matching_teams(
         league_assets=league.players
     )
     with contextlib.suppress(KeyError):  # passed singular opp team
         opp_team_names.remove(team.name)
-    opp_teams: list[Team] = [league[team_name] for team_name in opp_team_names]
+    opp_teams: list[Team] = [league[team_name] for team_name in sorted(opp_team_names)]
 
     if not opp_teams:
         raise ValueError("No opposing teams with trade candidates found.")
+    return opp_teams
 
-    trades: list[list[Trade]] = []
-    for opp in tqdm(opp_teams):
-        print(f"Building trades for <{opp}>")
 
-        opp_packages: list[Package] = [
-            Package(package)
-            for length in range(package_filter.max_assets)
-            for package in itertools.combinations(opp.assets, length + 1)
-        ]
+class SearchCache:
+    """
+    Work shared between searches over one league.
+
+    Packages come from the league's package tables, so the same package object is
+    seen by every search. Filtered package lists are memoized per filter options
+    and input list, and trades per pair of package bitmasks (see `roster_mask`),
+    so a trade evaluated for one search is reused, already executed, by the next.
+    """
+
+    def __init__(self):
+        self._filtered: dict[tuple[str, int], tuple[list, list[Package]]] = {}
+        self._trades: dict[tuple, Trade] = {}
+        self.filter_hits = 0
+        self.trade_hits = 0
+
+    def filter_packages(
+        self, package_filter: Filter, packages: list[Package]
+    ) -> list[Package]:
+        key = (package_filter.cache_key, id(packages))
+        try:
+            _, kept = self._filtered[key]
+        except KeyError:
+            kept = [package for package in packages if package_filter(package)]
+            # Hold the input list, so its id is not reused while it is a key
+            self._filtered[key] = (packages, kept)
+        else:
+            self.filter_hits += 1
+        return kept
+
+    def get_trade(
+        self,
+        team1: Team,
+        team2: Team,
+        package1: Package,
+        package2: Package,
+        lineup_setter: Callable,
+    ) -> Trade:
+        key = (package1.mask, package2.mask)
+        if None in key:  # packages outside of a league
+            key = ("id", id(package1), id(package2))
+        try:
+            trade = self._trades[key]
+        except KeyError:
+            trade = Trade(
+                team1=team1,
+                team2=team2,
+                package1=package1,
+                package2=package2,
+                lineup_setter=lineup_setter,
+            )
+            self._trades[key] = trade
+        else:
+            self.trade_hits += 1
+        return trade
+
+
+def _filter_packages(
+    package_filter: Filter, packages: list[Package], cache: SearchCache | None
+) -> list[Package]:
+    if cache is None:
+        return [package for package in packages if package_filter(package)]
+    return cache.filter_packages(package_filter, packages)
+
+
+def send_packages(
+    team: Team,
+    send_filter: SendFilter,
+    package_filter: PackageFilter,
+    league: League,
+    stats: SearchStats,
+    cache: SearchCache | None = None,
+) -> list[Package]:
+    """The packages of `team` passing the send filter, pruned if asked to."""
+    with stats.stage("enumerate"):
+        cur_packages = league.get_packages(team, package_filter.max_assets)
+    stats.incr("packages.send.enumerated", len(cur_packages))
 
+    with stats.stage("filter"):
+        cur_packages: list[Package] = _filter_packages(send_filter, cur_packages, cache)
+    stats.incr("packages.send_filter.kept", len(cur_packages))
+    if not cur_packages:
+        raise ValueError("No packages passed the send filter.")
+
+    if package_filter.prune is not None:
+        with stats.stage("prune"):
+            cur_packages = prune_packages(
+                team, cur_packages, league.lineup_setter, package_filter.prune
+            )
+        stats.incr("packages.send_prune.kept", len(cur_packages))
+    return cur_packages
+
+
+def receive_packages(
+    opp: Team,
+    receive_filter: ReceiveFilter,
+    package_filter: PackageFilter,
+    league: League,
+    stats: SearchStats,
+    cache: SearchCache | None = None,
+) -> list[Package]:
+    """
+    The packages of an opposing team passing the package and receive filters.
+
+    With a `prune` package filter option, packages equivalent to or dominated by
+    another of the team are then dropped (see `prune_packages`).
+    """
+    with stats.stage("enumerate"):
+        opp_packages = league.get_packages(opp, package_filter.max_assets)
+    stats.incr("packages.receive.enumerated", len(opp_packages))
+
+    with stats.stage("filter"):
         # Package Filter:
         with contextlib.suppress(TypeError):
-            opp_packages = [
-                package for package in opp_packages if package_filter(package)
-            ]
+            opp_packages = _filter_packages(package_filter, opp_packages, cache)
+        stats.incr("packages.package_filter.kept", len(opp_packages))
 
         # Receive Filter:
         with contextlib.suppress(TypeError):
-            opp_packages = [
-                package for package in opp_packages if receive_filter(package)
-            ]
+            opp_packages = _filter_packages(receive_filter, opp_packages, cache)
+        stats.incr("packages.receive_filter.kept", len(opp_packages))
+
+    if package_filter.prune is not None:
+        with stats.stage("prune"):
+            opp_packages = prune_packages(
+                opp, opp_packages, league.lineup_setter, package_filter.prune
+            )
+        stats.incr("packages.receive_prune.kept", len(opp_packages))
+    return opp_packages
+
+
+def assemble_trades(
+    team: Team,
+    send_filter: SendFilter,
+    receive_filter: ReceiveFilter,
+    package_filter: PackageFilter,
+    league: League,
+    stats: SearchStats | None = None,
+    opp_teams: list[Team] | None = None,
+    cache: SearchCache | None = None,
+    shard: tuple[int, int] | None = None,
+) -> list[Trade]:
+    """
+    Pair every send package with every receive package of the opposing teams.
+
+    `opp_teams` restricts the search to those teams instead of every team matching
+    the package filter. A `cache` shares filtered packages and trades with other
+    searches over the same league.
+
+    A `shard` of `(k, n)` keeps every n-th package pair, starting from the k-th
+    (from 0), counting over the opposing teams in order. Given the same league and
+    reqs, the n shards partition the pairs of the full search.
+    """
+    chunks = iter_trade_chunks(
+        team=team,
+        send_filter=send_filter,
+        receive_filter=receive_filter,
+        package_filter=package_filter,
+        league=league,
+        stats=stats,
+        opp_teams=opp_teams,
+        cache=cache,
+        shard=shard,
+    )
+    return list(itertools.chain.from_iterable(chunks))
+
+
+def iter_trade_chunks(
+    team: Team,
+    send_filter: SendFilter,
+    receive_filter: ReceiveFilter,
+    package_filter: PackageFilter,
+    league: League,
+    stats: SearchStats | None = None,
+    opp_teams: list[Team] | None = None,
+    cache: SearchCache | None = None,
+    shard: tuple[int, int] | None = None,
+    chunk_size: int | None = None,
+) -> Iterator[list[Trade]]:
+    """
+    The trades of `assemble_trades`, in the same order, built `chunk_size` at a time.
+
+    Each chunk holds the trades of a single opposing team; without a `chunk_size`,
+    a chunk holds all of them.
+    """
+    stats = stats if stats is not None else SearchStats()
+    cur_packages = send_packages(
+        team, send_filter, package_filter, league, stats, cache
+    )
+
+    if opp_teams is None:
+        opp_teams = get_opposing_teams(team, package_filter, league)
+
+    n_pairs = 0  # package pairs of the previous opposing teams
+    for opp in tqdm(opp_teams, "Building Trades: "):
+        opp_packages = receive_packages(
+            opp, receive_filter, package_filter, league, stats, cache
+        )
 
         # Assemble Trades:
+        make_trade = Trade if cache is None else cache.get_trade
         package_iter = itertools.product(cur_packages, opp_packages)
-        cur_trades = [
-            Trade(
-                team1=team,
-                team2=opp,
-                package1=team_one_package,
-                package2=team_two_package,
-                lineup_setter=league.lineup_setter,
-            )
-            for (team_one_package, team_two_package) in tqdm(
-                package_iter,
-                "Assembling Trades.",
-            )
-        ]
-        trades.append(cur_trades)
+        if shard is not None:
+            k, n = shard
+            package_iter = itertools.islice(package_iter, (k - n_pairs) % n, None, n)
+        n_pairs += len(cur_packages) * len(opp_packages)
+        while True:
+            with stats.stage("assemble"):
+                cur_trades = [
+                    make_trade(
+                        team1=team,
+                        team2=opp,
+                        package1=team_one_package,
+                        package2=team_two_package,
+                        lineup_setter=league.lineup_setter,
+                    )
+                    for (team_one_package, team_two_package) in itertools.islice(
+                        package_iter, chunk_size
+                    )
+                ]
+            if not cur_trades:
+                break
+            stats.incr("trades.assembled", len(cur_trades))
+            yield cur_trades
 
-    # Flatten Trades:
-    flattened = list(itertools.chain.from_iterable(trades))
-    if not flattened:
-        raise ValueError("No trades passed the package or receive filters.")
-    return flattened
 
+def valuation_column(rank_by: str | None, valuations: Sequence[str] | None) -> int:
+    """
+    Column of the gains to rank trades by, see `trade_gains`.
 
-def loc_best_trades(
-    trades: list[Trade],
+    `rank_by` is `value`, the primary value (the default), or one of the league's
+    `valuations`.
+    """
+    if rank_by is None or rank_by == "value":
+        return 0
+    try:
+        return list(valuations or ()).index(rank_by) + 1
+    except ValueError as e:
+        raise ValueError(
+            f"rank_by must be value or one of the valuations {valuations!r}, "
+            f"not {rank_by!r}."
+        ) from e
+
+
+def trade_gains(trades: Sequence[Trade]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gains of executed trades, for both teams, as `(trades, columns)` arrays.
+
+    The first column is the gain under the primary value; the gains under each
+    valuation of the league follow when the trades carry them (see
+    `iter_valuation_gains`).
+    """
+    import numpy as np
+
+    gains1 = np.fromiter((t.team1_gain for t in trades), dtype=float, count=len(trades))
+    gains2 = np.fromiter((t.team2_gain for t in trades), dtype=float, count=len(trades))
+    if not trades or trades[0].team1_gains is None:
+        return gains1.reshape(-1, 1), gains2.reshape(-1, 1)
+    return (
+        np.column_stack((gains1, np.stack([t.team1_gains for t in trades]))),
+        np.column_stack((gains2, np.stack([t.team2_gains for t in trades]))),
+    )
+
+
+def loc_best_gains(
+    gains1: np.ndarray,
+    gains2: np.ndarray,
     max_fleece: float | None = None,
     min_gain: float | None = 0,
     *,
     sort_trades: bool = True,
-) -> list[Trade]:
-    """Return indices of positive trade values."""
-    # Pull Gains as Vectors:
-    trade_gain1: np.ndarray = np.fromiter(
-        (trade.team1_gain for trade in trades),
-        dtype=float,
-    )
-    trade_gain2: np.ndarray = np.fromiter(
-        (trade.team2_gain for trade in trades),
-        dtype=float,
-    )
+    rank_by: int = 0,
+) -> np.ndarray:
+    """
+    Return indices of the trades passing the selection, best first.
+
+    Gains are vectors, or `(trades, columns)` arrays of the gains under several
+    valuations (see `trade_gains`). A trade passes if it passes under any of them,
+    and trades are ranked by the gains of column `rank_by`.
+    """
+    import numpy as np
 
-    # Stack gains and add index in 3rd position
-    trade_val_mat = np.stack((trade_gain1, trade_gain2), axis=1)
-    indices = np.arange(len(trades), dtype=int).reshape(-1, 1)
-    mat = np.hstack((trade_val_mat, indices))
+    gains1 = np.asarray(gains1, dtype=float)
+    gains2 = np.asarray(gains2, dtype=float)
+    if gains1.ndim == 1:
+        gains1, gains2 = gains1[:, None], gains2[:, None]
 
     # Filter Checks:
+    valid = np.ones(gains1.shape, dtype=bool)
     if min_gain is not None:
-        valid_value_added_i = np.where(mat[:, 0] >= min_gain)[0]
-        mat = mat[valid_value_added_i]
-
+        valid &= gains1 >= min_gain
     if max_fleece is not None:
-        value_gap = np.abs(mat[:, 0] - mat[:, 1])  # use already filtered matrix
-        valud_value_gap_i = np.flatnonzero(value_gap < max_fleece)
-        mat = mat[valud_value_gap_i]
+        valid &= np.abs(gains1 - gains2) < max_fleece
+    valid_trade_i = np.flatnonzero(valid.any(axis=1))
 
     # Sort:
     if sort_trades:
-        sort_i = np.argsort(-mat[:, 0])
-        mat = mat[sort_i, :]
+        sort_i = np.argsort(-gains1[valid_trade_i, rank_by], kind="stable")
+        valid_trade_i = valid_trade_i[sort_i]
+
+    return valid_trade_i
+
+
+def _table_gains(gains: pa.Table, team: int) -> np.ndarray:
+    """Stored gains of one team, as the `(trades, columns)` of `trade_gains`."""
+    import numpy as np
+
+    primary = gains[f"team{team}_gain"].to_numpy().reshape(-1, 1)
+    if f"team{team}_gains" not in gains.column_names:
+        return primary
+    vectors = gains[f"team{team}_gains"].to_pylist()
+    return np.column_stack((primary, np.array(vectors, dtype=float)))
+
+
+def iter_best_trades(
+    trades: list[Trade],
+    stored: list[tuple[Team, pa.Table]],
+    team: Team,
+    lineup_setter: Callable,
+    max_fleece: float | None = None,
+    min_gain: float | None = 0,
+    rank_by: int = 0,
+) -> Iterator[Trade]:
+    """
+    Yield the selected trades, best first, from executed trades and stored gains.
+
+    Stored gains are selected on as columns; only the selected stored rows are
+    rebuilt into trades, one at a time as they are yielded, and executed so their
+    lineups are available. Trades carrying their gains under several valuations
+    are selected if they pass under any of them, see `loc_best_gains`.
+    """
+    import numpy as np
+
+    parts1, parts2 = zip(
+        trade_gains(trades),
+        *((_table_gains(gains, 1), _table_gains(gains, 2)) for _, gains in stored),
+        strict=True,
+    )
+    # Empty parts carry no valuations, so they are left out of the stack
+    gains1 = np.concatenate([p for p in parts1 if len(p)] or parts1[:1])
+    gains2 = np.concatenate([p for p in parts2 if len(p)] or parts2[:1])
+    valid_trade_i = loc_best_gains(
+        gains1, gains2, max_fleece=max_fleece, min_gain=min_gain, rank_by=rank_by
+    )
+
+    # Row offsets of each stored table, after the executed trades
+    starts = np.cumsum([len(trades)] + [len(gains) for _, gains in stored])[:-1]
+    for i in valid_trade_i:
+        if i < len(trades):
+            yield trades[i]
+            continue
+        k = int(np.searchsorted(starts, i, side="right")) - 1
+        opp, gains = stored[k]
+        row = gains.slice(int(i - starts[k]), 1).to_pylist()[0]
+        trade = ResultStore.make_trade(team, opp, row, lineup_setter)
+        trade.execute_trade()
+        yield trade
+
+
+def _iter_gain_batches(
+    trades: Iterable[Trade], lineup_cache: LineupCache, batch_size: int
+) -> Iterator[tuple[list[Trade], np.ndarray, np.ndarray]]:
+    """
+    Trades `batch_size` at a time, with the gains of both teams per valuation.
+
+    Gains are `(trades, valuations)` arrays, under the valuations of the lineup
+    cache's kernel. The lineups of all rosters in a batch, before and after each
+    trade, go through the kernel together.
+    """
+    import numpy as np
+
+    trades = iter(trades)
+    while batch := list(itertools.islice(trades, batch_size)):
+        masks = []
+        for trade in batch:
+            moved = trade.package1.mask ^ trade.package2.mask
+            masks += [
+                trade.team1.mask ^ moved,
+                trade.team1.mask,
+                trade.team2.mask ^ moved,
+                trade.team2.mask,
+            ]
+        values = np.stack(lineup_cache.values_many(masks))
+        yield batch, values[0::4] - values[1::4], values[2::4] - values[3::4]
+
+
+def iter_valuation_gains(
+    trades: Iterable[Trade], lineup_cache: LineupCache, batch_size: int = 2_048
+) -> Iterator[Trade]:
+    """Yield executed trades with their gains under every valuation of the league."""
+    for batch, gains1, gains2 in _iter_gain_batches(trades, lineup_cache, batch_size):
+        for trade, trade_gains1, trade_gains2 in zip(
+            batch, gains1, gains2, strict=True
+        ):
+            trade.team1_gains = trade_gains1
+            trade.team2_gains = trade_gains2
+            yield trade
+
+
+def iter_gain_draws(
+    trades: Iterable[Trade], draws_cache: LineupCache, batch_size: int = 256
+) -> Iterator[Trade]:
+    """
+    Yield executed trades with the distribution of their gain under value draws.
+
+    `draws_cache` values rosters under each draw (see `ValueDraws.make_cache`).
+    Each trade gets the mean, the 5th percentile and the probability of a positive
+    gain for `team1`, over the draws.
+
+    The draws belong to one search, while a trade may be shared by several (see
+    `SearchCache`), so copies of the trades are yielded and the input trades are
+    left as they were.
+    """
+    import numpy as np
 
-    # Subset:
-    valid_trade_i = mat[:, 2]
-    print(f"Located {len(valid_trade_i)} trades!")
-    return [trades[int(i)] for i in valid_trade_i]
+    for batch, gains, _ in _iter_gain_batches(trades, draws_cache, batch_size):
+        means = gains.mean(axis=1)
+        p05s = np.percentile(gains, 5, axis=1)
+        p_gains = (gains > 0).mean(axis=1)
+        for trade, mean, p05, p_gain in zip(batch, means, p05s, p_gains, strict=True):
+            drawn = copy.copy(trade)
+            drawn.gain_mean = float(mean)
+            drawn.gain_p05 = float(p05)
+            drawn.p_gain = float(p_gain)
+            yield drawn
@@ -1,18 +1,24 @@
+from __future__ import annotations
+
 import abc
 from difflib import SequenceMatcher as SM
 from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, NotRequired, TypedDict
 
 import click
-import polars as pl
-import pyarrow as pa
-import pyarrow.parquet as pq
 
 from ff_manager.const import KNOWN_PLAYER_MISMATCHES, TEAM_NAME_MATCH_CAP
-from ff_manager.lineup import make_lineup_setter
+from ff_manager.functions import enumerate_packages
+from ff_manager.lineup import LineupCache, make_lineup_kernel, make_lineup_setter
 from ff_manager.model import Asset, Team
+from ff_manager.names import NameIndex
 from ff_manager.utils import hierarchical_data_load
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+    from ff_manager.trade import Package
+
 
 class _PlayerData(TypedDict):
     id: int | str
@@ -20,6 +26,11 @@ class _PlayerData(TypedDict):
     name: str
     pos: str
     value: float
+    # Further valuations, see the `valuations` profile option
+    value_1qb: NotRequired[float]
+    value_2qb: NotRequired[float]
+    value_owned: NotRequired[float]
+    value_started: NotRequired[float]
 
 
 class BaseLeague(abc.ABC):
@@ -41,8 +52,20 @@ class BaseLeague(abc.ABC):
             self.player_data = hierarchical_data_load(data_loc)
 
         self.players: list[Asset] = self._make_players_from_data()
-        self.lineup_setter = make_lineup_setter(**profile["lineup"])
+        self.name_index = NameIndex(self.players)
+        self.lineup_setter = LineupCache(
+            make_lineup_setter(**profile["lineup"]),
+            players=self.players,
+            kernel=(
+                make_lineup_kernel(
+                    backend=profile.get("lineup_backend"), **profile["lineup"]
+                )
+                if profile.get("valuations")
+                else None
+            ),
+        )
         self.teams = self._build_teams()
+        self._packages: dict[tuple[str, int], list[Package]] = {}
 
     @staticmethod
     def _ingest_downloaded_data(
@@ -60,12 +83,25 @@ class BaseLeague(abc.ABC):
     def save_data(
         self, data: list[_PlayerData] | pa.Table, outfile_loc: str | Path
     ) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
         if isinstance(data, list):
             pa_data = pa.Table.from_pylist(data)
         else:
             pa_data = data
         pq.write_table(pa_data, outfile_loc)
 
+    def get_packages(self, team: Team, max_assets: int) -> list[Package]:
+        """Every package of a team, enumerated once per `max_assets`."""
+        key = (team.name, max_assets)
+        try:
+            return self._packages[key]
+        except KeyError:
+            packages = enumerate_packages(team.assets, max_assets)
+            self._packages[key] = packages
+            return packages
+
     def __getitem__(self, index):
         """Get team by team name or index of team."""
         if isinstance(index, int):
@@ -109,7 +145,21 @@ class BaseLeague(abc.ABC):
         return teams
 
     def _make_players_from_data(self) -> list[Asset]:
-        """Instantiate players for each raw player returned from api."""
+        """
+        Instantiate players for each raw player returned from api.
+
+        The `valuations` profile option names the data fields holding each value
+        of a player, e.g. `[value_2qb, value_1qb]`; every search then also
+        reports the gains of a trade under each of them.
+        """
+        valuations: list[str] | None = self.profile.get("valuations")
+        if valuations and self.player_data:
+            missing = [v for v in valuations if v not in self.player_data[0]]
+            if missing:
+                raise ValueError(
+                    f"The valuations {missing!r} are not in the league data. "
+                    f"Choose from {sorted(self.player_data[0])!r}"
+                )
         return [
             Asset(
                 _id=i["id"],
@@ -117,8 +167,10 @@ class BaseLeague(abc.ABC):
                 name=i["name"],
                 pos=i["pos"],
                 value=i["value"],
+                idx=idx,
+                values=[i[v] for v in valuations] if valuations else None,
             )
-            for i in self.player_data
+            for idx, i in enumerate(self.player_data)
         ]
 
 
@@ -129,148 +181,187 @@ class SleeperLeague(BaseLeague):
         super().__init__(profile, refresh_data=refresh_data, data_loc=data_loc)
 
     def _download_data(self) -> pa.Table:
-        import json
-
-        import duckdb
+        import pyarrow as pa
+        import pyarrow.parquet as pq
         import requests
 
         try:
             # TODO: remove this
             # ! use this for dev only
-            clean_player_data = pl.read_parquet(
-                "tests/test_profiles/sleeper-players.parquet"
+            players = pq.read_table(
+                "tests/test_profiles/sleeper-players.parquet",
+                columns=["player_id", "full_name", "pos"],
             )
         except FileNotFoundError:
-            # Get all data:
-            url = "https://api.sleeper.app/v1/players/nfl"
-            resp = requests.get(url)
-            content = resp.content.decode("utf-8")
-            all_player_data: dict = json.loads(content)
-
-            all_player_data_list = []  # reorient to list of dicts
-            for id, player_data in all_player_data.items():
-                cur_data = {"id": id, **player_data}
-                all_player_data_list.append(cur_data)
-
-            clean_player_data = pl.from_dicts(
-                all_player_data_list, infer_schema_length=10_000
-            ).select("player_id", "full_name", pos="position")
+            # Keep only the fields used, of the ~40 sent per player:
+            all_player_data: dict = requests.get(
+                "https://api.sleeper.app/v1/players/nfl"
+            ).json()
+            players = pa.table(
+                {
+                    "player_id": [p.get("player_id") for p in all_player_data.values()],
+                    "full_name": [p.get("full_name") for p in all_player_data.values()],
+                    "pos": [p.get("position") for p in all_player_data.values()],
+                }
+            )
 
         league_id = self.profile["id"]
-
-        # Get roster data:
-        url = f"https://api.sleeper.app/v1/league/{league_id}/rosters"
-        resp = requests.get(url)
-        content = resp.content.decode("utf-8")
-        roster_data: list[dict] = json.loads(content)
-        clean_roster_data = (
-            pl.from_dicts(roster_data)
-            .select("owner_id", player_id="players")
-            .explode("player_id")
+        url = f"https://api.sleeper.app/v1/league/{league_id}"
+        roster_data: list[dict] = requests.get(f"{url}/rosters").json()
+        team_metadata: list[dict] = requests.get(f"{url}/users").json()
+        rosters = pa.table(
+            {
+                "owner_id": [r["owner_id"] for r in roster_data],
+                "players": [r["players"] for r in roster_data],
+            },
+            schema=pa.schema(
+                [("owner_id", pa.string()), ("players", pa.list_(pa.string()))]
+            ),
         )
-
-        joined_data = clean_roster_data.join(
-            clean_player_data, how="inner", on="player_id"
+        users = pa.table(
+            {
+                "user_id": [u["user_id"] for u in team_metadata],
+                "team": [
+                    (u.get("metadata") or {}).get("team_name") for u in team_metadata
+                ],
+            }
         )
 
-        # Join team names:
-        url = f"https://api.sleeper.app/v1/league/{league_id}/users"
-        resp = requests.get(url)
-        content = resp.content.decode("utf-8")
-        team_metadata: list[dict] = json.loads(content)
-        user_team_lookup = (
-            pl.from_dicts(team_metadata)
-            .select("user_id", "metadata")
-            .unnest("metadata")
-            .select(
-                pl.col("user_id").alias("owner_id"), pl.col("team_name").alias("team")
-            )
+        # Get dynasty process values
+        player_values = _read_player_values(
+            "https://github.com/dynastyprocess/data/raw/refs/heads/master/files/values-players.csv"
         )
-
-        with_team_name = (
-            joined_data.join(user_team_lookup, on="owner_id")
-            .drop("owner_id")
-            .rename({"full_name": "name", "player_id": "id"})
+        return _match_player_values(players, rosters, users, player_values)
+
+
+def _read_player_values(loc: str) -> pa.Table:
+    """The dynasty process values, reading only the columns used."""
+    import polars as pl
+
+    return pl.read_csv(
+        loc,
+        columns=["player", "value_1qb", "value_2qb"],
+        infer_schema_length=10_000,
+    ).to_arrow()
+
+
+def _match_player_values(
+    players: pa.Table, rosters: pa.Table, users: pa.Table, player_values: pa.Table
+) -> pa.Table:
+    """
+    Rostered players of a Sleeper league, matched to their values by name.
+
+    One DuckDB plan over the Arrow inputs explodes the rosters, joins the players
+    and team names, and matches every player to the value whose name is most
+    similar (a Jaro-Winkler similarity over .9), materializing only the result.
+    Players left unmatched are reported and dropped.
+    """
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    mismatches = pa.table(
+        {
+            "from_name": list(KNOWN_PLAYER_MISMATCHES),
+            "to_name": list(KNOWN_PLAYER_MISMATCHES.values()),
+        }
+    )
+    con = duckdb.connect()
+    for name, table in {
+        "players": players,
+        "rosters": rosters,
+        "users": users,
+        "player_values": player_values,
+        "mismatches": mismatches,
+    }.items():
+        con.register(name, table)
+
+    matched = con.sql("""--sql
+        WITH rostered AS (
+            SELECT owner_id, UNNEST(players) AS player_id FROM rosters
+        ),
+        named AS (
+            SELECT r.player_id AS id, p.full_name AS name, p.pos, u.team
+            FROM rostered r
+            JOIN players p ON p.player_id = r.player_id
+            JOIN users u ON u.user_id = r.owner_id
+        ),
+        valued AS (
+            SELECT
+                COALESCE(m.to_name, v.player) AS name,
+                v.value_2qb AS value,
+                v.value_1qb,
+                v.value_2qb
+            FROM player_values v
+            LEFT JOIN mismatches m ON m.from_name = v.player
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY v.player ORDER BY v.value_2qb NULLS FIRST
+            ) = 1
         )
-
-        # Get dynasty process values
-        dynasty_values = (  # noqa: F841
-            pl.read_csv(
-                "https://github.com/dynastyprocess/data/raw/refs/heads/master/files/values-players.csv",
-                infer_schema_length=10_000,
-            )
-            .select(
-                pl.col("player").alias("name"),
-                pl.col("value_2qb").alias("value"),
-            )
-            .sort("name", "value")
-            .unique(subset=["name"], keep="first")
-            .with_columns(pl.col("name").replace(KNOWN_PLAYER_MISMATCHES))
+        SELECT
+            n.id, n.name, n.pos, n.team,
+            v.value, v.value_1qb, v.value_2qb,
+            v.name IS NOT NULL AS _matched
+        FROM named n
+        LEFT JOIN valued v ON jaro_winkler_similarity(n.name, v.name) > .9
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY n.id
+            ORDER BY jaro_winkler_similarity(n.name, v.name) DESC, v.name
+        ) = 1
+        ORDER BY n.team, n.id
+    """).to_arrow_table()
+
+    is_matched = matched["_matched"]
+    if not pc.all(is_matched).as_py():
+        import polars as pl
+
+        missing_names = pl.from_arrow(
+            matched.filter(pc.invert(is_matched)).select(["id", "name", "pos", "team"])
         )
-
-        matched_players = duckdb.sql("""--sql
-            SELECT *,
-                jaro_winkler_similarity(with_team_name.name, dynasty_values.name) as _sim,
-                ROW_NUMBER() OVER (PARTITION BY with_team_name.name ORDER BY _sim DESC) AS _rank,
-                with_team_name.name as _alt_name
-            FROM with_team_name
-            JOIN dynasty_values
-            ON jaro_winkler_similarity(with_team_name.name, dynasty_values.name) > .9
-                    """).to_arrow_table()
-
-        res = (
-            pl.from_arrow(matched_players)
-            .filter(pl.col("_rank") == 1)
-            .drop("_sim", "_rank", "_alt_name")
+        click.secho(
+            f"WARNING: Some players were not matched to values. --> {missing_names}",
+            fg="red",
         )
-
-        missing_names = with_team_name.join(res, on="id", how="anti")
-        if len(missing_names) > 0:
-            click.secho(
-                f"WARNING: Some players were not matched to values. --> {missing_names}",
-                fg="red",
-            )
-        return res.to_arrow()
+    return matched.filter(is_matched).drop_columns("_matched")
 
 
 class ESPNLeague(BaseLeague):
-    def _download_data(self) -> list[_PlayerData]:
-        """
-        Get ESPN data.
+    """
+    League hosted on ESPN.
 
-        Args:
-            league_id (int): _description_
-            espn_s2 (str): _description_
-            swid (str): _description_
-            year (int, optional): _description_. Defaults to 2024.
-        """
-        import nfl_data_py as nfl
+    With a `cache_dir` in the profile, the ESPN responses of every refresh are
+    recorded there, and with `replay` the league is rebuilt from those recordings
+    alone, offline.
+    """
+
+    @property
+    def cache_dir(self) -> Path | None:
+        cache_dir = self.profile.get("cache_dir")
+        return Path(cache_dir) if cache_dir is not None else None
+
+    def _download_data(self) -> list[_PlayerData]:
+        """Get the rosters of every team from ESPN, or from recorded responses."""
         from espn_api.football import League
 
+        from ff_manager.espn import ResponseCache
+
         league = League(
             league_id=self.profile["id"],
             espn_s2=self.profile["espn_s2"],
             swid=self.profile["swid"],
             year=self.profile["year"],
-            debug=True,
+            fetch_league=False,
+            debug=False,
         )
-
-        full_schedule = pl.DataFrame(nfl.import_schedules([self.profile["year"]]))
-        cur_week: int = (
-            full_schedule.filter(pl.col("result").is_null())
-            .select(pl.col("week").min())
-            .item()
-        )
-        teams_playing = (
-            full_schedule.filter(pl.col("week") == cur_week)
-            .select("away_team", "home_team")
-            .unpivot()
-            .select("value")
-            .unique()
-            .to_series()
-            .to_list()
-        )
-        teams_playing = set(teams_playing)
+        if self.cache_dir is not None:
+            league.espn_request = ResponseCache(
+                league.espn_request,
+                self.cache_dir / "responses",
+                replay=self.profile.get("replay", False),
+            )
+        elif self.profile.get("replay"):
+            raise ValueError("Replaying ESPN responses needs a `cache_dir`.")
+        league.fetch_league()
 
         team_rosters: list = []
         for team in league.teams:
@@ -282,6 +373,8 @@ class ESPNLeague(BaseLeague):
                     name=player.name,
                     pos=player.position,
                     value=(player.percent_owned + player.percent_started) / 2,
+                    value_owned=player.percent_owned,
+                    value_started=player.percent_started,
                 )
                 team_rosters.append(clean_player)
 
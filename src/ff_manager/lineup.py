@@ -1,44 +1,78 @@
 from __future__ import annotations
 
+import functools
 import itertools
-from collections import UserDict
+import threading
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Mapping
 from typing import TYPE_CHECKING
 
-from rich.console import Console
-from rich.table import Table
-
 from ff_manager.const import FLEX_POS, LINEUP_KEY_SORTER, SPECIALS_SLOTS, SUPER_POS
+from ff_manager.model import Asset, mask_assets, roster_mask
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Sequence
-
-    from ff_manager.model import Asset
-
-
-class LineupMeta(UserDict):  # Re-patched every time function is called
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._depth: int | None = None
-        self._starter_value = None
-        self._start_value_set: bool = False
-        self._starter_keys: list[str] | None = None
-        self._starter_keys_value_set: bool = False
-
-    def __setitem__(self, key, value):
-        # Check if the key already exists
-        original_key = key
-        counter = 1
-        key = f"{original_key}1"
-        while key in self.data:
-            key = f"{original_key}{counter}"
-            counter += 1
-
-        # Set the value for the appropriate key
-        self.data[key] = value
+    from collections.abc import Callable, Iterator, Sequence
+
+    import numpy as np
+
+LINEUP_BACKENDS = ("python", "numpy", "numba")
+
+
+class LineupMeta(Mapping):
+    """
+    A set lineup, laid out as one player (or None) per slot of the profile.
+
+    `slots` is shared by every lineup of a profile: the starter slots, then the
+    depth slots. Values are summed once on construction. The dict view, keyed
+    `RB1`, `RB2`... in slot order, is only built when first read; empty depth
+    slots are left out of it.
+    """
+
+    def __init__(
+        self,
+        slots: tuple[str, ...],
+        players: list[Asset | None],
+        n_starters: int,
+        depth: int = 0,
+    ):
+        self._slots = slots
+        self._players = players
+        self._n_starters = n_starters
+        self._depth = depth
+        self._data: dict[str, Asset | None] | None = None
+
+        self.total_value = 0
+        for player in players:
+            if player is not None:
+                self.total_value += player.value
+        self._starter_value = 0
+        for player in players[:n_starters]:
+            if player is not None:
+                self._starter_value += player.value
 
     @property
-    def total_value(self):
-        return sum(getattr(player, "value", 0) for player in self.data.values())
+    def data(self) -> dict[str, Asset | None]:
+        if self._data is None:
+            counts: dict[str, int] = defaultdict(int)
+            data = {}
+            for i, (slot, player) in enumerate(
+                zip(self._slots, self._players, strict=True)
+            ):
+                if player is None and i >= self._n_starters:
+                    continue
+                counts[slot] += 1
+                data[f"{slot}{counts[slot]}"] = player
+            self._data = data
+        return self._data
+
+    def __getitem__(self, key: str) -> Asset | None:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
 
     @property
     def starter_value(self):
@@ -46,44 +80,37 @@ class LineupMeta(UserDict):  # Re-patched every time function is called
 
     @starter_value.setter
     def starter_value(self, value):
-        if self._start_value_set:
-            raise AttributeError("Starter value is set upon construction only.")
-        self._starter_value = value
-        self._start_value_set = True
+        raise AttributeError("Starter value is set upon construction only.")
 
     @property
     def starter_keys(self) -> list[str]:
-        return self._starter_keys
+        return list(self.data)[: self._n_starters]
 
     @starter_keys.setter
     def starter_keys(self, keys: list[str]):
-        if self._starter_keys_value_set:
-            raise AttributeError("Starter keys is set upon construction only.")
-        self._starter_keys = keys
-        self._starter_keys_value_set = True
+        raise AttributeError("Starter keys is set upon construction only.")
 
     def pprint(self) -> None:
-        vertical_lineup: list[tuple] = []
-        for sort_key in LINEUP_KEY_SORTER:
-            vertical_lineup.extend(
-                sorted(
-                    (k[:-1], k, v)
-                    for k, v in self.data.items()
-                    if k.startswith(sort_key)
-                )
-            )
-
-        # Make horizontal
-        horizontal_lineup: list[list[tuple[str, Asset]]] = [
-            [p] for p in vertical_lineup if p[1] in self.starter_keys
+        from rich.console import Console
+        from rich.table import Table
+
+        # One row per starter, with the depth players of its slot after it
+        keys = list(self.data)
+        starters = keys[: self._n_starters]
+        rows: dict[str, list[list[tuple[str, Asset | None]]]] = defaultdict(list)
+        for key, slot in zip(starters, self._slots, strict=False):
+            rows[slot].append([(key, self.data[key])])
+        for key in keys[self._n_starters :]:
+            slot = key.rstrip("0123456789")
+            for row in rows[slot]:
+                row.append((key, self.data[key]))
+
+        slot_order = {slot: i for i, slot in enumerate(LINEUP_KEY_SORTER)}
+        horizontal_lineup = [
+            row
+            for slot in sorted(rows, key=lambda s: slot_order.get(s, len(slot_order)))
+            for row in rows[slot]
         ]
-        depth_players = [p for p in vertical_lineup if p[1] not in self.starter_keys]
-
-        for i, starter in enumerate(horizontal_lineup):
-            starter_pos_group: str = starter[0][0]
-            for depth_player in depth_players:
-                if depth_player[0] == starter_pos_group:
-                    horizontal_lineup[i].append(depth_player)
 
         # Build Table:
         max_depth = max(len(slot) for slot in horizontal_lineup)
@@ -100,8 +127,8 @@ class LineupMeta(UserDict):  # Re-patched every time function is called
             args = []
             for i in range(max_depth):
                 try:
+                    args.append(str(slot[i][0]))
                     args.append(str(slot[i][1]))
-                    args.append(str(slot[i][2]))
                 except IndexError:  # No player filled for this slot
                     args.append(None)
                     args.append(None)
@@ -114,7 +141,10 @@ class LineupMeta(UserDict):  # Re-patched every time function is called
         raise TypeError("Use .pprint()")
 
 
-def make_lineup_setter(depth: int = 0, **lineup_template: dict) -> Callable:
+def _lineup_layout(
+    depth: int, lineup_template: dict
+) -> tuple[tuple[str, ...], list[tuple[str, ...]], tuple[str, ...], tuple[str, ...]]:
+    """Starter slots, the positions filling each, regular and special depth slots."""
     nested_slots = [[slot] * n for slot, n in lineup_template.items()]
     flat_slots = tuple(itertools.chain.from_iterable(nested_slots))
 
@@ -129,74 +159,465 @@ def make_lineup_setter(depth: int = 0, **lineup_template: dict) -> Callable:
             cur_slot = (slot,)
         fillable_slots.append(cur_slot)
 
+    regular_slots: tuple[str, ...] = ()
+    special_slots: tuple[str, ...] = ()
+    if depth:
+        regular_slots = (
+            tuple(slot for slot in flat_slots if slot not in SPECIALS_SLOTS) * depth
+        )
+        special_slots = (
+            tuple(slot for slot in SPECIALS_SLOTS if slot in flat_slots) * depth
+        )
+    return flat_slots, fillable_slots, regular_slots, special_slots
+
+
+def make_lineup_setter(depth: int = 0, **lineup_template: dict) -> Callable:
+    flat_slots, fillable_slots, regular_slots, special_slots = _lineup_layout(
+        depth, lineup_template
+    )
+
+    # Fixed layout of every lineup: starters, regular depth, special depth
+    layout = flat_slots + regular_slots + special_slots
+    n_starters = len(flat_slots)
+    n_regular = len(regular_slots)
+
     def _setter(assets: Sequence[Asset]) -> LineupMeta:
-        lineup = LineupMeta()
+        players: list[Asset | None] = [None] * len(layout)
 
-        lineup._depth = depth
+        # Bucket players by position once, best first. Ties keep roster order, so
+        # the rank breaks ties between positions the way one sorted list would.
+        all_sorted_players = sorted(assets, key=lambda a: a.value, reverse=True)
+        by_pos: dict[str, list[tuple[int, Asset]]] = defaultdict(list)
+        for rank, player in enumerate(all_sorted_players):
+            by_pos[player.pos].append((rank, player))
+        queues = {pos: deque(bucket) for pos, bucket in by_pos.items()}
 
         # Iterate down lineup:
-        all_sorted_players = sorted(assets, key=lambda a: a.value, reverse=True)
-        avail_players = all_sorted_players.copy()
-        for slot, fillable_slot in zip(flat_slots, fillable_slots, strict=True):
-            try:
-                player = next(a for a in avail_players if a.pos in fillable_slot)
-                avail_players.remove(player)
-            except StopIteration:  # No available players fill this position
-                player = None
-            lineup[slot] = player
+        for i, fillable_slot in enumerate(fillable_slots):
+            best = None
+            for pos in fillable_slot:
+                queue = queues.get(pos)
+                if queue and (best is None or queue[0][0] < best[0][0]):
+                    best = queue
+            if best is not None:  # else no available players fill this position
+                players[i] = best.popleft()[1]
 
         if depth:
-            lineup.starter_keys = list(lineup.data.keys())
-            lineup.starter_value = sum(player.value for player in lineup.data.values())
-
-            # Iterate down regular spots using available players:
-            regular_slots: list[str] = [
-                slot for slot in flat_slots if slot not in SPECIALS_SLOTS
-            ] * depth
-            rm_these_players = [
-                slot
-                for slot in lineup.data
-                if any(
-                    slot.startswith(special_slot[:-1])
-                    for special_slot in SPECIALS_SLOTS
+            # Iterate down regular spots using available players, then the
+            # players starting in special slots:
+            for slot, player in zip(flat_slots, players, strict=False):
+                if slot in SPECIALS_SLOTS and player is not None:
+                    queues.setdefault(player.pos, deque()).append((-1, player))
+            for i, slot in enumerate(regular_slots, start=n_starters):
+                queue = queues.get(slot)
+                if queue:
+                    players[i] = queue.popleft()[1]
+
+            # Iterate down special spots using all players
+            special_queues: dict[str, deque] = {}
+            for i, slot in enumerate(special_slots, start=n_starters + n_regular):
+                if slot not in special_queues:
+                    special_queues[slot] = deque(by_pos.get(slot, ()))
+                queue = special_queues[slot]
+                if queue:
+                    players[i] = queue.popleft()[1]
+
+        return LineupMeta(layout, players, n_starters, depth)
+
+    return _setter
+
+
+def default_lineup_backend() -> str:
+    """The fastest lineup kernel backend installed, numba or else numpy."""
+    import importlib.util
+
+    return "numba" if importlib.util.find_spec("numba") is not None else "numpy"
+
+
+def make_lineup_kernel(
+    depth: int = 0, backend: str | None = None, **lineup_template: dict
+) -> Callable:
+    """
+    Total lineup values of many rosters under several valuations at once.
+
+    The kernel takes a `(rosters, players, valuations)` value array and the
+    `(rosters, players)` positions, padded with None, and returns the
+    `(rosters, valuations)` totals. Slots are filled in the order of
+    `make_lineup_setter`, each with the best eligible, still available player,
+    ties going to the player listed first, so each total is what the setter gives
+    for that roster and valuation.
+
+    The `backend` computing it is one of `LINEUP_BACKENDS`: `python` runs the
+    setter once per roster and valuation, as a reference; `numpy` fills each slot
+    for every roster and valuation together, as an argmax over the players;
+    `numba` compiles the greedy fill itself, caching it on disk rather than
+    compiling it in every process. It defaults to numba when installed (the
+    `numba` extra), else numpy.
+    """
+    backend = backend if backend is not None else default_lineup_backend()
+    if backend not in LINEUP_BACKENDS:
+        raise ValueError(f"The lineup backend must be one of {LINEUP_BACKENDS}.")
+    if backend == "python":
+        return _python_kernel(make_lineup_setter(depth, **lineup_template))
+    layout = _lineup_layout(depth, lineup_template)
+    if backend == "numba":
+        return _numba_kernel(*layout)
+    return _numpy_kernel(*layout)
+
+
+def _python_kernel(setter: Callable) -> Callable:
+    def _kernel(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        import numpy as np
+
+        n_rosters, n_players, n_vals = values.shape
+        total = np.zeros((n_rosters, n_vals))
+        for r in range(n_rosters):
+            present = [p for p in range(n_players) if positions[r, p] is not None]
+            for v in range(n_vals):
+                assets = [
+                    Asset(name="", pos=positions[r, p], value=values[r, p, v])
+                    for p in present
+                ]
+                total[r, v] = setter(assets).total_value
+        return total
+
+    return _kernel
+
+
+def _numpy_kernel(
+    flat_slots: tuple[str, ...],
+    fillable_slots: list[tuple[str, ...]],
+    regular_slots: tuple[str, ...],
+    special_slots: tuple[str, ...],
+) -> Callable:
+    def _kernel(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        import numpy as np
+
+        n_rosters, _, n_vals = values.shape
+        rows = np.arange(n_rosters)[:, None]
+        cols = np.arange(n_vals)[None, :]
+        total = np.zeros((n_rosters, n_vals))
+
+        def _fill(
+            score: np.ndarray, eligible: np.ndarray
+        ) -> tuple[np.ndarray, np.ndarray]:
+            """Take the best eligible player per roster and valuation."""
+            score = np.where(eligible[:, :, None], score, -np.inf)
+            best = score.argmax(axis=1)
+            filled = score[rows, best, cols] > -np.inf
+            total[filled] += values[rows, best, cols][filled]
+            return best, filled
+
+        # Starters, by value:
+        avail = np.ones(values.shape, dtype=bool)
+        special_start = np.full(values.shape, -1)
+        for i, (slot, fillable_slot) in enumerate(
+            zip(flat_slots, fillable_slots, strict=True)
+        ):
+            best, filled = _fill(
+                np.where(avail, values, -np.inf), np.isin(positions, fillable_slot)
+            )
+            avail[rows, best, cols] &= ~filled
+            if slot in SPECIALS_SLOTS:
+                special_start[rows, best, cols] = np.where(
+                    filled, i, special_start[rows, best, cols]
                 )
-            ]
-            players_in_special_slots = [
-                player
-                for slot, player in lineup.data.items()
-                if slot in rm_these_players
-            ]
-            avail_players += players_in_special_slots
 
+        if regular_slots or special_slots:
+            # Regular depth, by value, then the special starters in slot order:
+            score = np.where(
+                avail,
+                values,
+                np.where(special_start >= 0, -1e300 * (1 + special_start), -np.inf),
+            )
             for slot in regular_slots:
-                try:
-                    player = next(a for a in avail_players if a.pos == slot)
-                except StopIteration:
-                    pass
-                else:
-                    avail_players.remove(player)
-                    lineup[slot] = player
+                best, filled = _fill(score, positions == slot)
+                score[rows, best, cols] = np.where(
+                    filled, -np.inf, score[rows, best, cols]
+                )
 
-            # Iterate down special spots using all players
-            avail_players = all_sorted_players.copy()
-            special_slots: list[str] = [
-                slot for slot in SPECIALS_SLOTS if slot in flat_slots
-            ] * depth
+            # Special depth, by value over the whole roster:
+            score = values.copy()
             for slot in special_slots:
-                try:
-                    player = next(a for a in avail_players if a.pos == slot)
-                except StopIteration:
-                    pass
-                else:
-                    avail_players.remove(player)
-                    lineup[slot] = player
+                best, filled = _fill(score, positions == slot)
+                score[rows, best, cols] = np.where(
+                    filled, -np.inf, score[rows, best, cols]
+                )
 
-        else:
-            lineup.starter_value = sum(
-                getattr(player, "value", 0) for player in lineup.data.values()
-            )
-            lineup.starter_keys = list(lineup.data.keys())
+        return total
+
+    return _kernel
+
+
+@functools.cache
+def _numba_fill() -> Callable:
+    """
+    The greedy fill of `make_lineup_setter` over arrays, compiled once.
+
+    The compiled fill is cached next to this module, so later processes load it
+    instead of compiling it again.
+    """
+    import numba
+    import numpy as np
+
+    @numba.njit(nogil=True, cache=True)
+    def _fill(values, codes, eligible, special, regular, special_depth, total):
+        n_rosters, n_players, n_vals = values.shape
+        avail = np.empty(n_players, dtype=np.bool_)
+        used = np.empty(n_players, dtype=np.bool_)
+        started = np.empty(n_players, dtype=np.int64)
+        for r in range(n_rosters):
+            for v in range(n_vals):
+                acc = 0.0
+                avail[:] = True
+                started[:] = -1
+                # Starters, by value:
+                for s in range(eligible.shape[0]):
+                    best = -1
+                    for p in range(n_players):
+                        c = codes[r, p]
+                        if (
+                            c >= 0
+                            and avail[p]
+                            and eligible[s, c]
+                            and (best < 0 or values[r, p, v] > values[r, best, v])
+                        ):
+                            best = p
+                    if best >= 0:
+                        acc += values[r, best, v]
+                        avail[best] = False
+                        if special[s]:
+                            started[best] = s
+
+                # Regular depth, by value, then the special starters in slot order:
+                used[:] = False
+                for c in regular:
+                    best = -1
+                    for p in range(n_players):
+                        if (
+                            codes[r, p] == c
+                            and avail[p]
+                            and not used[p]
+                            and (best < 0 or values[r, p, v] > values[r, best, v])
+                        ):
+                            best = p
+                    if best < 0:
+                        for p in range(n_players):
+                            if (
+                                codes[r, p] == c
+                                and started[p] >= 0
+                                and not used[p]
+                                and (best < 0 or started[p] < started[best])
+                            ):
+                                best = p
+                    if best >= 0:
+                        acc += values[r, best, v]
+                        used[best] = True
+
+                # Special depth, by value over the whole roster:
+                used[:] = False
+                for c in special_depth:
+                    best = -1
+                    for p in range(n_players):
+                        if (
+                            codes[r, p] == c
+                            and not used[p]
+                            and (best < 0 or values[r, p, v] > values[r, best, v])
+                        ):
+                            best = p
+                    if best >= 0:
+                        acc += values[r, best, v]
+                        used[best] = True
+                total[r, v] = acc
+
+    return _fill
+
+
+def _numba_kernel(
+    flat_slots: tuple[str, ...],
+    fillable_slots: list[tuple[str, ...]],
+    regular_slots: tuple[str, ...],
+    special_slots: tuple[str, ...],
+) -> Callable:
+    import numpy as np
+
+    # Positions as integer codes, -1 for the ones no slot takes and padding
+    names = sorted(
+        {*itertools.chain.from_iterable(fillable_slots), *regular_slots, *special_slots}
+    )
+    code = {name: i for i, name in enumerate(names)}
+    eligible = np.zeros((len(fillable_slots), len(names)), dtype=bool)
+    for s, fillable_slot in enumerate(fillable_slots):
+        for pos in fillable_slot:
+            eligible[s, code[pos]] = True
+    special = np.array([slot in SPECIALS_SLOTS for slot in flat_slots], dtype=bool)
+    regular = np.array([code[slot] for slot in regular_slots], dtype=np.int64)
+    special_depth = np.array([code[slot] for slot in special_slots], dtype=np.int64)
+    fill = _numba_fill()
+
+    def _kernel(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        codes = np.fromiter(
+            (code.get(pos, -1) for pos in positions.flat),
+            dtype=np.int64,
+            count=positions.size,
+        ).reshape(positions.shape)
+        total = np.zeros((values.shape[0], values.shape[2]))
+        fill(
+            np.ascontiguousarray(values, dtype=np.float64),
+            codes,
+            eligible,
+            special,
+            regular,
+            special_depth,
+            total,
+        )
+        return total
+
+    return _kernel
+
+
+class LineupCache:
+    """
+    Memoize a lineup setter by roster.
+
+    Rosters are keyed by their bitmask over the league index (see `roster_mask`),
+    falling back to the identity of their assets for assets outside of a league.
+    A roster may be looked up by its `mask` alone; on a miss its assets are then
+    read from `players`, the league's player list, unless they are passed too.
+    The cache is bounded, evicting the least recently used lineup once `maxsize`
+    rosters are held. Lookups are safe to share between threads.
+
+    With a `kernel` (see `make_lineup_kernel`), `values_many` memoizes the lineup
+    value of a roster under each of the assets' valuations in the same way.
+    `league_values`, a `(players, valuations)` array by league index, stands in
+    for the assets' own valuations there.
+    """
+
+    def __init__(
+        self,
+        setter: Callable,
+        maxsize: int = 4_096,
+        players: Sequence[Asset] | None = None,
+        kernel: Callable | None = None,
+        league_values: np.ndarray | None = None,
+    ):
+        self.setter = setter
+        self.kernel = kernel
+        self.maxsize = maxsize
+        self.players = players
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[int | frozenset[int], LineupMeta] = OrderedDict()
+        self._values: OrderedDict[int | frozenset[int], np.ndarray] = OrderedDict()
+        self._league_values = league_values
+        self._league_pos: np.ndarray | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(assets: Sequence[Asset] | None, mask: int | None) -> int | frozenset[int]:
+        if mask is not None:
+            return mask
+        try:
+            return roster_mask(assets)
+        except TypeError:
+            return frozenset(map(id, assets))
+
+    def _store(self, cache: OrderedDict, key: int | frozenset[int], item) -> None:
+        with self._lock:
+            cache[key] = item
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+
+    def get(self, mask: int) -> LineupMeta | None:
+        """The cached lineup of a roster, or None."""
+        with self._lock:
+            lineup = self._cache.get(mask)
+            if lineup is not None:
+                self.hits += 1
+                self._cache.move_to_end(mask)
+        return lineup
 
+    def __call__(
+        self, assets: Sequence[Asset] | None = None, *, mask: int | None = None
+    ) -> LineupMeta:
+        key = self._key(assets, mask)
+        with self._lock:
+            lineup = self._cache.get(key)
+            if lineup is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return lineup
+            self.misses += 1
+
+        if assets is None:
+            assets = mask_assets(mask, self.players)
+        lineup = self.setter(assets=assets)
+        self._store(self._cache, key, lineup)
         return lineup
 
-    return _setter
+    def _league_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Values and positions of every league player, by league index."""
+        import numpy as np
+
+        if self._league_values is None:
+            self._league_values = np.array(
+                [player.values for player in self.players], dtype=float
+            ).reshape(len(self.players), -1)
+        if self._league_pos is None:
+            self._league_pos = np.array(
+                [player.pos for player in self.players], dtype=object
+            )
+        return self._league_values, self._league_pos
+
+    def values_many(self, masks: Sequence[int]) -> list[np.ndarray]:
+        """
+        Lineup value of each roster under every valuation of its assets.
+
+        Rosters are given by mask. The ones not yet cached are unpacked to league
+        indices and go through the kernel together, as one padded array.
+        """
+        import numpy as np
+
+        out: list[np.ndarray | None] = [None] * len(masks)
+        missing: dict[int, list[int]] = defaultdict(list)
+        with self._lock:
+            for i, mask in enumerate(masks):
+                values = self._values.get(mask)
+                if values is None:
+                    missing[mask].append(i)
+                else:
+                    self._values.move_to_end(mask)
+                    out[i] = values
+        if not missing:
+            return out
+
+        league_values, league_pos = self._league_arrays()
+        n_league = len(league_pos)
+        n_bytes = (n_league + 7) // 8
+        packed = np.frombuffer(
+            b"".join(mask.to_bytes(n_bytes, "little") for mask in missing),
+            dtype=np.uint8,
+        ).reshape(len(missing), n_bytes)
+        member = np.unpackbits(packed, axis=1, bitorder="little")[:, :n_league]
+
+        # League indices of each roster, in league order, padded to the largest
+        n_players = int(member.sum(axis=1).max())
+        order = np.argsort(1 - member, axis=1, kind="stable")[:, :n_players]
+        present = np.take_along_axis(member, order, axis=1).astype(bool)
+        totals = self.kernel(
+            np.where(present[:, :, None], league_values[order], 0),
+            np.where(present, league_pos[order], None),
+        )
+
+        for (mask, indices), total in zip(missing.items(), totals, strict=True):
+            for i in indices:
+                out[i] = total
+            self._store(self._values, mask, total)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._values.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,220 @@
+"""Memory accounting for the trade engine."""
+
+from __future__ import annotations
+
+import itertools
+import math
+import sys
+import tracemalloc
+from typing import TYPE_CHECKING
+
+import click
+
+from ff_manager.functions import enumerate_packages
+from ff_manager.trade import Trade
+
+if TYPE_CHECKING:
+    from ff_manager.filter import PackageFilter
+    from ff_manager.league import BaseLeague
+    from ff_manager.model import Team
+
+MB = 1024**2
+
+TOP_ALLOCATIONS = 5
+
+
+def peak_rss() -> int | None:
+    """Peak resident set size of the process in bytes, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def n_packages(n_assets: int, max_assets: int) -> int:
+    """Number of packages enumerated from a roster, before filtering."""
+    return sum(math.comb(n_assets, k) for k in range(1, max_assets + 1))
+
+
+class MemoryReport:
+    """
+    Peak RSS and tracemalloc snapshots per stage of a trade search.
+
+    Call `start` before the search and `stop` after it. While running, the peak
+    traced memory of each stage is recorded every time the stage exits, and
+    `snapshot` stores the largest allocation sites at a checkpoint.
+    """
+
+    def __init__(self, ceiling_mb: float | None = None):
+        self.ceiling_mb = ceiling_mb
+        self.stage_peaks: dict[str, int] = {}
+        self.stage_rss: dict[str, int | None] = {}
+        self.snapshots: dict[str, list[tuple[str, int]]] = {}
+        self.bytes_per_package: float | None = None
+        self.bytes_per_trade: float | None = None
+        self.projected_packages: int | None = None
+        self.projected_trades: int | None = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def enter_stage(self, name: str) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def exit_stage(self, name: str) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        self.stage_peaks[name] = max(self.stage_peaks.get(name, 0), peak)
+        self.stage_rss[name] = peak_rss()
+
+    def snapshot(self, name: str) -> None:
+        """Record the largest allocation sites at this point of the search."""
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(inclusive=True, filename_pattern="*ff_manager*")]
+        )
+        stats = snapshot.statistics("lineno")
+        self.snapshots[name] = [
+            (str(stat.traceback), stat.size) for stat in stats[:TOP_ALLOCATIONS]
+        ]
+
+    @property
+    def projected_bytes(self) -> float | None:
+        if self.bytes_per_trade is None or self.projected_trades is None:
+            return None
+        return (
+            self.projected_trades * self.bytes_per_trade
+            + self.projected_packages * self.bytes_per_package
+        )
+
+    def estimate(
+        self,
+        team: Team,
+        opp_teams: list[Team],
+        package_filter: PackageFilter,
+        league: BaseLeague,
+        sample: int = 8,
+    ) -> None:
+        """
+        Project the memory of a search before running it.
+
+        The bytes per package and per executed trade are measured on a small sample
+        of packages, then scaled by the unfiltered package counts for the
+        configured `max_assets`. The projection is an upper bound, since filters
+        only shrink the search. The sample bypasses the league lineup cache, so its
+        hit rates are left untouched.
+        """
+        max_assets = package_filter.max_assets
+        send_packages = n_packages(len(team.assets), max_assets)
+        opp_package_counts = [
+            n_packages(len(opp.assets), max_assets) for opp in opp_teams
+        ]
+        self.projected_packages = send_packages + sum(opp_package_counts)
+        self.projected_trades = send_packages * sum(opp_package_counts)
+
+        lineup_setter = getattr(league.lineup_setter, "setter", league.lineup_setter)
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            send_sample = enumerate_packages(team.assets, max_assets)[:sample]
+            opp_sample = enumerate_packages(opp_teams[0].assets, max_assets)[:sample]
+            after_packages, _ = tracemalloc.get_traced_memory()
+
+            trades = []
+            for package1, package2 in itertools.product(send_sample, opp_sample):
+                trade = Trade(
+                    team1=team,
+                    team2=opp_teams[0],
+                    package1=package1,
+                    package2=package2,
+                    lineup_setter=lineup_setter,
+                )
+                trade.execute_trade()
+                trades.append(trade)
+            after_trades, _ = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        n_sample_packages = max(len(send_sample) + len(opp_sample), 1)
+        self.bytes_per_package = (after_packages - before) / n_sample_packages
+        self.bytes_per_trade = (after_trades - after_packages) / max(len(trades), 1)
+
+    def check_ceiling(self) -> bool:
+        """Warn if the projected memory exceeds the ceiling; return whether it fits."""
+        projected = self.projected_bytes
+        if self.ceiling_mb is None or projected is None:
+            return True
+        if projected <= self.ceiling_mb * MB:
+            return True
+        click.secho(
+            f"WARNING: This search is projected to use {projected / MB:,.0f}MB, "
+            f"above the {self.ceiling_mb:,.0f}MB ceiling. "
+            "Lower `max_assets` or add filters to shrink it.",
+            fg="red",
+        )
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "stage_peaks": dict(self.stage_peaks),
+            "stage_rss": dict(self.stage_rss),
+            "snapshots": dict(self.snapshots),
+            "bytes_per_package": self.bytes_per_package,
+            "bytes_per_trade": self.bytes_per_trade,
+            "projected_packages": self.projected_packages,
+            "projected_trades": self.projected_trades,
+            "projected_bytes": self.projected_bytes,
+            "peak_rss": peak_rss(),
+        }
+
+    def pprint(self) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="Memory Report")
+        table.add_column("Metric", style="cyan", no_wrap=True)
+        table.add_column("Value", style="magenta", no_wrap=True)
+
+        for stage, peak in self.stage_peaks.items():
+            table.add_row(f"peak.{stage}", f"{peak / MB:,.1f}MB")
+            rss = self.stage_rss.get(stage)
+            if rss is not None:
+                table.add_row(f"rss.{stage}", f"{rss / MB:,.1f}MB")
+
+        if self.bytes_per_package is not None:
+            table.add_row("bytes_per_package", f"{self.bytes_per_package:,.0f}")
+            table.add_row("bytes_per_trade", f"{self.bytes_per_trade:,.0f}")
+            table.add_row("projected_packages", f"{self.projected_packages:,}")
+            table.add_row("projected_trades", f"{self.projected_trades:,}")
+            table.add_row("projected_total", f"{self.projected_bytes / MB:,.1f}MB")
+
+        console = Console()
+        console.print(table)
+
+        if not self.snapshots:
+            return
+        sites = Table(title="Top Allocations")
+        sites.add_column("Checkpoint", style="cyan", no_wrap=True)
+        sites.add_column("Size", style="magenta", no_wrap=True)
+        sites.add_column("Site", style="green")
+        for checkpoint, allocations in self.snapshots.items():
+            for site, size in allocations:
+                sites.add_row(checkpoint, f"{size / 1024:,.1f}KB", site)
+        console.print(sites)
@@ -5,11 +5,18 @@ from functools import partial
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Sequence
 
 
 class Asset:
-    """Something a team can own."""
+    """
+    Something a team can own.
+
+    `idx` is the asset's position in its league's player list, a dense integer id
+    used to diff rosters without comparing names. `values` holds the asset's value
+    under each valuation of the league, see the `valuations` profile option; it
+    defaults to just `value`.
+    """
 
     def __init__(
         self,
@@ -18,10 +25,18 @@ class Asset:
         value: int | None = None,
         team_name: str | None = None,
         pos: str | None = None,
+        idx: int | None = None,
+        values: Sequence[float] | None = None,
     ):
         self._id = _id
+        self.idx = idx
         self.name = name
         self.value = value if value else 0
+        self.values: tuple[float, ...] = (
+            tuple(v if v else 0 for v in values)
+            if values is not None
+            else (self.value,)
+        )
         self.pos = pos
         self.slots: list[str] = self.pos
 
@@ -41,17 +56,52 @@ class Asset:
         return f"{self.name} - {self.value:.2f}"
 
 
+def roster_mask(assets: Iterable[Asset]) -> int:
+    """
+    Bitmask of assets over their league index.
+
+    Raises TypeError for assets without an index.
+    """
+    mask = 0
+    for asset in assets:
+        mask |= 1 << asset.idx
+    return mask
+
+
+def mask_assets(mask: int, players: Sequence[Asset]) -> tuple[Asset, ...]:
+    """The league players set in `mask`, in league order."""
+    assets = []
+    while mask:
+        low = mask & -mask
+        assets.append(players[low.bit_length() - 1])
+        mask ^= low
+    return tuple(assets)
+
+
 class Team:
-    """Collection of players with lineup methods."""
+    """
+    Collection of players with lineup methods.
+
+    The roster is a tuple and is not changed after construction; trades share the
+    team rather than copying it. Rosters of league assets also carry their bitmask
+    over the league index, see `roster_mask`.
+    """
 
     def __init__(
         self,
         name: str,
-        assets: list[Asset],
+        assets: Sequence[Asset],
         lineup_setter: Callable,
     ):
-        self.assets = [a for a in assets if a.value is not None]
+        assets = tuple(assets)
         self.assets = assets
+        # Assets outside of a league have no index to key them by
+        self.positions: dict[int, int] = {
+            a.idx: i for i, a in enumerate(assets) if a.idx is not None
+        }
+        self.mask: int | None = None
+        with contextlib.suppress(TypeError):  # assets outside of a league
+            self.mask = roster_mask(assets)
         self.name = name
         self.set_lineup = partial(lineup_setter, assets=assets)
         self.lineup = None
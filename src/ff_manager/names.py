@@ -0,0 +1,69 @@
+"""Resolve asset names in reqs to league indices."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from ff_manager.const import KNOWN_PLAYER_MISMATCHES, PLAYER_NAME_MATCH_CAP
+from ff_manager.utils import _cleaner, _cleaner2
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from ff_manager.model import Asset
+
+
+def _normalize(name: str) -> str:
+    return _cleaner2(_cleaner(name)).casefold()
+
+
+class NameIndex:
+    """
+    League index of every asset by name.
+
+    A name is looked up exactly, then with markup and extra whitespace dropped,
+    then reduced to lowercase letters and digits, and finally by the closest
+    normalized name if it is the only one above `PLAYER_NAME_MATCH_CAP`. Known
+    mismatches between data sources are tried under both names. A name may
+    resolve to several assets, e.g. two players sharing a name.
+    """
+
+    def __init__(self, players: Sequence[Asset]):
+        self._exact: dict[str, list[int]] = defaultdict(list)
+        self._clean: dict[str, list[int]] = defaultdict(list)
+        self._normal: dict[str, list[int]] = defaultdict(list)
+        for player in players:
+            self._exact[player.name].append(player.idx)
+            self._clean[_cleaner(player.name)].append(player.idx)
+            self._normal[_normalize(player.name)].append(player.idx)
+
+    def _fuzzy(self, name: str) -> list[int]:
+        from difflib import get_close_matches
+
+        matches = get_close_matches(
+            _normalize(name), self._normal, n=2, cutoff=PLAYER_NAME_MATCH_CAP
+        )
+        if len(matches) != 1:
+            return []
+        return self._normal[matches[0]]
+
+    def resolve(self, name: str) -> tuple[int, ...]:
+        """League indices of the assets matching `name`, empty if none do."""
+        for candidate in dict.fromkeys((name, KNOWN_PLAYER_MISMATCHES.get(name, name))):
+            for index, key in (
+                (self._exact, candidate),
+                (self._clean, _cleaner(candidate)),
+                (self._normal, _normalize(candidate)),
+            ):
+                if key in index:
+                    return tuple(index[key])
+        return tuple(self._fuzzy(name))
+
+    def resolve_many(
+        self, names: Sequence[str]
+    ) -> tuple[list[tuple[int, ...]], list[str]]:
+        """Indices of each name, and the names matching no asset."""
+        resolved = [self.resolve(name) for name in names]
+        unknown = [name for name, ids in zip(names, resolved, strict=True) if not ids]
+        return resolved, unknown
@@ -0,0 +1,119 @@
+"""Pruning of packages that can not make a better trade than another."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import numpy as np
+
+    from ff_manager.model import Team
+    from ff_manager.trade import Package
+
+PRUNE_MODES = ("exact", "dominance")
+
+
+def package_promise(
+    team: Team, packages: list[Package], lineup_setter: Callable
+) -> list[float]:
+    """
+    Change in the lineup value of `team` from each package alone.
+
+    A package of `team` is taken out of its roster and any other package added to
+    it, at the cost of one lineup per package.
+    """
+    base = lineup_setter(team.assets, mask=team.mask).total_value
+    return [
+        lineup_setter(mask=team.mask ^ package.mask).total_value - base
+        for package in packages
+    ]
+
+
+def _sorted_assets(package: Package) -> list:
+    return sorted(package.assets, key=lambda a: (str(a.pos), -a.value))
+
+
+def prune_packages(
+    team: Team, packages: list[Package], lineup_setter: Callable, mode: str
+) -> list[Package]:
+    """
+    The packages of `team` left once equivalent or dominated ones are dropped.
+
+    In `exact` mode, packages whose players are identical in lineup terms (the
+    same positions and the same value under every valuation) are grouped, and
+    only the first of each group is kept: every trade of a dropped package has
+    the gains of a trade of the kept one.
+
+    In `dominance` mode, a package is dropped too when another one of the same
+    positions costs `team` no more lineup value (see `package_promise`) and is
+    worth no less to any partner, its players being at least as valuable
+    position by position. Both hold under the primary value and under every
+    valuation of the league, so a package better under any one of them is kept
+    for `rank_by`. This is a heuristic: the lineups after a trade may still favor
+    a dropped package, so some trades can be missed.
+
+    Packages keep their order.
+    """
+    if mode not in PRUNE_MODES:
+        raise ValueError(f"The prune mode must be one of {PRUNE_MODES}.")
+
+    # Exact: players identical in lineup terms
+    groups: dict[tuple, int] = {}
+    for i, package in enumerate(packages):
+        key = tuple((str(a.pos), a.values) for a in _sorted_assets(package))
+        groups.setdefault(key, i)
+    kept = sorted(groups.values())
+    if mode == "exact":
+        return [packages[i] for i in kept]
+
+    import numpy as np
+
+    # Dominance, among the packages of the same positions
+    packages = [packages[i] for i in kept]
+    promise = _valuation_promise(team, packages, lineup_setter)
+    by_pos: dict[tuple[str, ...], list[int]] = defaultdict(list)
+    for i, package in enumerate(packages):
+        by_pos[tuple(str(a.pos) for a in _sorted_assets(package))].append(i)
+
+    dominated = np.zeros(len(packages), dtype=bool)
+    for members in by_pos.values():
+        if len(members) < 2:
+            continue
+        own = promise[members]
+        worth = np.array(
+            [
+                [(a.value, *a.values) for a in _sorted_assets(packages[i])]
+                for i in members
+            ],
+            dtype=float,
+        )
+        for k, i in enumerate(members):
+            as_good = (own >= own[k]).all(axis=1) & (worth >= worth[k]).all(axis=(1, 2))
+            better = (own > own[k]).any(axis=1) | (worth > worth[k]).any(axis=(1, 2))
+            # Equal packages were grouped, so one is never dropped for another
+            as_good[k] = False
+            dominated[i] = (as_good & better).any()
+    return [package for i, package in enumerate(packages) if not dominated[i]]
+
+
+def _valuation_promise(
+    team: Team, packages: list[Package], lineup_setter: Callable
+) -> np.ndarray:
+    """
+    `package_promise` under the primary value and every valuation of the league.
+
+    Returns a `(packages, valuations)` array, the primary value first; the
+    valuations come from the kernel of a `LineupCache`, when it has one.
+    """
+    import numpy as np
+
+    promise = np.array(package_promise(team, packages, lineup_setter)).reshape(-1, 1)
+    if getattr(lineup_setter, "kernel", None) is None or not packages:
+        return promise
+    base, *totals = lineup_setter.values_many(
+        [team.mask, *(team.mask ^ package.mask for package in packages)]
+    )
+    return np.hstack([promise, np.array(totals) - base])
@@ -0,0 +1,184 @@
+"""Long-running trade query server keeping leagues warm in memory."""
+
+from __future__ import annotations
+
+import json
+import socketserver
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+import yaml
+
+from ff_manager.api import eval_trades
+from ff_manager.league import PLATFORM_SWITCH
+
+if TYPE_CHECKING:
+    from ff_manager.league import BaseLeague
+
+DEFAULT_TRADE_LIMIT = 50
+
+
+class LeagueHandle:
+    """
+    A loaded league and the snapshot it was loaded from.
+
+    Queries read `league`; a reload builds a fresh league and then swaps the
+    reference, so queries already running keep the league they started with.
+    """
+
+    def __init__(self, profile_loc: str | Path, data_loc: str | Path):
+        self.profile_loc = Path(profile_loc)
+        self.data_loc = Path(data_loc)
+        self._reload_lock = threading.Lock()
+        self.league, self.mtime = self._load()
+
+    def _load(self) -> tuple[BaseLeague, float]:
+        mtime = self.data_loc.stat().st_mtime
+        with self.profile_loc.open() as f:
+            profile: dict = yaml.safe_load(f)
+        league = PLATFORM_SWITCH[profile["platform"]](
+            profile=profile, data_loc=self.data_loc
+        )
+        # Warm the baseline lineups:
+        for team in league.teams:
+            team.lineup = team.set_lineup()
+        return league, mtime
+
+    def reload_if_changed(self) -> bool:
+        """Reload the league if its snapshot changed on disk."""
+        with self._reload_lock:
+            if self.data_loc.stat().st_mtime == self.mtime:
+                return False
+            self.league, self.mtime = self._load()
+            return True
+
+
+class TradeServer:
+    """
+    Answer `eval_trades` queries against leagues loaded once.
+
+    Queries are read-only and run concurrently, one thread each. A background
+    thread polls the league snapshots and reloads any that changed.
+    """
+
+    def __init__(self, leagues: dict[str, LeagueHandle], poll_interval: float = 5):
+        self.leagues = leagues
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._httpd: socketserver.BaseServer | None = None
+
+    def query(self, league_name: str, reqs: dict, limit: int | None = None) -> dict:
+        try:
+            league = self.leagues[league_name].league
+        except KeyError as e:
+            raise ValueError(
+                f"Unknown league {league_name!r}, choose from {sorted(self.leagues)}"
+            ) from e
+        trades, stats = eval_trades(league=league, reqs=reqs, return_stats=True)
+        limit = DEFAULT_TRADE_LIMIT if limit is None else limit
+        return {
+            "trades": [trade.to_dict() for trade in trades[:limit]],
+            "n_trades": len(trades),
+            "stats": stats.to_dict(),
+        }
+
+    def poll_once(self) -> list[str]:
+        """Reload changed leagues; return the names of those reloaded."""
+        reloaded = []
+        for name, handle in self.leagues.items():
+            try:
+                if handle.reload_if_changed():
+                    reloaded.append(name)
+            except Exception as e:  # keep serving the old league
+                click.secho(f"WARNING: Could not reload {name}. --> {e}", fg="red")
+        return reloaded
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            for name in self.poll_once():
+                click.secho(f"Reloaded league <{name}>", fg="green")
+
+    def make_httpd(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: str | Path | None = None,
+    ) -> socketserver.BaseServer:
+        handler = _make_handler(self)
+        if socket_path is not None:
+
+            class _ThreadingUnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+                daemon_threads = True
+
+            Path(socket_path).unlink(missing_ok=True)
+            self._httpd = _ThreadingUnixHTTPServer(str(socket_path), handler)
+        else:
+            self._httpd = ThreadingHTTPServer((host, port), handler)
+        return self._httpd
+
+    def serve_forever(self, **kwargs) -> None:
+        httpd = self._httpd or self.make_httpd(**kwargs)
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+def _make_handler(server: TradeServer) -> type[BaseHTTPRequestHandler]:
+    class _Handler(BaseHTTPRequestHandler):
+        def address_string(self) -> str:
+            return self.client_address[0] if self.client_address else "unix"
+
+        def _send_json(self, status: HTTPStatus, body: dict) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self) -> None:
+            if self.path == "/leagues":
+                body = {
+                    name: {
+                        "data": str(handle.data_loc),
+                        "teams": [team.name for team in handle.league.teams],
+                    }
+                    for name, handle in server.leagues.items()
+                }
+                self._send_json(HTTPStatus.OK, body)
+            elif self.path == "/health":
+                self._send_json(HTTPStatus.OK, {"status": "ok"})
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+
+        def do_POST(self) -> None:
+            if self.path != "/trades":
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request: dict = json.loads(self.rfile.read(length))
+                body = server.query(
+                    league_name=request["league"],
+                    reqs=request["reqs"],
+                    limit=request.get("limit"),
+                )
+            except (KeyError, ValueError, TypeError) as e:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            else:
+                self._send_json(HTTPStatus.OK, body)
+
+    return _Handler
@@ -0,0 +1,234 @@
+"""Incremental writers for selected trades."""
+
+from __future__ import annotations
+
+import csv
+import heapq
+import itertools
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from ff_manager.trade import Trade
+
+PARQUET_BATCH_SIZE = 10_000
+
+
+class TradeSink(ABC):
+    """
+    Write trades one at a time, as they are selected.
+
+    The first `top` trades written are also held in `top_trades`, so the best few
+    can be rendered once the search is done without keeping every trade.
+    """
+
+    def __init__(self, loc: str | Path, top: int = 0):
+        self.loc = Path(loc)
+        self.top = top
+        self.top_trades: list[Trade] = []
+        self.n_written = 0
+
+    def write(self, trade: Trade) -> None:
+        if len(self.top_trades) < self.top:
+            self.top_trades.append(trade)
+        self._write(trade)
+        self.n_written += 1
+
+    def write_many(self, trades: Iterable[Trade]) -> None:
+        for trade in trades:
+            self.write(trade)
+
+    def write_row(self, row: dict) -> None:
+        """Write a trade already in its `Trade.to_dict` form."""
+        self._write_row(row)
+        self.n_written += 1
+
+    def _write(self, trade: Trade) -> None:
+        self._write_row(trade.to_dict())
+
+    @abstractmethod
+    def _write_row(self, row: dict) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> TradeSink:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NDJSONSink(TradeSink):
+    def __init__(self, loc: str | Path, top: int = 0):
+        super().__init__(loc, top)
+        self._f = self.loc.open("w")
+
+    def _write_row(self, row: dict) -> None:
+        self._f.write(json.dumps(row) + "\n")
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class CSVSink(TradeSink):
+    """Trades as CSV rows, with lists (e.g. the sent assets) joined by `;`."""
+
+    def __init__(self, loc: str | Path, top: int = 0):
+        super().__init__(loc, top)
+        self._f = self.loc.open("w", newline="")
+        self._writer: csv.DictWriter | None = None
+
+    def _write_row(self, row: dict) -> None:
+        row = {
+            k: ";".join(map(str, v)) if isinstance(v, list) else v
+            for k, v in row.items()
+        }
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._f, fieldnames=list(row))
+            self._writer.writeheader()
+        self._writer.writerow(row)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _trade_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("team1", pa.string()),
+            ("team2", pa.string()),
+            ("sent", pa.list_(pa.string())),
+            ("received", pa.list_(pa.string())),
+            ("team1_gain", pa.float64()),
+            ("team2_gain", pa.float64()),
+            ("team1_value", pa.float64()),
+            ("team2_value", pa.float64()),
+            ("team1_gains", pa.list_(pa.float64())),
+            ("team2_gains", pa.list_(pa.float64())),
+            ("gain_mean", pa.float64()),
+            ("gain_p05", pa.float64()),
+            ("p_gain", pa.float64()),
+        ]
+    )
+
+
+class ParquetSink(TradeSink):
+    """Trades as parquet, buffered and flushed one row group per `batch_size`."""
+
+    def __init__(
+        self, loc: str | Path, top: int = 0, batch_size: int = PARQUET_BATCH_SIZE
+    ):
+        super().__init__(loc, top)
+        self.batch_size = batch_size
+        self._rows: list[dict] = []
+        self._writer = None
+
+    def _write_row(self, row: dict) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.loc, _trade_schema())
+        self._writer.write_table(
+            pa.Table.from_pylist(self._rows, schema=_trade_schema())
+        )
+        self._rows = []
+
+    def close(self) -> None:
+        import pyarrow.parquet as pq
+
+        self._flush()
+        if self._writer is None:  # no trades, still leave a readable file
+            self._writer = pq.ParquetWriter(self.loc, _trade_schema())
+        self._writer.close()
+
+
+class TextSink(TradeSink):
+    """Trades as their plain text repr."""
+
+    def __init__(self, loc: str | Path, top: int = 0):
+        super().__init__(loc, top)
+        self._f = self.loc.open("w")
+
+    def _write(self, trade: Trade) -> None:
+        self._f.write(f"{trade!r}\n")
+
+    def _write_row(self, row: dict) -> None:
+        raise ValueError("Trade rows can only be written to structured files.")
+
+    def close(self) -> None:
+        self._f.close()
+
+
+SINK_SWITCH: dict[str, type[TradeSink]] = {
+    ".ndjson": NDJSONSink,
+    ".jsonl": NDJSONSink,
+    ".csv": CSVSink,
+    ".parquet": ParquetSink,
+}
+
+
+def open_sink(loc: str | Path, top: int = 0) -> TradeSink:
+    """Open the sink matching the file suffix, falling back to plain text."""
+    sink_cls = SINK_SWITCH.get(Path(loc).suffix.lower(), TextSink)
+    return sink_cls(loc, top=top)
+
+
+def read_rows(loc: str | Path) -> Iterator[dict]:
+    """Trades written by an .ndjson or .parquet sink, as `Trade.to_dict` rows."""
+    loc = Path(loc)
+    sink_cls = SINK_SWITCH.get(loc.suffix.lower())
+    if sink_cls is NDJSONSink:
+        with loc.open() as f:
+            for line in f:
+                yield json.loads(line)
+    elif sink_cls is ParquetSink:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(loc).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Only .ndjson and .parquet trades can be read, not {loc}.")
+
+
+def merge_rows(
+    locs: Iterable[str | Path], limit: int | None = None, rank_by: int = 0
+) -> Iterator[dict]:
+    """
+    Best trades over several result files, each already ranked best first.
+
+    Files are merged on the gain column `rank_by` of the search (see
+    `valuation_column`), like the ranking of a single search, so merging the top
+    `limit` trades of each shard of a search gives the top `limit` trades of the
+    whole search. Ties keep the order of `locs`.
+    """
+
+    def _key(row: dict) -> float:
+        if not rank_by:
+            return -row["team1_gain"]
+        gains = row.get("team1_gains")
+        if gains is None or len(gains) < rank_by:
+            raise ValueError(
+                f"The trades of {row['team1']} and {row['team2']} carry no gain "
+                f"under valuation {rank_by}, the shards were not searched with it."
+            )
+        return -gains[rank_by - 1]
+
+    merged = heapq.merge(*(read_rows(loc) for loc in locs), key=_key)
+    return itertools.islice(merged, limit)
@@ -0,0 +1,235 @@
+"""Gains of evaluated trades, spilled to disk under a memory budget."""
+
+from __future__ import annotations
+
+import heapq
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ff_manager.functions import loc_best_gains, trade_gains
+from ff_manager.memory import MB
+from ff_manager.trade import Package, Trade
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    import numpy as np
+    import pyarrow as pa
+
+    from ff_manager.model import Team
+
+# Retained bytes per executed trade, as measured on a 2-asset search
+TRADE_BYTES = 1_024
+# Bytes of a gains row read back as a dict, while runs are merged
+ROW_BYTES = 512
+
+
+def _gain_schema(*, valuations: bool = False) -> pa.Schema:
+    import pyarrow as pa
+
+    fields = [
+        ("opp", pa.int32()),
+        ("send_idx", pa.list_(pa.int32())),
+        ("receive_idx", pa.list_(pa.int32())),
+        ("team1_gain", pa.float64()),
+        ("team2_gain", pa.float64()),
+    ]
+    if valuations:
+        fields += [
+            ("team1_gains", pa.list_(pa.float64())),
+            ("team2_gains", pa.list_(pa.float64())),
+        ]
+    return pa.schema(fields)
+
+
+class GainSpill:
+    """
+    Gains of evaluated trades, held up to a memory budget and spilled to disk past it.
+
+    Added trades are reduced to their gains and the roster positions of their
+    packages, and the trades themselves are dropped. Rows failing the selection
+    (`max_fleece`, `min_gain`) are dropped too, and the rest are ranked as
+    `loc_best_gains` does before being written, so every spilled file is a sorted
+    run. `iter_trades` merges the runs back, best first, rebuilding only the
+    trades it yields; ties keep the order the trades were added in, so the ranking
+    is that of an in-memory search. With `valuations`, the trades carry their
+    gains under each valuation of the league (see `iter_valuation_gains`), which
+    are kept alongside and selected and ranked on as `loc_best_gains` does, by the
+    `rank_by` column.
+
+    The budget is split between the chunk of executed trades being added (a
+    quarter, see `chunk_size`), the gains held before spilling (half) and the rows
+    read back while merging (a quarter). Runs go to a temporary directory unless
+    `path` is given, and are removed by `close`.
+    """
+
+    def __init__(
+        self,
+        team: Team,
+        opp_teams: list[Team],
+        lineup_setter: Callable,
+        budget_mb: float,
+        path: str | Path | None = None,
+        max_fleece: float | None = None,
+        min_gain: float | None = 0,
+        *,
+        valuations: bool = False,
+        rank_by: int = 0,
+    ):
+        if budget_mb <= 0:
+            raise ValueError("The memory budget must be positive.")
+        self.team = team
+        self.opp_teams = opp_teams
+        self.lineup_setter = lineup_setter
+        self.budget = budget_mb * MB
+        self.max_fleece = max_fleece
+        self.min_gain = min_gain
+        self.valuations = valuations
+        self.rank_by = rank_by
+        self._schema = _gain_schema(valuations=valuations)
+        self._tmp = None
+        if path is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="ff-manager-spill-")
+            path = self._tmp.name
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.runs: list[Path] = []
+        self.n_added = 0
+        self.n_spilled = 0
+        self._opp_i = {opp.name: i for i, opp in enumerate(opp_teams)}
+        self._batches: list[pa.RecordBatch] = []
+        self._nbytes = 0
+
+    @property
+    def chunk_size(self) -> int:
+        """Trades to add at a time, so executed trades take a quarter of the budget."""
+        return max(1, int(self.budget / 4 / TRADE_BYTES))
+
+    def add(self, trades: list[Trade]) -> None:
+        """Keep the gains of executed trades, spilling a run once past the budget."""
+        import pyarrow as pa
+
+        self.n_added += len(trades)
+        gains1, gains2 = trade_gains(trades)
+        kept = loc_best_gains(
+            gains1,
+            gains2,
+            max_fleece=self.max_fleece,
+            min_gain=self.min_gain,
+            sort_trades=False,
+        )
+        if not len(kept):
+            return
+        columns = {
+            "opp": [self._opp_i[trades[i].team2.name] for i in kept],
+            "send_idx": [trades[i].package1.idx for i in kept],
+            "receive_idx": [trades[i].package2.idx for i in kept],
+            "team1_gain": gains1[kept, 0],
+            "team2_gain": gains2[kept, 0],
+        }
+        if self.valuations:
+            columns["team1_gains"] = gains1[kept, 1:].tolist()
+            columns["team2_gains"] = gains2[kept, 1:].tolist()
+        batch = pa.RecordBatch.from_pydict(columns, schema=self._schema)
+        self._batches.append(batch)
+        self._nbytes += batch.nbytes
+        if self._nbytes > self.budget / 2:
+            self.spill()
+
+    def _ranked(self) -> pa.Table:
+        """The held gains as one table, best first."""
+        import pyarrow as pa
+
+        table = pa.Table.from_batches(self._batches, schema=self._schema)
+        order = loc_best_gains(
+            self._rank_gains(table),
+            table["team2_gain"].to_numpy(),
+            max_fleece=None,
+            min_gain=None,
+        )
+        return table.take(order)
+
+    def _rank_gains(self, table: pa.Table) -> np.ndarray:
+        """The `team1` gains the held trades are ranked by."""
+        import numpy as np
+
+        if not self.rank_by:
+            return table["team1_gain"].to_numpy()
+        return np.array(
+            [gains[self.rank_by - 1] for gains in table["team1_gains"].to_pylist()]
+        )
+
+    def _rank_key(self, row: dict) -> float:
+        if not self.rank_by:
+            return -row["team1_gain"]
+        return -row["team1_gains"][self.rank_by - 1]
+
+    def spill(self) -> None:
+        """Write the held gains to disk as a sorted run."""
+        import pyarrow.parquet as pq
+
+        if not self._batches:
+            return
+        table = self._ranked()
+        loc = self.path / f"run-{len(self.runs):05d}.parquet"
+        pq.write_table(table, loc)
+        self.runs.append(loc)
+        self.n_spilled += table.num_rows
+        self._batches = []
+        self._nbytes = 0
+
+    def _iter_rows(self) -> Iterator[dict]:
+        import pyarrow.parquet as pq
+
+        # Rows read back at a time per run, so all runs fit in a quarter budget
+        n_runs = len(self.runs) + bool(self._batches)
+        batch_size = max(1, int(self.budget / 4 / ROW_BYTES / max(n_runs, 1)))
+
+        def _read(batches: Iterator[pa.RecordBatch]) -> Iterator[dict]:
+            for batch in batches:
+                yield from batch.to_pylist()
+
+        runs = [
+            _read(pq.ParquetFile(loc).iter_batches(batch_size=batch_size))
+            for loc in self.runs
+        ]
+        if self._batches:  # the last run, never spilled
+            runs.append(_read(iter(self._ranked().to_batches(batch_size))))
+        return heapq.merge(*runs, key=self._rank_key)
+
+    def iter_trades(self) -> Iterator[Trade]:
+        """Yield the kept trades, best first, rebuilt and executed one at a time."""
+        import numpy as np
+
+        for row in self._iter_rows():
+            opp = self.opp_teams[row["opp"]]
+            send_idx = tuple(row["send_idx"])
+            receive_idx = tuple(row["receive_idx"])
+            trade = Trade(
+                team1=self.team,
+                team2=opp,
+                package1=Package(
+                    tuple(self.team.assets[i] for i in send_idx), send_idx
+                ),
+                package2=Package(
+                    tuple(opp.assets[i] for i in receive_idx), receive_idx
+                ),
+                lineup_setter=self.lineup_setter,
+            )
+            trade.execute_trade()
+            if self.valuations:
+                trade.team1_gains = np.array(row["team1_gains"])
+                trade.team2_gains = np.array(row["team2_gains"])
+            yield trade
+
+    def close(self) -> None:
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+    def __enter__(self) -> GainSpill:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,118 @@
+"""Instrumentation for the trade engine."""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from ff_manager.memory import MemoryReport
+
+STAGES = ("enumerate", "filter", "assemble", "evaluate", "select")
+
+
+class SearchStats:
+    """
+    Wall time per stage and counters collected during a trade search.
+
+    Timing is taken once per stage entry and counters are plain integer adds, so
+    the object is cheap enough to be collected on every run.
+    """
+
+    def __init__(self, memory: MemoryReport | None = None):
+        self.stage_times: dict[str, float] = defaultdict(float)
+        self.counters: dict[str, int] = defaultdict(int)
+        self.memory = memory
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[SearchStats]:
+        """Accumulate the wall time spent inside the block under `name`."""
+        if self.memory is not None:
+            self.memory.enter_stage(name)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.stage_times[name] += time.perf_counter() - start
+            if self.memory is not None:
+                self.memory.exit_stage(name)
+
+    def incr(self, key: str, n: int = 1) -> None:
+        self.counters[key] += n
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.stage_times.values())
+
+    @property
+    def trades_per_second(self) -> float:
+        eval_time = self.stage_times.get("evaluate", 0)
+        if not eval_time:
+            return 0.0
+        return self.counters["trades.evaluated"] / eval_time
+
+    @property
+    def lineup_cache_hit_rate(self) -> float:
+        hits = self.counters["lineup_cache.hits"]
+        lookups = hits + self.counters["lineup_cache.misses"]
+        if not lookups:
+            return 0.0
+        return hits / lookups
+
+    @property
+    def coverage(self) -> float | None:
+        """
+        Share of the package pairs evaluated by a timed search.
+
+        None if the search did not count its pairs, or stopped before it could.
+        """
+        total = self.counters.get("package_pairs.total")
+        if total is None:
+            return None
+        if not total:
+            return 1.0
+        return self.counters["package_pairs.evaluated"] / total
+
+    def to_dict(self) -> dict:
+        return {
+            "stage_times": dict(self.stage_times),
+            "counters": dict(self.counters),
+            "total_time": self.total_time,
+            "trades_per_second": self.trades_per_second,
+            "lineup_cache_hit_rate": self.lineup_cache_hit_rate,
+            "coverage": self.coverage,
+            "memory": self.memory.to_dict() if self.memory is not None else None,
+        }
+
+    def pprint(self) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="Search Stats")
+        table.add_column("Metric", style="cyan", no_wrap=True)
+        table.add_column("Value", style="magenta", no_wrap=True)
+
+        ordered_stages = [s for s in STAGES if s in self.stage_times] + [
+            s for s in self.stage_times if s not in STAGES
+        ]
+        for stage in ordered_stages:
+            table.add_row(f"time.{stage}", f"{self.stage_times[stage]:.3f}s")
+        table.add_row("time.total", f"{self.total_time:.3f}s")
+
+        for key in sorted(self.counters):
+            table.add_row(key, f"{self.counters[key]:,}")
+
+        table.add_row("lineup_cache.hit_rate", f"{self.lineup_cache_hit_rate:.1%}")
+        table.add_row("trades_per_second", f"{self.trades_per_second:,.0f}")
+        if self.coverage is not None:
+            table.add_row("coverage", f"{self.coverage:.1%}")
+
+        console = Console()
+        console.print(table)
+
+        if self.memory is not None:
+            self.memory.pprint()
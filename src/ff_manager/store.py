@@ -0,0 +1,159 @@
+"""Persistent store of evaluated trade gains."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ff_manager.const import SELECTION_REQ_FIELDS
+from ff_manager.trade import Package, Trade
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    import pyarrow as pa
+
+    from ff_manager.model import Team
+
+STORE_VERSION = 3
+
+
+def _pair_schema(*, valuations: bool = False) -> pa.Schema:
+    import pyarrow as pa
+
+    fields = [
+        ("send_ids", pa.list_(pa.string())),
+        ("receive_ids", pa.list_(pa.string())),
+        ("team1_gain", pa.float64()),
+        ("team2_gain", pa.float64()),
+    ]
+    if valuations:
+        fields += [
+            ("team1_gains", pa.list_(pa.float64())),
+            ("team2_gains", pa.list_(pa.float64())),
+        ]
+    return pa.schema(fields)
+
+
+def _digest(obj: object) -> str:
+    payload = json.dumps(obj, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def roster_fingerprint(team: Team) -> str:
+    """Hash of everything about a roster that can change a lineup."""
+    return _digest(
+        sorted((str(a._id), a.name, a.pos, a.value, a.values) for a in team.assets),
+    )
+
+
+class ResultStore:
+    """
+    Gains of evaluated trades, persisted per team pair.
+
+    Each pair is keyed by a hash of both rosters (ids, names, positions and values
+    under every valuation), the lineup profile and the reqs that change which
+    packages are evaluated. A roster move or a value update only changes the keys of
+    the pairs involving that team, so every other pair is reused as is on the next
+    search.
+
+    Gains are kept columnar so selection-only reqs (`max_fleece`, `min_gain`,
+    `rank_by`) can be re-applied to stored pairs without rebuilding a single trade;
+    only the selected rows are turned back into `Trade` objects. The gains under
+    each valuation of the league are kept next to the primary gain.
+    """
+
+    def __init__(self, path: str | Path, profile: dict, reqs: dict):
+        self.path = Path(path)
+        (self.path / "pairs").mkdir(parents=True, exist_ok=True)
+        self._search_key = _digest(
+            {
+                "version": STORE_VERSION,
+                "lineup": profile.get("lineup"),
+                "valuations": profile.get("valuations"),
+                "reqs": {
+                    k: v for k, v in reqs.items() if k not in SELECTION_REQ_FIELDS
+                },
+            }
+        )
+
+    @property
+    def _manifest_loc(self) -> Path:
+        return self.path / "manifest.json"
+
+    def pair_key(self, team1: Team, team2: Team) -> str:
+        return _digest(
+            [self._search_key, roster_fingerprint(team1), roster_fingerprint(team2)]
+        )
+
+    def _pair_loc(self, key: str) -> Path:
+        return self.path / "pairs" / f"{key}.parquet"
+
+    def diff_snapshot(self, teams: Iterable[Team]) -> set[str]:
+        """Names of the teams whose rosters changed since the last snapshot."""
+        current = {team.name: roster_fingerprint(team) for team in teams}
+        try:
+            with self._manifest_loc.open() as f:
+                previous: dict[str, str] = json.load(f)
+        except FileNotFoundError:
+            previous = {}
+
+        with self._manifest_loc.open("w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+        return {name for name, fp in current.items() if previous.get(name) != fp}
+
+    def load_gains(self, team1: Team, team2: Team) -> pa.Table | None:
+        """Stored gains of a pair, or None if the pair was never evaluated."""
+        loc = self._pair_loc(self.pair_key(team1, team2))
+        if not loc.exists():
+            return None
+        import pyarrow.parquet as pq
+
+        return pq.read_table(loc)
+
+    @staticmethod
+    def make_trade(
+        team1: Team, team2: Team, row: dict, lineup_setter: Callable
+    ) -> Trade:
+        """Rebuild a stored trade, carrying its gains but not yet executed."""
+        idx1 = {str(a._id): i for i, a in enumerate(team1.assets)}
+        idx2 = {str(a._id): i for i, a in enumerate(team2.assets)}
+        send_idx = tuple(idx1[i] for i in row["send_ids"])
+        receive_idx = tuple(idx2[i] for i in row["receive_ids"])
+        trade = Trade(
+            team1=team1,
+            team2=team2,
+            package1=Package(tuple(team1.assets[i] for i in send_idx), send_idx),
+            package2=Package(tuple(team2.assets[i] for i in receive_idx), receive_idx),
+            lineup_setter=lineup_setter,
+        )
+        trade.team1_gain = row["team1_gain"]
+        trade.team2_gain = row["team2_gain"]
+        if row.get("team1_gains") is not None:
+            import numpy as np
+
+            trade.team1_gains = np.array(row["team1_gains"])
+            trade.team2_gains = np.array(row["team2_gains"])
+        return trade
+
+    def save(self, team1: Team, team2: Team, trades: list[Trade]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {
+            "send_ids": [[str(a._id) for a in t.sent_assets] for t in trades],
+            "receive_ids": [[str(a._id) for a in t.rec_assets] for t in trades],
+            "team1_gain": [t.team1_gain for t in trades],
+            "team2_gain": [t.team2_gain for t in trades],
+        }
+        valuations = bool(trades) and trades[0].team1_gains is not None
+        if valuations:
+            columns["team1_gains"] = [t.team1_gains.tolist() for t in trades]
+            columns["team2_gains"] = [t.team2_gains.tolist() for t in trades]
+        table = pa.Table.from_pydict(
+            columns, schema=_pair_schema(valuations=valuations)
+        )
+        pq.write_table(table, self._pair_loc(self.pair_key(team1, team2)))
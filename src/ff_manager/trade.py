@@ -1,14 +1,46 @@
-from collections.abc import Callable, Generator
-from copy import copy
+from __future__ import annotations
 
-from ff_manager.model import Asset, Team
-from ff_manager.utils import diff_assets
+from typing import TYPE_CHECKING
+
+from ff_manager.lineup import LineupCache
+from ff_manager.model import roster_mask
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+    import numpy as np
+
+    from ff_manager.lineup import LineupMeta
+    from ff_manager.model import Asset, Team
 
 
 class Package:
-    def __init__(self, assets: set[Asset]):
+    """
+    Assets sent together in a trade.
+
+    `idx` holds the positions of the assets in the roster they came from, which is
+    all a trade needs to rebuild that roster without them. Packages built without
+    it look the positions up by league index, or by identity for assets outside of
+    a league.
+    """
+
+    __slots__ = ("_mask", "_positions", "assets", "idx")
+
+    def __init__(self, assets: tuple[Asset, ...], idx: tuple[int, ...] | None = None):
         self.assets = assets
+        self.idx = idx
         self._positions = {getattr(asset, "pos", None) for asset in self.assets}
+        self._mask: int | None = None
+
+    @property
+    def mask(self) -> int | None:
+        """Bitmask of the assets over the league index, None outside of a league."""
+        if self._mask is None:
+            try:
+                self._mask = roster_mask(self.assets)
+            except TypeError:
+                return None
+        return self._mask
 
     def _get_composite_values(self) -> Generator:
         return (asset.composite_value for asset in self.assets)
@@ -16,6 +48,31 @@ class Package:
     def get_composite_values_corr(self) -> list:
         return list(self._get_composite_values())
 
+    def positions_in(self, team: Team) -> tuple[int, ...]:
+        """
+        Positions of the assets in the team roster, by league index.
+
+        Assets without an index are found by identity, as names may collide.
+        Raises ValueError for an asset not on the roster.
+        """
+        if self.idx is not None:
+            return self.idx
+        positions = []
+        for asset in self.assets:
+            if asset.idx is not None:
+                positions.append(team.positions[asset.idx])
+                continue
+            i = next((i for i, a in enumerate(team.assets) if a is asset), None)
+            if i is None:
+                raise ValueError(f"{asset.name} is not on the roster of {team.name}.")
+            positions.append(i)
+        return tuple(positions)
+
+    def retained(self, team: Team) -> tuple[Asset, ...]:
+        """The team roster without this package's assets."""
+        idx = self.positions_in(team)
+        return tuple(a for i, a in enumerate(team.assets) if i not in idx)
+
     def __iter__(self):
         return iter(self.assets)
 
@@ -23,8 +80,40 @@ class Package:
         return len(self.assets)
 
 
+def _tolist(values: np.ndarray | None) -> list[float] | None:
+    return None if values is None else values.tolist()
+
+
 class Trade:
-    """object holding details of a trade."""
+    """
+    object holding details of a trade.
+
+    Both teams are shared snapshots and are never copied or modified. The rosters
+    after the trade are the team rosters less the package indices plus the
+    received package, rebuilt on demand rather than kept on the trade. As bitmasks,
+    each roster after the trade is two XORs of the team and package masks, which
+    is all a `LineupCache` needs to look its lineup up.
+    """
+
+    __slots__ = (
+        "_lineup_setter",
+        "executed",
+        "gain_mean",
+        "gain_p05",
+        "new_team1_value",
+        "new_team2_value",
+        "p_gain",
+        "package1",
+        "package2",
+        "rec_assets",
+        "sent_assets",
+        "team1",
+        "team1_gain",
+        "team1_gains",
+        "team2",
+        "team2_gain",
+        "team2_gains",
+    )
 
     def __init__(
         self,
@@ -35,56 +124,123 @@ class Trade:
         lineup_setter: Callable,
     ):
         self._lineup_setter = lineup_setter
-        self.team1 = copy(team1)
-        self.team2 = copy(team2)
+        self.team1 = team1
+        self.team2 = team2
         self.package1 = package1
         self.package2 = package2
         self.sent_assets = package1.assets
         self.rec_assets = package2.assets
-        self.value1: float | None = None
-        self.value2: float | None = None
+        self.new_team1_value: float | None = None
+        self.new_team2_value: float | None = None
+        self.team1_gain: float | None = None
+        self.team2_gain: float | None = None
+        self.team1_gains: np.ndarray | None = None
+        self.team2_gains: np.ndarray | None = None
+        self.gain_mean: float | None = None
+        self.gain_p05: float | None = None
+        self.p_gain: float | None = None
+        self.executed = False
+
+    @property
+    def new_team1_assets(self) -> tuple[Asset, ...]:
+        return self.package1.retained(self.team1) + self.rec_assets
+
+    @property
+    def new_team2_assets(self) -> tuple[Asset, ...]:
+        return self.package2.retained(self.team2) + self.sent_assets
+
+    @property
+    def new_team1_mask(self) -> int:
+        return self.team1.mask ^ self.package1.mask ^ self.package2.mask
+
+    @property
+    def new_team2_mask(self) -> int:
+        return self.team2.mask ^ self.package2.mask ^ self.package1.mask
+
+    @property
+    def _by_mask(self) -> bool:
+        return isinstance(self._lineup_setter, LineupCache) and (
+            self.team1.mask is not None and self.team2.mask is not None
+        )
+
+    @property
+    def new_team1_lineup(self) -> LineupMeta:
+        if self._by_mask:
+            return self._lineup_setter(mask=self.new_team1_mask)
+        return self._lineup_setter(assets=self.new_team1_assets)
+
+    @property
+    def new_team2_lineup(self) -> LineupMeta:
+        if self._by_mask:
+            return self._lineup_setter(mask=self.new_team2_mask)
+        return self._lineup_setter(assets=self.new_team2_assets)
 
     def execute_trade(self) -> None:
         """Execute the trade."""
-        # Create new team1:
-        retained_assets = diff_assets(assets=self.team1.assets, rm=self.sent_assets)
-        new_team1_assets = tuple(retained_assets + self.rec_assets)
-        self.new_team1 = Team(
-            name=self.team1.name,
-            assets=new_team1_assets,
-            lineup_setter=self._lineup_setter,
-        )
-        self.new_team1.lineup = self.new_team1.set_lineup()
-        self.new_team1_value = self.new_team1.lineup.total_value
-
-        # Create new team2:
-        retained_assets = diff_assets(assets=self.team2.assets, rm=self.rec_assets)
-        new_team2_assets = tuple(retained_assets + self.sent_assets)
-        self.new_team2 = Team(
-            name=self.team2.name,
-            assets=new_team2_assets,
-            lineup_setter=self._lineup_setter,
-        )
-        self.new_team2.lineup = self.new_team2.set_lineup()
-        self.new_team2_value = self.new_team2.lineup.total_value
+        setter = self._lineup_setter
+        team1, team2 = self.team1, self.team2
+        if self._by_mask:
+            moved = self.package1.mask ^ self.package2.mask
+            new_mask1, new_mask2 = team1.mask ^ moved, team2.mask ^ moved
+            new_lineup1 = setter.get(new_mask1)
+            if new_lineup1 is None:  # only build the roster on a miss
+                new_lineup1 = setter(self.new_team1_assets, mask=new_mask1)
+            new_lineup2 = setter.get(new_mask2)
+            if new_lineup2 is None:
+                new_lineup2 = setter(self.new_team2_assets, mask=new_mask2)
+            lineup1 = setter(team1.assets, mask=team1.mask)
+            lineup2 = setter(team2.assets, mask=team2.mask)
+        else:
+            new_lineup1 = setter(assets=self.new_team1_assets)
+            new_lineup2 = setter(assets=self.new_team2_assets)
+            lineup1 = setter(assets=team1.assets)
+            lineup2 = setter(assets=team2.assets)
+        self.new_team1_value = new_lineup1.total_value
+        self.new_team2_value = new_lineup2.total_value
 
         # Get Difference in Values:
-        self.team1.lineup = self.team1.set_lineup()
-        self.team2.lineup = self.team2.set_lineup()
-        self.team1_gain = self.new_team1_value - self.team1.lineup.total_value
-        self.team2_gain = self.new_team2_value - self.team2.lineup.total_value
+        self.team1_gain = self.new_team1_value - lineup1.total_value
+        self.team2_gain = self.new_team2_value - lineup2.total_value
+        self.executed = True
+
+    def to_dict(self) -> dict:
+        """Plain representation of an executed trade."""
+        return {
+            "team1": self.team1.name,
+            "team2": self.team2.name,
+            "sent": [asset.name for asset in self.sent_assets],
+            "received": [asset.name for asset in self.rec_assets],
+            "team1_gain": self.team1_gain,
+            "team2_gain": self.team2_gain,
+            "team1_value": self.new_team1_value,
+            "team2_value": self.new_team2_value,
+            "team1_gains": _tolist(self.team1_gains),
+            "team2_gains": _tolist(self.team2_gains),
+            "gain_mean": self.gain_mean,
+            "gain_p05": self.gain_p05,
+            "p_gain": self.p_gain,
+        }
+
+    def pprint(self) -> None:
+        """Print the trade with the depth charts of both teams after it."""
+        print(repr(self))
+        print(f"{self.team1.name} Lineup:")
+        self.new_team1_lineup.pprint()
+        print(f"{self.team2.name} Lineup:")
+        self.new_team2_lineup.pprint()
 
     def __repr__(self):
+        if not self.executed:
+            return (
+                f"Trade: {self.team1.name} sends {list(self.sent_assets)} "
+                f"to {self.team2.name} for {list(self.rec_assets)}"
+            )
         return f"""
               == Trade ================================================================
               Team1: {self.team1.name}
               Team2: {self.team2.name}
               Assets Sent: {self.sent_assets}
               Assets Received: {self.rec_assets}
-              Team1 Lineup:
-              {self.new_team1.lineup.pprint()}
-              Team2 Lineup:
-              {self.new_team2.lineup}
               Team1 Gain: {self.team1_gain:.2f}
               Team2 Gain: {self.team2_gain:.2f}
               Team1 Value: {self.new_team1_value:.2f}
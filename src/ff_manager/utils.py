@@ -2,21 +2,18 @@ from __future__ import annotations
 
 import contextlib
 import re
-import sys
-from pathlib import Path
 from typing import TYPE_CHECKING
 
-import polars as pl
-
 from ff_manager.const import REQUIRED_REQ_FIELDS
 
 if TYPE_CHECKING:
     from collections.abc import Container
-
-    from ff_manager.model import Asset
+    from pathlib import Path
 
 
 def hierarchical_data_load(loc: str | Path) -> list[dict]:
+    import polars as pl
+
     methods = [
         pl.read_parquet,
         pl.read_json,
@@ -35,13 +32,6 @@ def containerize_str(val: str | Container[str]) -> Container[str]:
     return val
 
 
-def diff_assets(assets: list[Asset], rm: list[Asset]) -> tuple:
-    valid_assets = assets.copy()
-    for asset in rm:
-        valid_assets.remove(asset)
-    return tuple(valid_assets)
-
-
 def ingest_reqs(reqs: dict) -> dict:
     for field in REQUIRED_REQ_FIELDS:
         if field not in reqs:
@@ -50,25 +40,21 @@ def ingest_reqs(reqs: dict) -> dict:
     return {k.replace("-", "_"): v for k, v in reqs.items()}
 
 
-def sink_repr(obj: object, sink_to: str | Path) -> None:
-    with Path(sink_to).open("w") as f:
-        original_stdout = sys.stdout
-        sys.stdout = f
-        print(obj)
-        sys.stdout = original_stdout
+def _cleaner(val: str) -> str:
+    """Drop markup tags and collapse whitespace."""
+    new_val = re.sub(r"<[^>]*>", "", val)
+    return " ".join(new_val.split())
+
+
+def _cleaner2(val: str) -> str:
+    """Keep only letters and digits."""
+    return re.sub(r"[^a-zA-Z0-9]", "", val)
 
 
 def _correct_fuzzy_team_names(invalid_names: set, valid_names: set) -> dict:
     invalid_names_list = list(invalid_names)
     valid_names_list = list(valid_names)
 
-    def _cleaner(val: str) -> str:
-        new_val = re.sub(r"<[^>]*>", "", val)
-        return " ".join(new_val.split())
-
-    def _cleaner2(val: str) -> str:
-        return re.sub(r"[^a-zA-Z0-9]", "", val)
-
     clean_valids = [_cleaner(valid_name) for valid_name in valid_names_list]
 
     name_map = {}
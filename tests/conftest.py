@@ -0,0 +1,46 @@
+import itertools
+import json
+import random
+from pathlib import Path
+
+import pytest
+import yaml
+
+from ff_manager.league import PLATFORM_SWITCH
+
+
+@pytest.fixture
+def make_league(tmp_path):
+    """
+    Build a Sleeper league of 80 random players over 10 teams.
+
+    Players are valued by `value` and `value_alt`, `value` being drawn from
+    `value_choices` when given. Every league built from the same seed has the same
+    players, so a test can build a second copy to revalue.
+    """
+    counter = itertools.count()
+
+    def _make(value_choices=None, *, seed=0, **profile_opts):
+        rng = random.Random(seed)
+        players = [
+            {
+                "id": str(i),
+                "name": f"player-{i}",
+                "team": f"team{i % 10}",
+                "pos": rng.choice(("QB", "RB", "WR", "TE")),
+                "value": (
+                    rng.choice(value_choices) if value_choices else rng.randint(1, 100)
+                ),
+                "value_alt": rng.randint(1, 100),
+            }
+            for i in range(80)
+        ]
+        data_loc = tmp_path / f"league{next(counter)}.json"
+        data_loc.write_text(json.dumps(players))
+        with Path("tests/data/sleeper-super1.json").open() as fpath:
+            profile: dict = yaml.safe_load(fpath)
+        return PLATFORM_SWITCH["sleeper"](
+            data_loc=data_loc, profile=profile | profile_opts
+        )
+
+    return _make
@@ -0,0 +1,124 @@
+import pytest
+import yaml
+
+from ff_manager import anytime, api
+from ff_manager.api import eval_trades
+from ff_manager.trade import Trade
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+def test_timed_search(league):
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -1000}
+    expected = [t.to_dict() for t in eval_trades(league, reqs)]
+
+    trades, stats = eval_trades(league, reqs, return_stats=True, time_budget=1e6)
+    assert [t.to_dict() for t in trades] == expected
+    assert stats.coverage == 1
+
+    # The deadline passes before the packages of the opposing teams are built
+    trades, stats = eval_trades(league, reqs, return_stats=True, time_budget=0)
+    assert trades == []
+    assert stats.coverage is None
+    assert stats.counters["search.deadline"] == 1
+    assert "packages.receive_filter.kept" not in stats.counters
+
+
+def test_interrupted_search(league, monkeypatch):
+    n_executed = 0
+
+    class _InterruptedTrade(Trade):
+        __slots__ = ()
+
+        def execute_trade(self):
+            nonlocal n_executed
+            if n_executed == 300:
+                raise KeyboardInterrupt
+            n_executed += 1
+            super().execute_trade()
+
+    monkeypatch.setattr(anytime, "Trade", _InterruptedTrade)
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -1000}
+    trades, stats = eval_trades(league, reqs, return_stats=True, interruptible=True)
+
+    assert len(trades) == 300
+    assert stats.counters["search.interrupted"] == 1
+    assert 0 < stats.coverage < 1
+    # The most promising trades come first
+    everything = eval_trades(league, reqs)
+    mean = sum(t.team1_gain for t in everything) / len(everything)
+    assert sum(t.team1_gain for t in trades) / len(trades) > mean
+
+
+def test_interrupted_while_building(league, monkeypatch):
+    def _interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(anytime, "receive_packages", _interrupt)
+    reqs = {"team": "team0", "max_assets": 2}
+    trades, stats = eval_trades(league, reqs, return_stats=True, interruptible=True)
+    assert trades == []
+    assert stats.counters["search.interrupted"] == 1
+
+
+def _interrupt_after(n, selected):
+    for i, trade in enumerate(selected):
+        if i == n:
+            raise KeyboardInterrupt
+        yield trade
+
+
+def test_interrupted_while_selecting(league, monkeypatch):
+    iter_best_trades = api.iter_best_trades
+    monkeypatch.setattr(
+        api,
+        "iter_best_trades",
+        lambda **kwargs: _interrupt_after(5, iter_best_trades(**kwargs)),
+    )
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -1000}
+    trades, stats = eval_trades(league, reqs, return_stats=True, interruptible=True)
+    assert len(trades) == 5
+    assert stats.counters["search.interrupted"] == 1
+    assert stats.counters["trades.selected"] == 5
+
+    with pytest.raises(KeyboardInterrupt):
+        eval_trades(league, reqs)
+
+
+@pytest.fixture
+def reqs_loc(tmp_path):
+    loc = tmp_path / "reqs.yaml"
+    loc.write_text(yaml.safe_dump({"team": "team1", "min_gain": -1000}))
+    return loc
+
+
+def test_main_interrupted(reqs_loc, monkeypatch, capsys):
+    iter_best_trades = api.iter_best_trades
+    monkeypatch.setattr(
+        api,
+        "iter_best_trades",
+        lambda **kwargs: _interrupt_after(1, iter_best_trades(**kwargs)),
+    )
+    api.main(reqs_loc, "tests/data/sleeper-super1.json", "tests/data/2qb-extra.json")
+    out = capsys.readouterr().out
+    assert "Stopped by Ctrl-C after 100.0%" in out
+    assert "Located 1 trades!" in out
+
+
+def test_main_interrupted_while_loading(reqs_loc, monkeypatch, capsys):
+    def _interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(api, "load_league", _interrupt)
+    api.main(reqs_loc, "tests/data/sleeper-super1.json", "tests/data/2qb.json")
+    assert "before any trades were found" in capsys.readouterr().out
+    with pytest.raises(KeyboardInterrupt):
+        api.main(
+            reqs_loc,
+            "tests/data/sleeper-super1.json",
+            "tests/data/2qb.json",
+            interruptible=False,
+        )
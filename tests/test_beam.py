@@ -0,0 +1,42 @@
+import pytest
+
+from ff_manager.api import compare_beam, eval_trades
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+def test_beam_search(league):
+    reqs = {"team": "team0", "max_assets": 2, "max_fleece": 30, "not_pos": "TE"}
+    expected = [t.to_dict() for t in eval_trades(league, reqs)]
+
+    # A beam wider than any step keeps every trade, as the exhaustive search does
+    trades = eval_trades(league, reqs, beam_width=10_000)
+    assert sorted(map(str, (t.to_dict() for t in trades))) == sorted(map(str, expected))
+
+    report = compare_beam(league, reqs, beam_width=5, top=5)
+    assert report["beam_trades"] < report["exhaustive_trades"]
+    assert report["beam_best_gain"] <= report["exhaustive_best_gain"]
+    assert 0 <= report["top_recall"] <= 1
+    assert report["best_gain_gap"] >= 0
+
+
+def test_constrained_beam_search(league):
+    reqs = {
+        "team": "team0",
+        "max_assets": 3,
+        "max_fleece": 10,
+        "return_contains": "player-5",
+        "return_not_pos": "QB",
+    }
+    trades = eval_trades(league, reqs, beam_width=3)
+    assert trades
+    for trade in trades:
+        assert "player-5" in [a.name for a in trade.rec_assets]
+        assert "QB" not in [a.pos for a in trade.rec_assets]
+
+    # Filtering only the grown trades left a best gain of 8 out of 10
+    report = compare_beam(league, reqs, beam_width=3, top=5)
+    assert report["best_gain_gap"] == 0
@@ -0,0 +1,87 @@
+import pytest
+
+from ff_manager.api import eval_trades, eval_trades_many
+from ff_manager.draws import ValueDraws
+from ff_manager.functions import iter_gain_draws
+from ff_manager.trade import Trade
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+@pytest.fixture
+def trades(league):
+    """Executed trades between the first two teams, one per package pair."""
+    team1, team2 = league.teams[:2]
+    trades = [
+        Trade(team1, team2, package1, package2, league.lineup_setter)
+        for package1, package2 in zip(
+            league.get_packages(team1, 2),
+            league.get_packages(team2, 2)[::-1],
+            strict=False,
+        )
+    ]
+    for trade in trades:
+        trade.execute_trade()
+    return trades
+
+
+@pytest.mark.parametrize("dist", ["lognormal", "normal"])
+def test_gain_draws_without_spread(league, trades, dist):
+    draws = ValueDraws(n=4, spread=0, dist=dist)
+    for trade in iter_gain_draws(trades, draws.make_cache(league), 8):
+        assert trade.gain_mean == pytest.approx(trade.team1_gain)
+        assert trade.gain_p05 == pytest.approx(trade.team1_gain)
+        assert trade.p_gain == (trade.team1_gain > 0)
+
+
+def test_gain_draws(league, trades, make_league):
+    draws = ValueDraws(n=50, spread=0.3, seed=1)
+    sampled = draws.sample(league.players)
+    assert (sampled > 0).all()
+    assert sampled.shape == (len(league.players), 50)
+
+    trades = list(iter_gain_draws(trades, draws.make_cache(league), 8))
+    # Each draw values the league like a league whose values are that draw
+    drawn = make_league()
+    gains = []
+    for k in range(draws.n):
+        for player in drawn.players:
+            player.value = sampled[player.idx, k]
+            player.values = (player.value,)
+        drawn.lineup_setter.clear()
+        gains.append(
+            [
+                drawn.lineup_setter(mask=trade.new_team1_mask).total_value
+                - drawn.lineup_setter(mask=trade.team1.mask).total_value
+                for trade in trades
+            ]
+        )
+    for trade, trade_gains in zip(trades, zip(*gains, strict=True), strict=True):
+        assert trade.gain_mean == pytest.approx(sum(trade_gains) / draws.n)
+        assert trade.p_gain == sum(g > 0 for g in trade_gains) / draws.n
+
+
+def test_gain_draws_many(league):
+    reqs = {"team": "team0", "max_assets": 2, "max_fleece": 30, "draws": 20}
+    scenarios = [
+        reqs | {"draw_seed": 1},
+        reqs | {"draw_seed": 2, "draw_spread": 0.5},
+    ]
+    results = eval_trades_many(league, scenarios)
+
+    # The scenarios share their trades, but not the summaries of their draws
+    for scenario, trades in zip(scenarios, results, strict=True):
+        expected = eval_trades(league, scenario)
+        assert [t.to_dict() for t in trades] == [t.to_dict() for t in expected]
+    assert results[0][0].gain_mean != results[1][0].gain_mean
+
+
+def test_value_draws_from_reqs():
+    assert ValueDraws.from_reqs({"team": "x"}) is None
+    draws = ValueDraws.from_reqs({"team": "x", "draws": 10, "draw_dist": "normal"})
+    assert (draws.n, draws.spread, draws.dist) == (10, 0.15, "normal")
+    with pytest.raises(ValueError, match="distribution"):
+        ValueDraws(dist="uniform")
@@ -1,9 +1,12 @@
+import datetime
 import tempfile
 from pathlib import Path
 
+import polars as pl
 import pyarrow.parquet as pq
 import pytest
 
+from ff_manager.espn import ResponseCache, current_week, load_schedule
 from ff_manager.league import ESPNLeague
 
 
@@ -17,12 +20,204 @@ def test_espn_data_load():
             "year": 2024,
             "id": 56618929,
             "lineup": {},
+            "cache_dir": str(tmp),
         }
         ESPNLeague(profile=profile, data_loc=tmp / "out.parquet", refresh_data=True)
 
         assert (tmp / "out.parquet").exists()
         data = pq.read_table(tmp / "out.parquet")
         assert data
+        assert list((tmp / "responses").glob("*.json"))
+
+
+def _espn_player(player_id, name, slot, owned):
+    return {
+        "playerId": player_id,
+        "lineupSlotId": slot,
+        "playerPoolEntry": {
+            "acquisitionType": "DRAFT",
+            "onTeamId": 1,
+            "player": {
+                "id": player_id,
+                "fullName": name,
+                "eligibleSlots": [slot],
+                "proTeamId": 1,
+                "injuryStatus": "ACTIVE",
+                "ownership": {"percentOwned": owned, "percentStarted": owned / 2},
+                "stats": [],
+            },
+        },
+    }
+
+
+def _espn_team(team_id, players):
+    return {
+        "id": team_id,
+        "abbrev": f"T{team_id}",
+        "name": f"Team {team_id}",
+        "divisionId": 0,
+        "playoffSeed": team_id,
+        "rankCalculatedFinal": 0,
+        "record": {
+            "overall": {
+                "wins": 0,
+                "losses": 0,
+                "ties": 0,
+                "pointsFor": 0,
+                "pointsAgainst": 0,
+                "streakLength": 0,
+                "streakType": "NONE",
+            }
+        },
+        "roster": {"entries": players},
+    }
+
+
+# The responses a league fetch asks for, as ESPN shapes them
+ESPN_RESPONSES = {
+    "get_league": {
+        "seasonId": 2024,
+        "scoringPeriodId": 1,
+        "status": {
+            "currentMatchupPeriod": 1,
+            "firstScoringPeriod": 1,
+            "finalScoringPeriod": 17,
+            "latestScoringPeriod": 1,
+            "previousSeasons": [],
+        },
+        "settings": {
+            "name": "Replayed League",
+            "size": 2,
+            "acquisitionSettings": {"isUsingAcquisitionBudget": False},
+            "draftSettings": {"keeperCount": 0},
+            "rosterSettings": {"lineupSlotCounts": {}},
+            "scheduleSettings": {
+                "matchupPeriodCount": 14,
+                "matchupPeriods": {},
+                "playoffTeamCount": 2,
+                "playoffSeedingRule": "TOTAL_POINTS_SCORED",
+            },
+            "scoringSettings": {
+                "matchupTieRule": "NONE",
+                "playoffMatchupTieRule": "NONE",
+            },
+            "tradeSettings": {"vetoVotesRequired": 1},
+        },
+        "schedule": [],
+        "teams": [
+            _espn_team(
+                1,
+                [
+                    _espn_player(1, "Quarter Back", 0, 90),
+                    _espn_player(2, "Running Back", 2, 60),
+                ],
+            ),
+            _espn_team(2, [_espn_player(3, "Wide Receiver", 4, 80)]),
+        ],
+    },
+    "get_pro_players": [
+        {"id": 1, "fullName": "Quarter Back"},
+        {"id": 2, "fullName": "Running Back"},
+        {"id": 3, "fullName": "Wide Receiver"},
+    ],
+    "get_league_draft": {"draftDetail": {"drafted": False}},
+}
+
+
+def test_espn_replay(tmp_path, monkeypatch):
+    from espn_api.requests.espn_requests import EspnFantasyRequests
+
+    def _stub(name, response):
+        def _request(self, *args, **kwargs):
+            if response is None:
+                raise AssertionError(f"{name} reached ESPN while replaying")
+            return response
+
+        monkeypatch.setattr(EspnFantasyRequests, name, _request)
+
+    profile = {
+        "espn_s2": None,
+        "swid": None,
+        "year": 2024,
+        "id": 1,
+        "lineup": {},
+        "cache_dir": str(tmp_path / "cache"),
+    }
+
+    # Record from a stubbed transport
+    for name, response in ESPN_RESPONSES.items():
+        _stub(name, response)
+    ESPNLeague(profile=profile, data_loc=tmp_path / "record.parquet", refresh_data=True)
+    assert len(list((tmp_path / "cache" / "responses").glob("*.json"))) == 3
+
+    # Replay with ESPN out of reach
+    for name in ESPN_RESPONSES:
+        _stub(name, None)
+    ESPNLeague(
+        profile=profile | {"replay": True},
+        data_loc=tmp_path / "replay.parquet",
+        refresh_data=True,
+    )
+    recorded = pq.read_table(tmp_path / "record.parquet")
+    replayed = pq.read_table(tmp_path / "replay.parquet")
+    assert recorded.num_rows == 3
+    assert replayed.equals(recorded)
+
+
+class _Requests:
+    year = 2024
+
+    def __init__(self):
+        self.calls = 0
+
+    def league_get(self, params=None):
+        self.calls += 1
+        return {"teams": [{"id": 1}], "params": params}
+
+
+def test_response_cache_replay(tmp_path):
+    requests = _Requests()
+    record = ResponseCache(requests, tmp_path)
+    response = record.league_get(params={"view": ["mTeam", "mRoster"]})
+    assert record.year == 2024
+    assert requests.calls == 1
+
+    replay = ResponseCache(_Requests(), tmp_path, replay=True)
+    assert replay.league_get(params={"view": ["mTeam", "mRoster"]}) == response
+    assert replay._requests.calls == 0
+    with pytest.raises(FileNotFoundError, match="No recorded ESPN response"):
+        replay.league_get(params={"view": ["mSettings"]})
+
+
+def test_schedule_cache(tmp_path):
+    schedule = pl.DataFrame(
+        {
+            "week": [1, 1, 1, 2],
+            "gameday": ["2024-08-20", "2024-09-05", "2024-09-08", "2024-09-15"],
+            "result": [None, 3, None, None],
+        }
+    )
+    downloads = []
+
+    def _download(year):
+        downloads.append(year)
+        return schedule
+
+    def _load(today):
+        return load_schedule(2024, tmp_path, today=today, download=_download)
+
+    assert current_week(_load(datetime.date(2024, 9, 8))) == 1
+    # No game missing its result has been played since
+    _load(datetime.date(2024, 9, 8))
+    assert downloads == [2024]
+    # The week 1 game of 09-08 has finished
+    _load(datetime.date(2024, 9, 9))
+    assert downloads == [2024, 2024]
+    # Nor is the cancelled game of 08-20 waited on once the others are in
+    schedule = schedule.with_columns(result=pl.Series([None, 3, 7, None]))
+    _load(datetime.date(2024, 9, 10))
+    _load(datetime.date(2024, 9, 11))
+    assert downloads == [2024, 2024, 2024]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+import pytest
+
+from ff_manager.api import eval_trades, explain_trades
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+def test_explain_trades(league):
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -1000, "return_not_pos": "QB"}
+    _, stats = eval_trades(league, reqs, return_stats=True)
+
+    estimate = explain_trades(league, reqs)
+    report = estimate.to_dict()
+    assert report["pairs"] == stats.counters["trades.evaluated"]
+    assert report["send"]["send_filter"] == stats.counters["packages.send_filter.kept"]
+    assert (
+        sum(c["receive_filter"] for c in report["receive"].values())
+        == (stats.counters["packages.receive_filter.kept"])
+    )
+    assert report["projected_seconds"] > 0
+    assert report["projected_bytes"] > 0
+
+    # Suggestions are recounted searches, cutting the most first
+    suggestions = report["suggestions"]
+    assert suggestions
+    assert [s["pairs"] for s in suggestions] == sorted(s["pairs"] for s in suggestions)
+    best = explain_trades(league, reqs | suggestions[0]["change"], calibrate=False)
+    assert best.n_pairs == suggestions[0]["pairs"] < report["pairs"]
+    estimate.pprint()
@@ -3,7 +3,7 @@ from pathlib import Path
 import pytest
 import yaml
 
-from ff_manager.api import eval_trades
+from ff_manager.api import eval_trades, eval_trades_many
 from ff_manager.league import PLATFORM_SWITCH
 
 
@@ -213,5 +213,71 @@ def test_not_contains_pos():
         assert any(asset for asset in trade.rec_assets if asset.pos != "RB")
 
 
+def test_return_stats():
+    with Path("tests/data/sleeper-super1.json").open() as fpath:
+        loaded_profile: dict = yaml.safe_load(fpath)
+    league = PLATFORM_SWITCH["sleeper"](
+        data_loc="tests/data/2qb-extra.json", profile=loaded_profile
+    )
+    reqs = {"team": "team1", "max_fleece": 5, "target_pos": "QB"}
+    trades, stats = eval_trades(league=league, reqs=reqs, return_stats=True)
+
+    assert stats.counters["trades.selected"] == len(trades)
+    assert stats.counters["trades.evaluated"] == stats.counters["trades.assembled"]
+    assert stats.counters["lineup_cache.hits"] > 0
+    assert set(stats.stage_times) >= {"enumerate", "filter", "evaluate", "select"}
+
+
+def test_memory_report(capsys):
+    with Path("tests/data/sleeper-super1.json").open() as fpath:
+        loaded_profile: dict = yaml.safe_load(fpath)
+    league = PLATFORM_SWITCH["sleeper"](
+        data_loc="tests/data/2qb-extra.json", profile=loaded_profile
+    )
+    reqs = {"team": "team1", "max_fleece": 5, "max_assets": 2}
+    _, stats = eval_trades(
+        league=league,
+        reqs=reqs,
+        return_stats=True,
+        memory_report=True,
+        memory_ceiling_mb=1e-6,
+    )
+
+    memory = stats.memory
+    assert memory.projected_trades == 9  # 3 packages from each 2 asset roster
+    assert memory.bytes_per_trade > 0
+    assert "evaluate" in memory.stage_peaks
+    assert "WARNING" in capsys.readouterr().out
+
+
+def test_eval_trades_many():
+    with Path("tests/data/sleeper-super1.json").open() as fpath:
+        loaded_profile: dict = yaml.safe_load(fpath)
+    league = PLATFORM_SWITCH["sleeper"](
+        data_loc="tests/data/2qb-extra.json", profile=loaded_profile
+    )
+    scenarios = [
+        {"team": "team1", "max_fleece": 5, "max_assets": 2},
+        {"team": "team1", "max_fleece": 5, "target_pos": "QB"},
+        {"team": "team1", "max_fleece": 5, "min_asset_value": 6},  # no trades
+    ]
+    results = eval_trades_many(league, scenarios, return_stats=True)
+
+    assert len(results) == 3
+    for scenario, (trades, _) in zip(scenarios[:2], results, strict=False):
+        expected = eval_trades(league=league, reqs=scenario)
+        assert [t.to_dict() for t in trades] == [t.to_dict() for t in expected]
+    assert results[1][1].counters["trades.evaluated"] == 0
+    assert results[1][1].counters["trades.shared"] > 0
+    assert results[2][0] == []
+
+
+def test_unknown_names_warn(capsys):
+    reqs = {"team": "team1", "return_contains": ["player-1", "Nobody"]}
+    trades = _conf_test("tests/data/sleeper-super1.json", "tests/data/2qb.json", reqs)
+    assert trades
+    assert "Nobody" in capsys.readouterr().out
+
+
 if __name__ == "__main__":
     test_same_value()
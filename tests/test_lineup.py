@@ -1,6 +1,6 @@
 import pytest
 
-from ff_manager.lineup import make_lineup_setter
+from ff_manager.lineup import LINEUP_BACKENDS, make_lineup_kernel, make_lineup_setter
 from ff_manager.model import Asset
 
 
@@ -254,5 +254,90 @@ def test_lineup_flex_complex_depth():
     assert lineup.total_value == 845
 
 
+def test_lineup_empty_starter_depth():
+    setter = make_lineup_setter(QB=1, RB=1, FLEX=1, depth=1)
+    assets = [
+        Asset(name="player1", pos="RB", value=100),
+        Asset(name="player2", pos="RB", value=50),
+    ]
+    lineup = setter(assets)
+
+    assert lineup.starter_value == 150
+    assert lineup.total_value == 200  # FLEX starter is also RB depth
+    assert lineup._data is None  # dict view not built for values
+
+    assert lineup["QB1"] is None
+    assert lineup.starter_keys == ["QB1", "RB1", "FLEX1"]
+
+
+def test_lineup_kernel():
+    np = pytest.importorskip("numpy")
+    template = {"QB": 1, "RB": 2, "WR": 1, "TE": 1, "FLEX": 1, "SUPER": 1}
+    assets = [
+        Asset(name="player3", pos="QB", value=100),
+        Asset(name="player9", pos="QB", value=75),
+        Asset(name="player1", pos="RB", value=100),
+        Asset(name="player2", pos="RB", value=75),
+        Asset(name="player4", pos="TE", value=50),
+        Asset(name="player6", pos="WR", value=150),
+        Asset(name="player7", pos="WR", value=70),
+    ]
+    values = np.array([[[a.value, 200 - a.value] for a in assets]], dtype=float)
+    positions = np.array([[a.pos for a in assets]], dtype=object)
+    kernel = make_lineup_kernel(depth=1, **template)
+    (totals,) = kernel(values, positions)
+
+    setter = make_lineup_setter(depth=1, **template)
+    flipped = [Asset(name=a.name, pos=a.pos, value=200 - a.value) for a in assets]
+    assert totals.tolist() == [
+        setter(assets).total_value,
+        setter(flipped).total_value,
+    ]
+
+
+def _backend(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    return backend
+
+
+@pytest.mark.parametrize("backend", LINEUP_BACKENDS)
+@pytest.mark.parametrize(
+    "template",
+    [
+        {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 2, "SUPERFLEX": 1},
+        {"QB": 1, "RB": 2, "WR": 1, "TE": 1, "FLEX": 1, "SUPER": 1},
+        {"RB": 1, "FLEX": 1},
+        {"QB": 2, "K": 1},
+    ],
+)
+@pytest.mark.parametrize("depth", [0, 1, 2])
+def test_lineup_kernel_backends(backend, template, depth):
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(depth)
+    # Padded rosters of varied sizes, with tied values and missing positions
+    n_rosters, n_players, n_vals = 40, 14, 3
+    values = rng.integers(0, 8, (n_rosters, n_players, n_vals)).astype(float)
+    positions = rng.choice(
+        np.array(["QB", "RB", "WR", "TE", "K", "DEF"], dtype=object),
+        (n_rosters, n_players),
+    )
+    sizes = rng.integers(0, n_players + 1, n_rosters)
+    padding = np.arange(n_players)[None, :] >= sizes[:, None]
+    positions[padding] = None
+    values[padding] = 0
+
+    expected = make_lineup_kernel(depth=depth, backend="python", **template)(
+        values, positions
+    )
+    kernel = make_lineup_kernel(depth=depth, backend=_backend(backend), **template)
+    assert kernel(values, positions).tolist() == expected.tolist()
+
+
+def test_lineup_kernel_bad_backend():
+    with pytest.raises(ValueError, match="lineup backend"):
+        make_lineup_kernel(backend="fortran", RB=1)
+
+
 if __name__ == "__main__":
     test_pprint_no_error()
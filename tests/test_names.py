@@ -0,0 +1,34 @@
+import pytest
+
+from ff_manager.model import Asset
+from ff_manager.names import NameIndex
+
+
+@pytest.fixture
+def name_index():
+    names = ["Ja'Marr Chase", "Justin Jefferson", "Hollywood Brown", "Josh Allen"]
+    players = [Asset(name=name, idx=i) for i, name in enumerate(names)]
+    players.append(Asset(name="Josh Allen", idx=len(players)))  # the linebacker
+    return NameIndex(players)
+
+
+@pytest.mark.parametrize(
+    ("name", "ids"),
+    [
+        ("Ja'Marr Chase", (0,)),
+        ("  <b>Justin   Jefferson</b>", (1,)),
+        ("jamarr chase", (0,)),
+        ("Justin Jeffferson", (1,)),
+        ("Marquise Brown", (2,)),
+        ("Josh Allen", (3, 4)),
+        ("Jon Allen", ()),
+    ],
+)
+def test_resolve(name_index, name: str, ids: tuple):
+    assert name_index.resolve(name) == ids
+
+
+def test_resolve_many(name_index):
+    resolved, unknown = name_index.resolve_many(["Josh Allen", "player-99"])
+    assert resolved == [(3, 4), ()]
+    assert unknown == ["player-99"]
@@ -0,0 +1,89 @@
+import pytest
+
+from ff_manager.api import eval_trades
+from ff_manager.filter import PackageFilter
+from ff_manager.functions import enumerate_packages
+from ff_manager.lineup import LineupCache, make_lineup_kernel, make_lineup_setter
+from ff_manager.model import Asset, Team
+from ff_manager.prune import prune_packages
+
+
+@pytest.fixture
+def tied_league(make_league):
+    """Players of tied values, so many packages are alike."""
+    return make_league(value_choices=(0, 0, 25, 50, 100))
+
+
+def test_pruned_search(tied_league):
+    reqs = {"team": "team0", "max_assets": 2, "max_fleece": 30}
+    full, full_stats = eval_trades(tied_league, reqs, return_stats=True)
+
+    def _outcomes(trades):
+        return {(t.team2.name, t.team1_gain, t.team2_gain) for t in trades}
+
+    # Exact pruning only drops trades with the gains of a kept one
+    exact, exact_stats = eval_trades(
+        tied_league, reqs | {"prune": "exact"}, return_stats=True
+    )
+    assert _outcomes(exact) == _outcomes(full)
+    exact_evaluated = exact_stats.counters["trades.evaluated"]
+    assert exact_evaluated < full_stats.counters["trades.evaluated"]
+
+    dominance, stats = eval_trades(
+        tied_league, reqs | {"prune": "dominance"}, return_stats=True
+    )
+    assert stats.counters["trades.evaluated"] <= exact_evaluated
+    assert _outcomes(dominance) <= _outcomes(full)
+    assert dominance[0].team1_gain == full[0].team1_gain
+
+    with pytest.raises(ValueError, match="prune mode"):
+        PackageFilter(prune="nope")
+
+
+def test_prune_packages():
+    players = [
+        Asset(name="qb", value=50, pos="QB", idx=0),
+        Asset(name="rb1", value=40, pos="RB", idx=1),
+        Asset(name="rb2", value=12, pos="RB", idx=2),
+        Asset(name="rb3", value=10, pos="RB", idx=3),
+        Asset(name="rb4", value=10, pos="RB", idx=4),
+    ]
+    setter = LineupCache(make_lineup_setter(QB=1, RB=1), players=players)
+    team = Team(name="team", assets=players, lineup_setter=setter)
+    packages = enumerate_packages(team.assets, 1)
+
+    def _names(pruned):
+        return [package.assets[0].name for package in pruned]
+
+    # The two 10s are alike; the 12 costs the lineup as little and is worth more
+    assert _names(prune_packages(team, packages, setter, "exact")) == [
+        "qb",
+        "rb1",
+        "rb2",
+        "rb3",
+    ]
+    assert _names(prune_packages(team, packages, setter, "dominance")) == [
+        "qb",
+        "rb1",
+        "rb2",
+    ]
+
+
+def test_prune_packages_by_valuation():
+    players = [
+        Asset(name="qb", value=50, pos="QB", idx=0, values=(50, 50)),
+        Asset(name="rb1", value=40, pos="RB", idx=1, values=(40, 40)),
+        Asset(name="rb2", value=12, pos="RB", idx=2, values=(12, 5)),
+        Asset(name="rb3", value=10, pos="RB", idx=3, values=(10, 30)),
+    ]
+    setter = LineupCache(
+        make_lineup_setter(QB=1, RB=1),
+        players=players,
+        kernel=make_lineup_kernel(backend="numpy", QB=1, RB=1),
+    )
+    team = Team(name="team", assets=players, lineup_setter=setter)
+    packages = enumerate_packages(team.assets, 1)
+
+    # The 10 is worth less than the 12 by value, but more under the valuation
+    pruned = prune_packages(team, packages, setter, "dominance")
+    assert [package.assets[0].name for package in pruned] == ["qb", "rb1", "rb2", "rb3"]
@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import threading
+import urllib.request
+
+import pytest
+
+from ff_manager.server import LeagueHandle, TradeServer
+
+PROFILE = "tests/data/sleeper-super1.json"
+
+
+@pytest.fixture
+def server(tmp_path):
+    data = tmp_path / "league.json"
+    shutil.copy("tests/data/2qb-extra.json", data)
+    server = TradeServer({"test": LeagueHandle(PROFILE, data)})
+    httpd = server.make_httpd(port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{httpd.server_address[1]}", data
+    server.shutdown()
+
+
+def _post(url: str, body: dict) -> dict:
+    request = urllib.request.Request(
+        f"{url}/trades",
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as resp:
+        return json.load(resp)
+
+
+def test_concurrent_queries(server):
+    _, url, _ = server
+    body = {"league": "test", "reqs": {"team": "team1", "max_fleece": 5}}
+    results = [None] * 4
+
+    def _query(i: int) -> None:
+        results[i] = _post(url, body)
+
+    threads = [threading.Thread(target=_query, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(res["trades"] == results[0]["trades"] for res in results)
+    assert results[0]["n_trades"] > 0
+
+
+def test_reload_on_snapshot_change(server):
+    trade_server, _, data = server
+    before = trade_server.leagues["test"].league
+
+    assert trade_server.poll_once() == []
+    with data.open() as f:
+        players = json.load(f)
+    players[3]["value"] = 100
+    data.write_text(json.dumps(players))
+    stat = data.stat()
+    os.utime(data, (stat.st_atime, stat.st_mtime + 10))
+
+    assert trade_server.poll_once() == ["test"]
+    assert trade_server.leagues["test"].league is not before
+
+
+def test_bad_league(server):
+    _, url, _ = server
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _post(url, {"league": "missing", "reqs": {"team": "team1"}})
+    assert e.value.code == 400
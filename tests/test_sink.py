@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+import yaml
+
+from ff_manager.api import eval_trades, merge_trades, parse_shard
+from ff_manager.league import PLATFORM_SWITCH
+from ff_manager.sink import open_sink, read_rows
+
+
+@pytest.fixture
+def league():
+    with Path("tests/data/sleeper-super1.json").open() as fpath:
+        loaded_profile: dict = yaml.safe_load(fpath)
+    return PLATFORM_SWITCH["sleeper"](
+        data_loc="tests/data/2qb-extra.json", profile=loaded_profile
+    )
+
+
+REQS = {"team": "team1", "max_fleece": 5, "max_assets": 2}
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".csv", ".parquet", ".txt"])
+def test_streamed_trades_match(league, tmp_path, suffix):
+    expected = eval_trades(league, REQS)
+
+    loc = tmp_path / f"trades{suffix}"
+    with open_sink(loc, top=2) as sink:
+        res = eval_trades(league, REQS, sink=sink)
+
+    assert res is None
+    assert sink.n_written == len(expected)
+    assert [t.to_dict() for t in sink.top_trades] == [t.to_dict() for t in expected[:2]]
+
+    if suffix == ".ndjson":
+        rows = [json.loads(line) for line in loc.read_text().splitlines()]
+        assert rows == [t.to_dict() for t in expected]
+    elif suffix == ".parquet":
+        assert pq.read_table(loc).num_rows == len(expected)
+    elif suffix == ".csv":
+        assert len(loc.read_text().splitlines()) == len(expected) + 1
+
+
+def test_parquet_row_groups(league, tmp_path):
+    loc = tmp_path / "trades.parquet"
+    with open_sink(loc) as sink:
+        sink.batch_size = 2
+        eval_trades(league, REQS, sink=sink)
+    assert pq.ParquetFile(loc).metadata.num_row_groups == 3  # 5 trades
+
+
+@pytest.fixture
+def random_league(make_league):
+    return make_league()
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".parquet"])
+def test_sharded_search(random_league, tmp_path, suffix):
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -1000}
+    expected = [t.to_dict() for t in eval_trades(random_league, reqs)]
+
+    locs = []
+    for i in range(1, 4):
+        locs.append(tmp_path / f"shard{i}{suffix}")
+        with open_sink(locs[-1]) as sink:
+            eval_trades(random_league, reqs, sink=sink, shard=f"{i}/3", limit=10)
+    merge_trades(locs, tmp_path / "merged.ndjson", limit=10)
+    merged = list(read_rows(tmp_path / "merged.ndjson"))
+    assert [row["team1_gain"] for row in merged] == [
+        row["team1_gain"] for row in expected[:10]
+    ]
+
+    # Without a limit, the shards partition the search
+    for i, loc in enumerate(locs, start=1):
+        with open_sink(loc) as sink:
+            eval_trades(random_league, reqs, sink=sink, shard=(i, 3))
+    merge_trades(locs, tmp_path / "merged.ndjson")
+    merged = list(read_rows(tmp_path / "merged.ndjson"))
+
+    def _key(row):  # parquet reads numbers back as floats
+        return (row["team2"], row["sent"], row["received"], float(row["team1_gain"]))
+
+    assert sorted(map(_key, merged)) == sorted(map(_key, expected))
+
+
+def test_sharded_search_by_valuation(make_league, tmp_path):
+    valuations = ["value", "value_alt"]
+    league = make_league(valuations=valuations)
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -1000, "rank_by": "value_alt"}
+    expected = [t.to_dict() for t in eval_trades(league, reqs, limit=10)]
+
+    locs = []
+    for i in range(1, 4):
+        locs.append(tmp_path / f"shard{i}.ndjson")
+        with open_sink(locs[-1]) as sink:
+            eval_trades(league, reqs, sink=sink, shard=f"{i}/3", limit=10)
+    merged_loc = tmp_path / "merged.ndjson"
+    merge_trades(locs, merged_loc, limit=10, rank_by="value_alt", valuations=valuations)
+    assert [row["team1_gains"][1] for row in read_rows(merged_loc)] == [
+        row["team1_gains"][1] for row in expected
+    ]
+
+    # Shards searched without the valuation can not be merged on it
+    with open_sink(locs[0]) as sink:
+        eval_trades(
+            make_league(),
+            reqs | {"rank_by": None},
+            sink=sink,
+            limit=10,
+        )
+    with pytest.raises(ValueError, match="no gain under valuation"):
+        merge_trades(locs, merged_loc, rank_by="value_alt", valuations=valuations)
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (0, 4)
+    assert parse_shard((4, 4)) == (3, 4)
+    for bad in ("0/4", "5/4", "1-4"):
+        with pytest.raises(ValueError, match="Shard"):
+            parse_shard(bad)
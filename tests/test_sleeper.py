@@ -0,0 +1,47 @@
+import pyarrow as pa
+
+from ff_manager.league import _match_player_values
+
+
+def test_match_player_values(capsys):
+    players = pa.table(
+        {
+            "player_id": ["1", "2", "3", "4"],
+            "full_name": ["Josh Allen", "Hollywood Brown", "Nobody Atall", "Bench Guy"],
+            "pos": ["QB", "WR", "RB", "TE"],
+        }
+    )
+    rosters = pa.table(
+        {"owner_id": ["a", "b"], "players": [["1", "2"], ["3"]]},
+        schema=pa.schema(
+            [("owner_id", pa.string()), ("players", pa.list_(pa.string()))]
+        ),
+    )
+    users = pa.table({"user_id": ["a", "b"], "team": ["team a", "team b"]})
+    player_values = pa.table(
+        {
+            "player": ["Josh Allen", "Josh Allen", "Marquise Brown", "Josh Allenn"],
+            "value_1qb": [9000, 100, 3000, 50],
+            "value_2qb": [9500, 200, 2900, 60],
+        }
+    )
+    res = _match_player_values(players, rosters, users, player_values)
+
+    rows = {row["id"]: row for row in res.to_pylist()}
+    # The bench player is on no roster, and the last one has no value:
+    assert sorted(rows) == ["1", "2"]
+    assert "not matched" in capsys.readouterr().out
+    # The exact name beats a close one, and the lowest value of a name is kept:
+    assert rows["1"]["value"] == 200
+    assert rows["1"]["team"] == "team a"
+    # Known mismatches are renamed:
+    assert rows["2"]["value"] == 2900
+    assert set(res.column_names) == {
+        "id",
+        "name",
+        "pos",
+        "team",
+        "value",
+        "value_1qb",
+        "value_2qb",
+    }
@@ -0,0 +1,23 @@
+import pytest
+
+from ff_manager.api import eval_trades
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+def test_spilled_search(league, tmp_path):
+    reqs = {"team": "team0", "max_assets": 2, "min_gain": -20, "max_fleece": 60}
+    expected = [t.to_dict() for t in eval_trades(league, reqs)]
+
+    trades, stats = eval_trades(
+        league,
+        reqs,
+        return_stats=True,
+        memory_budget_mb=0.05,
+        spill_dir=tmp_path / "spill",
+    )
+    assert stats.counters["spill.runs"] > 1
+    assert [t.to_dict() for t in trades] == expected
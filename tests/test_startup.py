@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = (
+    "polars",
+    "pyarrow",
+    "duckdb",
+    "numpy",
+    "rich",
+    "espn_api",
+    "nfl_data_py",
+)
+
+# Cumulative import time of the CLI module; click alone takes ~20-40ms
+STARTUP_BUDGET_MS = 250
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Cumulative import time, in microseconds, of every module imported by `code`."""
+    env = os.environ | {"PYTHONPATH": os.pathsep.join(sys.path)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import ff_manager",
+        "import ff_manager.__main__",
+        "from ff_manager.__main__ import cli; cli(['print-prof-opts'], standalone_mode=False)",
+        "from ff_manager.__main__ import cli; cli(['print-trade-opts'], standalone_mode=False)",
+    ],
+)
+def test_light_paths_skip_heavy_imports(code: str):
+    times = _import_times(code)
+    heavy = [m for m in times if m.split(".")[0] in HEAVY_MODULES]
+    assert not heavy
+
+
+def test_cli_startup_budget():
+    times = _import_times("import ff_manager.__main__")
+    assert times["ff_manager.__main__"] / 1_000 < STARTUP_BUDGET_MS
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+import yaml
+
+from ff_manager.api import eval_trades
+from ff_manager.league import PLATFORM_SWITCH
+
+PROFILE = "tests/data/sleeper-super1.json"
+
+
+def _league(data: str | Path, **profile_opts):
+    with Path(PROFILE).open() as fpath:
+        loaded_profile: dict = yaml.safe_load(fpath)
+    return PLATFORM_SWITCH["sleeper"](
+        data_loc=data, profile=loaded_profile | profile_opts
+    )
+
+
+def _summary(trades) -> list[tuple]:
+    return [
+        (
+            tuple(a.name for a in t.sent_assets),
+            tuple(a.name for a in t.rec_assets),
+            t.team1_gain,
+            t.team2_gain,
+        )
+        for t in trades
+    ]
+
+
+def test_store_reuses_unchanged_pairs(tmp_path):
+    reqs = {"team": "team1", "max_fleece": 5}
+    store = tmp_path / "store"
+
+    first, stats = eval_trades(
+        _league("tests/data/3team1.json"), reqs, return_stats=True, store=store
+    )
+    assert stats.counters["pairs.computed"] == 2
+    assert stats.counters["teams.changed"] == 3
+
+    second, stats = eval_trades(
+        _league("tests/data/3team1.json"), reqs, return_stats=True, store=store
+    )
+    assert stats.counters["pairs.reused"] == 2
+    assert stats.counters["trades.evaluated"] == 0
+    assert _summary(first) == _summary(second)
+    assert all(t.executed for t in second)
+
+    # Change the value of a team3 player, only the team1-team3 pair is re-run
+    with Path("tests/data/3team1.json").open() as f:
+        data = json.load(f)
+    data[2]["value"] = 10
+    changed = tmp_path / "changed.json"
+    changed.write_text(json.dumps(data))
+
+    _, stats = eval_trades(_league(changed), reqs, return_stats=True, store=store)
+    assert stats.counters["teams.changed"] == 1
+    assert stats.counters["pairs.reused"] == 1
+    assert stats.counters["pairs.computed"] == 1
+
+
+def test_store_recomputes_changed_valuations(tmp_path):
+    reqs = {"team": "team1", "min_gain": -1000}
+    store = tmp_path / "store"
+    with Path("tests/data/3team1.json").open() as f:
+        data = json.load(f)
+    for player in data:
+        player["value_alt"] = 5
+    valued = tmp_path / "valued.json"
+    valued.write_text(json.dumps(data))
+    eval_trades(_league(valued, valuations=["value", "value_alt"]), reqs, store=store)
+
+    # Only the secondary valuation of a team3 player changes
+    data[2]["value_alt"] = 10
+    valued.write_text(json.dumps(data))
+    league = _league(valued, valuations=["value", "value_alt"])
+    trades, stats = eval_trades(league, reqs, return_stats=True, store=store)
+    assert stats.counters["teams.changed"] == 1
+    assert stats.counters["pairs.reused"] == 1
+    assert stats.counters["pairs.computed"] == 1
+
+    expected = eval_trades(league, reqs)
+    assert sorted(t.team1_gains.tolist() for t in trades) == sorted(
+        t.team1_gains.tolist() for t in expected
+    )
+    assert [0, 5] in [t.team1_gains.tolist() for t in trades]
+
+
+def test_store_requery_selection(tmp_path):
+    store = tmp_path / "store"
+    league = _league("tests/data/2qb-extra.json")
+    reqs = {"team": "team1", "max_assets": 2, "max_fleece": 1}
+    narrow = eval_trades(league, reqs, store=store)
+
+    reqs["max_fleece"] = 10
+    wide, stats = eval_trades(league, reqs, return_stats=True, store=store)
+    assert stats.counters["trades.evaluated"] == 0
+    assert stats.counters["trades.assembled"] == 0
+    assert len(wide) > len(narrow)
+    assert _summary(wide) == _summary(
+        eval_trades(_league("tests/data/2qb-extra.json"), reqs)
+    )
@@ -0,0 +1,221 @@
+import tracemalloc
+
+import pytest
+
+from ff_manager.api import eval_trades
+from ff_manager.filter import PackageFilter, ReceiveFilter, SendFilter
+from ff_manager.functions import SearchCache, assemble_trades, iter_valuation_gains
+from ff_manager.lineup import make_lineup_setter
+from ff_manager.model import Asset, Team, mask_assets, roster_mask
+from ff_manager.trade import Package, Trade
+
+# Retained bytes per executed trade; a trade holding two team copies and two
+# rebuilt teams took ~4.8KB
+ALLOCATION_BUDGET_B = 2_000
+
+
+@pytest.fixture
+def league(make_league):
+    return make_league()
+
+
+def test_trade_shares_teams(league):
+    team1, team2 = league.teams[:2]
+    package1 = league.get_packages(team1, 1)[0]
+    package2 = league.get_packages(team2, 1)[0]
+    trade = Trade(team1, team2, package1, package2, league.lineup_setter)
+    trade.execute_trade()
+
+    assert trade.team1 is team1
+    assert trade.team2 is team2
+    assert package2.assets[0] in trade.new_team1_assets
+    assert package1.assets[0] not in trade.new_team1_assets
+    assert len(trade.new_team1_assets) == len(team1.assets)
+
+    # Packages without positions are diffed by league index
+    bare = Trade(
+        team1,
+        team2,
+        Package(package1.assets),
+        Package(package2.assets),
+        trade._lineup_setter,
+    )
+    assert bare.new_team1_assets == trade.new_team1_assets
+
+
+def test_trade_allocations(league):
+    tracemalloc.start()
+    try:
+        trades = assemble_trades(
+            league.teams[0],
+            SendFilter(),
+            ReceiveFilter(),
+            PackageFilter(max_assets=2),
+            league,
+        )
+        for trade in trades:
+            trade.execute_trade()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert retained / len(trades) < ALLOCATION_BUDGET_B
+
+
+def test_trade_name_collision():
+    setter = make_lineup_setter(QB=1, RB=1)
+    twin1 = Asset(name="twin", _id="1", value=10, pos="QB", idx=0)
+    twin2 = Asset(name="twin", _id="2", value=5, pos="QB", idx=1)
+    rb = Asset(name="rb", _id="3", value=7, pos="RB", idx=2)
+    team1 = Team(name="team1", assets=[twin1, twin2], lineup_setter=setter)
+    team2 = Team(name="team2", assets=[rb], lineup_setter=setter)
+
+    trade = Trade(team1, team2, Package((twin2,)), Package((rb,)), setter)
+    trade.execute_trade()
+
+    assert trade.new_team1_assets[0] is twin1
+    assert trade.team1_gain == 7  # a name diff would drop twin1 instead
+
+
+def test_trade_without_league_index():
+    setter = make_lineup_setter(QB=1, RB=1)
+    a = Asset(name="a", value=10, pos="QB")
+    b = Asset(name="b", value=10, pos="RB")
+    c = Asset(name="c", value=5, pos="RB")
+    d = Asset(name="d", value=2, pos="RB")
+    team1 = Team(name="team1", assets=[a, b, c], lineup_setter=setter)
+    team2 = Team(name="team2", assets=[d], lineup_setter=setter)
+
+    trade = Trade(team1, team2, Package((b,)), Package((d,)), setter)
+    trade.execute_trade()
+
+    assert [asset.name for asset in trade.new_team1_assets] == ["a", "c", "d"]
+    assert trade.team1_gain == -5
+    with pytest.raises(ValueError, match="not on the roster"):
+        Package((d,)).retained(team1)
+
+
+def test_trade_masks(league):
+    team1, team2 = league.teams[:2]
+    package1 = league.get_packages(team1, 2)[-1]
+    package2 = league.get_packages(team2, 2)[-1]
+    trade = Trade(team1, team2, package1, package2, league.lineup_setter)
+
+    assert trade.new_team1_mask == roster_mask(trade.new_team1_assets)
+    assert trade.new_team2_mask == roster_mask(trade.new_team2_assets)
+    assert mask_assets(team1.mask, league.players) == team1.assets
+
+    by_mask = league.lineup_setter(mask=trade.new_team1_mask)
+    by_assets = league.lineup_setter.setter(assets=trade.new_team1_assets)
+    assert by_mask.total_value == by_assets.total_value
+
+
+def test_bound_filters_match_names(league):
+    names = [p.name for p in league.players[::7]]
+    filters = [
+        SendFilter(not_assets=names),
+        SendFilter(assets=names[:2], assets_exclusive=True),
+        PackageFilter(return_contains=names),
+        ReceiveFilter(return_does_not_contain=names),
+    ]
+    packages = [p for team in league.teams for p in league.get_packages(team, 2)]
+    for package_filter in filters:
+        by_name = [package_filter(p) for p in packages]
+        package_filter.bind(league.name_index)
+        assert [package_filter(p) for p in packages] == by_name
+
+
+def _executed_trades(league):
+    team1, team2 = league.teams[:2]
+    trades = [
+        Trade(team1, team2, package1, package2, league.lineup_setter)
+        for package1, package2 in zip(
+            league.get_packages(team1, 2),
+            league.get_packages(team2, 2)[::-1],
+            strict=False,
+        )
+    ]
+    for trade in trades:
+        trade.execute_trade()
+    return trades
+
+
+def test_trade_gains_per_valuation(make_league):
+    league = make_league(valuations=["value", "value_alt"])
+    alt = make_league()
+    for player in alt.players:  # the same league, valued by `value_alt` alone
+        player.value = league.players[player.idx].values[1]
+        player.values = (player.value,)
+    alt.lineup_setter.clear()
+
+    team1, team2 = league.teams[:2]
+    trades = _executed_trades(league)
+    for trade in iter_valuation_gains(trades, league.lineup_setter, batch_size=8):
+        package1, package2 = trade.package1, trade.package2
+        alt_trade = Trade(
+            alt[team1.name],
+            alt[team2.name],
+            Package(tuple(alt.players[a.idx] for a in package1)),
+            Package(tuple(alt.players[a.idx] for a in package2)),
+            alt.lineup_setter,
+        )
+        alt_trade.execute_trade()
+
+        assert trade.team1_gains.tolist() == [trade.team1_gain, alt_trade.team1_gain]
+        assert trade.team2_gains.tolist() == [trade.team2_gain, alt_trade.team2_gain]
+
+
+def test_select_under_any_valuation(make_league, tmp_path):
+    league = make_league(valuations=["value", "value_alt"])
+    reqs = {"team": "team0", "max_assets": 2, "max_fleece": 20}
+
+    trades = eval_trades(league, reqs)
+    gains = [(t.team1_gains.tolist(), t.team2_gains.tolist()) for t in trades]
+    for gains1, gains2 in gains:
+        assert any(
+            g1 >= 0 and abs(g1 - g2) < 20 for g1, g2 in zip(gains1, gains2, strict=True)
+        )
+    # Trades only passing under the second valuation are reported too
+    assert any(gains1[0] < 0 <= gains1[1] for gains1, _ in gains)
+    assert [t.team1_gain for t in trades] == sorted(
+        (t.team1_gain for t in trades), reverse=True
+    )
+
+    ranked = eval_trades(league, reqs | {"rank_by": "value_alt"})
+    assert sorted(map(str, (t.to_dict() for t in ranked))) == sorted(
+        map(str, (t.to_dict() for t in trades))
+    )
+    assert [t.team1_gains[1] for t in ranked] == sorted(
+        (t.team1_gains[1] for t in ranked), reverse=True
+    )
+
+    spilled = eval_trades(
+        league,
+        reqs | {"rank_by": "value_alt"},
+        memory_budget_mb=0.05,
+        spill_dir=tmp_path / "spill",
+    )
+    assert [t.to_dict() for t in spilled] == [t.to_dict() for t in ranked]
+    for _ in range(2):  # computed, then reused from the store
+        stored = eval_trades(league, reqs, store=tmp_path / "store")
+        assert [t.to_dict() for t in stored] == [t.to_dict() for t in trades]
+
+    with pytest.raises(ValueError, match="rank_by"):
+        eval_trades(league, reqs | {"rank_by": "value_1qb"})
+
+
+@pytest.mark.parametrize(
+    ("modes", "match"),
+    [
+        ({"store": "store", "shard": "1/2"}, "a result store and shards"),
+        (
+            {"cache": SearchCache(), "memory_budget_mb": 1},
+            "a cache and a memory budget",
+        ),
+        ({"cache": SearchCache(), "beam_width": 5}, "a cache and a beam"),
+        ({"cache": SearchCache(), "time_budget": 10}, "a cache and a time budget"),
+    ],
+)
+def test_exclusive_modes(league, modes, match):
+    with pytest.raises(ValueError, match=match):
+        eval_trades(league, {"team": "team0", "max_assets": 2}, **modes)